@@ -0,0 +1,152 @@
+"""
+Markdown to Word Benchmark
+Compares the notebook's original add_markdown_to_word (+ the portfolio font/asterisk
+second pass) with officeagents.docx_render on a 500-row portfolio table and a
+100-section ratings change report
+
+Usage (from analysis_scripts):
+    python benchmarks/bench_docx.py [--rows 500] [--sections 100] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+import time
+
+from docx import Document
+from docx.shared import Pt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from officeagents.docx_render import add_markdown_to_word, PORTFOLIO_TABLE_FORMAT  # noqa: E402
+from synthetic import fake_symbols, portfolio_table_markdown, ratings_section_markdown  # noqa: E402
+
+
+def legacy_add_formatted_text(paragraph, text):
+    parts = re.split(r'(\*\*.*?\*\*|__.*?__|`.*?`)', text)
+    for part in parts:
+        if not part:
+            continue
+        if part.startswith('**') and part.endswith('**'):
+            paragraph.add_run(part[2:-2]).bold = True
+        elif part.startswith('__') and part.endswith('__'):
+            paragraph.add_run(part[2:-2]).bold = True
+        elif part.startswith('`') and part.endswith('`'):
+            paragraph.add_run(part[1:-1]).font.name = 'Courier New'
+        else:
+            paragraph.add_run(part)
+
+
+def legacy_add_markdown_to_word(doc, markdown_text):
+    """The notebook's original renderer"""
+    lines = markdown_text.split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if not line.strip():
+            i += 1
+            continue
+        if line.startswith('#'):
+            level = len(line) - len(line.lstrip('#'))
+            doc.add_heading(line.lstrip('#').strip(), level=min(level, 9))
+        elif '|' in line and i + 1 < len(lines) and '|' in lines[i + 1]:
+            table_lines = [line]
+            i += 1
+            if '---' in lines[i] or ':-:' in lines[i]:
+                i += 1
+            while i < len(lines) and '|' in lines[i]:
+                table_lines.append(lines[i])
+                i += 1
+            headers = [cell.strip() for cell in table_lines[0].split('|') if cell.strip()]
+            num_cols = len(headers)
+            table = doc.add_table(rows=len(table_lines), cols=num_cols)
+            table.style = 'Light Grid Accent 1'
+            for j, header in enumerate(headers):
+                cell = table.rows[0].cells[j]
+                cell.text = header
+                cell.paragraphs[0].runs[0].bold = True
+            for row_idx in range(1, len(table_lines)):
+                cells = [cell.strip() for cell in table_lines[row_idx].split('|') if cell.strip()]
+                for col_idx, cell_text in enumerate(cells):
+                    if col_idx < num_cols:
+                        table.rows[row_idx].cells[col_idx].text = cell_text
+            doc.add_paragraph()
+            continue
+        elif line.strip().startswith(('- ', '* ', '• ')):
+            legacy_add_formatted_text(doc.add_paragraph(style='List Bullet'), line.strip()[2:].strip())
+        elif re.match(r'^\d+\.\s', line.strip()):
+            legacy_add_formatted_text(doc.add_paragraph(style='List Number'), re.sub(r'^\d+\.\s', '', line.strip()))
+        else:
+            legacy_add_formatted_text(doc.add_paragraph(), line)
+        i += 1
+
+
+def legacy_portfolio(markdown_text):
+    doc = Document()
+    legacy_add_markdown_to_word(doc, markdown_text)
+    if doc.tables:
+        for row in doc.tables[-1].rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    for run in paragraph.runs:
+                        run.font.size = Pt(8)
+                        run.bold = False
+                        run.text = run.text.replace('*', '')
+    return doc
+
+
+def new_portfolio(markdown_text):
+    doc = Document()
+    add_markdown_to_word(doc, markdown_text, **PORTFOLIO_TABLE_FORMAT)
+    return doc
+
+
+def legacy_ratings(sections):
+    doc = Document()
+    for symbol, markdown_text in sections:
+        doc.add_heading(symbol, level=1)
+        legacy_add_markdown_to_word(doc, markdown_text)
+    return doc
+
+
+def new_ratings(sections):
+    doc = Document()
+    for symbol, markdown_text in sections:
+        doc.add_heading(symbol, level=1)
+        add_markdown_to_word(doc, markdown_text)
+    return doc
+
+
+def best_time(fn, arg, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        doc = fn(arg)
+        doc.save(io.BytesIO())
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown to docx rendering")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--sections", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    portfolio = portfolio_table_markdown(args.rows)
+    sections = [(symbol, ratings_section_markdown(symbol)) for symbol in fake_symbols(args.sections)[:args.sections]]
+
+    print(f"{'case':<28} {'legacy':>9} {'renderer':>9} {'speedup':>8}")
+    for name, legacy, new, arg in [(f"portfolio table ({args.rows} rows)", legacy_portfolio, new_portfolio, portfolio),
+                                   (f"ratings report ({args.sections} sections)", legacy_ratings, new_ratings, sections)]:
+        legacy_time = best_time(legacy, arg, args.repeat)
+        new_time = best_time(new, arg, args.repeat)
+        print(f"{name:<28} {legacy_time:>8.3f}s {new_time:>8.3f}s {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
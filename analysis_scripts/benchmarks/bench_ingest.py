@@ -0,0 +1,91 @@
+"""
+Broker CSV Ingestion Benchmark
+Compares the notebook's original read_csv_to_numpy + cleaning cells with
+officeagents.ingest on synthetic 10k and 100k row Fidelity exports
+
+Usage (from analysis_scripts):
+    python benchmarks/bench_ingest.py [--rows 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from officeagents.ingest import load_positions  # noqa: E402
+from synthetic import write_fidelity_export  # noqa: E402
+
+
+def legacy_ingest(file_path):
+    """The original notebook path: full parse, footer search over every cell, NumPy copy, str chains"""
+    df = pd.read_csv(file_path)
+    mask = df.astype(str).apply(lambda x: x.str.lower().str.contains('the data and information in this spreadsheet', na=False)).any(axis=1)
+    if mask.any():
+        df = df.iloc[:mask.idxmax()]
+    numpy_data = df.to_numpy()
+
+    df['Symbol'] = df['Symbol'].str.replace('*', '')
+    numpy_data[:, 2] = [str(x).replace('*', '') for x in numpy_data[:, 2]]
+    df.columns = df.columns.str.replace('[/\'\"\\:]', ' ', regex=True)
+    for col, value in [('Quantity', 1), ('Last Price', 1), ('Last Price Change', 0),
+                       ('Today s Gain Loss Dollar', 0), ('Today s Gain Loss Percent', 0),
+                       ('Total Gain Loss Dollar', 0), ('Total Gain Loss Percent', 0), ('Percent Of Account', 0),
+                       ('Cost Basis Total', 0), ('Average Cost Basis', 0), ('Description', 'Pending'),
+                       ('Type', 'Pending')]:
+        df[col] = df[col].fillna(value)
+    df['Account Number'] = df['Account Number'].astype(str)
+    for col in ['Last Price', 'Last Price Change', 'Today s Gain Loss Dollar', 'Total Gain Loss Dollar',
+                'Cost Basis Total', 'Average Cost Basis', 'Current Value']:
+        df[col] = pd.to_numeric(df[col].str.replace('[$,]', '', regex=True), errors='coerce')
+    for col in ['Today s Gain Loss Percent', 'Total Gain Loss Percent', 'Percent Of Account']:
+        df[col] = df[col].astype(str)
+        df[col] = df[col].str.replace('%', '')
+        df[col] = df[col].str.replace('[$,]', '', regex=True)
+        df[col] = df[col].str.replace('--', '0')
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        df[col] = df[col] / 100
+        df[col] = df[col].round(3)
+    return df.sort_values(by='Total Gain Loss Percent', ascending=False).reset_index(drop=True)
+
+
+def measure(fn, path, repeat):
+    """Best wall time over repeat runs and peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    result = fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark broker CSV ingestion")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'path':<8} {'time':>9} {'peak mem':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = write_fidelity_export(os.path.join(tmp, f"Portfolio_Positions_{rows}.csv"), rows)
+            legacy_time, legacy_mem, legacy = measure(legacy_ingest, path, args.repeat)
+            new_time, new_mem, new = measure(load_positions, path, args.repeat)
+            assert len(legacy) == len(new), (len(legacy), len(new))
+            print(f"{rows:>8} {'legacy':<8} {legacy_time:>8.3f}s {legacy_mem / 2**20:>8.1f}MB")
+            print(f"{rows:>8} {'ingest':<8} {new_time:>8.3f}s {new_mem / 2**20:>8.1f}MB "
+                  f"{legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Offline Pipeline Benchmark
+Runs every pipeline stage against local stand-ins (fake_servers.py): an OpenAI-compatible
+chat server with configurable latency and 429 injection, a fake SEC EDGAR, simulated
+quote / history sources and synthetic Fidelity exports at several sizes. Reports per-stage
+and end-to-end timings; no network or API keys needed.
+
+Usage (from analysis_scripts):
+    python benchmarks/bench_pipeline.py [--sizes 1000,10000,50000] [--equities 20]
+        [--llm-latency 0.5] [--rate-limit-every 7] [--output results.json]
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Every cache (LLM answers, SEC ticker file, snapshots, price history) goes to a throwaway folder
+WORK_DIR = tempfile.mkdtemp(prefix="officeagents-bench-")
+os.environ["Cache_dir"] = os.path.join(WORK_DIR, "cache")
+
+from docx import Document  # noqa: E402
+
+from fake_servers import (FakeChatServer, FakeSecServer, SimulatedQuoteSource,  # noqa: E402
+                          SyntheticHistorySource)
+from synthetic import fake_symbols, ratings_section_markdown, write_fidelity_export  # noqa: E402
+from officeagents.batch_prompts import chat_batched  # noqa: E402
+from officeagents.docx_render import add_markdown_to_word  # noqa: E402
+from officeagents.ingest import load_positions  # noqa: E402
+from officeagents.llm import PerplexityClient  # noqa: E402
+from officeagents.pipeline import load_settings, run_stages  # noqa: E402
+from officeagents.prices import refresh_prices, quotable_mask  # noqa: E402
+from officeagents.sec import CikResolver, SecFilingDownloader  # noqa: E402
+
+PROMPT = "give the latest analyst rating changes as a markdown table."
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def bench_ingest(sizes):
+    rows = []
+    df = None
+    for size in sizes:
+        path = write_fidelity_export(os.path.join(WORK_DIR, "exports", f"Portfolio_Positions_{size}.csv"), size)
+        seconds, df = timed(lambda: load_positions(path))
+        rows.append((f"ingest {size:,} rows", seconds, f"{size / seconds:,.0f} rows/s"))
+    return rows, df
+
+
+def bench_prices(df, latency):
+    symbols = df.loc[quotable_mask(df), 'Symbol'].astype(str).str.strip().unique()
+    source = SimulatedQuoteSource({s: 100.0 for s in symbols}, latency=latency)
+    seconds, (_, report) = timed(lambda: refresh_prices(df, source=source))
+    return [(f"price refresh {len(symbols)} symbols", seconds,
+             f"{source.requests} bulk requests, {report['updated']:,} rows updated")]
+
+
+def bench_sec(sec, tickers):
+    output_dir = os.path.join(WORK_DIR, "sec")
+    before = sec.requests
+    seconds, results = timed(lambda: SecFilingDownloader(user_agent="bench bench@example.com").download_all(
+        CikResolver(user_agent="bench bench@example.com").resolve_many(tickers), output_dir))
+    saved = sum(f['status'] == 'saved' for filings in results.values() for f in filings)
+    return [(f"SEC fetch {len(tickers)} tickers", seconds, f"{saved} filings, {sec.requests - before} requests")]
+
+
+def bench_llm(chat, tickers, concurrency, batch_size):
+    client = PerplexityClient(api_key="bench", base_url=chat.url, max_concurrency=concurrency)
+    rows = []
+    limited = chat.rate_limited
+    seconds, results = timed(lambda: client.chat_many([f"For the equity {t} {PROMPT}" for t in tickers]))
+    failed = sum(r['error'] is not None for r in results)
+    rows.append((f"LLM fan-out {len(tickers)} prompts", seconds,
+                 f"{concurrency} concurrent, {chat.rate_limited - limited} x 429, {failed} failed"))
+
+    limited = chat.rate_limited
+    seconds, results = timed(lambda: chat_batched(client, tickers, PROMPT, model="sonar-pro", batch_size=batch_size,
+                                                  stream=True))
+    ttfts = sorted(r['ttft'] for r in results if r.get('ttft') is not None)
+    rows.append((f"LLM batched+streamed ({batch_size}/request)", seconds,
+                 f"median TTFT {ttfts[len(ttfts) // 2]:.2f}s, {chat.rate_limited - limited} x 429" if ttfts else ""))
+    return rows
+
+
+def bench_docx(tickers):
+    def render():
+        doc = Document()
+        for ticker in tickers:
+            doc.add_heading(ticker, level=1)
+            add_markdown_to_word(doc, ratings_section_markdown(ticker))
+        doc.save(io.BytesIO())
+    seconds, _ = timed(render)
+    return [(f"docx render {len(tickers)} sections", seconds, "")]
+
+
+def bench_end_to_end(chat, tickers, export_rows, args):
+    """The CLI stages (python -m officeagents ingest sec index reports) against the stand-ins"""
+    root = os.path.join(WORK_DIR, "e2e")
+    os.environ["Cache_dir"] = os.path.join(root, "cache")  # Cold caches: no answers from the sections above
+    write_fidelity_export(os.path.join(root, "source", "Fidelity", "Portfolio_Positions_e2e.csv"), export_rows)
+    files = {'equity_list_file': "equities.txt", 'prompt_individual_file': "individual.txt",
+             'prompt_portfolio_file': "portfolio.txt", 'prompt_ratings_change_file': "ratings.txt"}
+    contents = {'equity_list_file': "\n".join(tickers), 'prompt_individual_file': PROMPT,
+                'prompt_portfolio_file': PROMPT, 'prompt_ratings_change_file': PROMPT}
+    settings = load_settings()
+    for key, name in files.items():
+        settings[key] = os.path.join(root, name)
+        with open(settings[key], 'w') as f:
+            f.write(contents[key])
+
+    prices = SimulatedQuoteSource({s: 100.0 for s in fake_symbols(max(50, export_rows // 20))},
+                                  latency=args.quote_latency)
+    settings.update({
+        'source_files_dir': os.path.join(root, "source"), 'broker': "Fidelity",
+        'portfolio_output_dir': os.path.join(root, "out"), 'output_dir_sec_filings': os.path.join(root, "sec"),
+        'output_dir_individual': os.path.join(root, "individual"), 'output_dir_portfolio': os.path.join(root, "out"),
+        'perplexity_api_key': "bench", 'perplexity_base_url': chat.url, 'user_agent': "bench bench@example.com",
+        'max_concurrency': args.concurrency, 'ratings_batch_size': args.batch_size,
+        'quote_source': prices, 'history_source': SyntheticHistorySource(latency=args.quote_latency / 4),
+    })
+    seconds, results = timed(lambda: run_stages(["ingest", "sec", "index", "reports"], settings))
+    rows = [(f"  stage {stage}", result['seconds'], "ok" if result['ok'] else f"FAILED: {result['error']}")
+            for stage, result in results.items()]
+    return [(f"end-to-end ({export_rows:,} rows, {len(tickers)} equities)", seconds, "")] + rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Export sizes (rows) for ingestion")
+    parser.add_argument("--equities", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per LLM answer")
+    parser.add_argument("--rate-limit-every", type=int, default=7, help="Every Nth LLM request gets a 429 (0 = never)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--sec-latency", type=float, default=0.02, help="Seconds per SEC request")
+    parser.add_argument("--quote-latency", type=float, default=0.2, help="Seconds per bulk quote request")
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--output", help="Also write the timings to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    tickers = fake_symbols(args.equities, seed=11)[:args.equities]
+    rows = []
+    chat = FakeChatServer(latency=args.llm_latency, rate_limit_every=args.rate_limit_every)
+    sec = FakeSecServer(tickers, latency=args.sec_latency)
+    os.environ["SEC_www_url"] = os.environ["SEC_data_url"] = sec.url
+    try:
+        with chat, sec:
+            ingest_rows, df = bench_ingest(sizes)
+            rows += ingest_rows
+            rows += bench_prices(df, args.quote_latency)
+            rows += bench_sec(sec, tickers)
+            rows += bench_llm(chat, tickers, args.concurrency, args.batch_size)
+            rows += bench_docx(tickers * 5)
+            if not args.skip_e2e:
+                rows += bench_end_to_end(chat, tickers, sizes[len(sizes) // 2], args)
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    print(f"\n{'stage':<44} {'seconds':>8}  detail")
+    for name, seconds, detail in rows:
+        print(f"{name:<44} {seconds:>8.2f}  {detail}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'stages': [{'stage': name.strip(), 'seconds': round(seconds, 4),
+                                                       'detail': detail} for name, seconds, detail in rows]},
+                      f, indent=1)
+        print(f"📝 Timings written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
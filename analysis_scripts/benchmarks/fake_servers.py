@@ -0,0 +1,248 @@
+"""
+Local API Stand-ins
+In-process HTTP servers that answer like the OpenAI-compatible chat API (Perplexity) and
+SEC EDGAR (www.sec.gov + data.sec.gov), plus simulated quote and price-history sources,
+so the pipeline can be benchmarked reproducibly with no network
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from officeagents.prices import StaticQuoteSource
+from synthetic import portfolio_table_markdown, ratings_section_markdown
+
+BATCH_MARKER_RE = re.compile(r"=== TICKER: ([A-Za-z0-9.\-^]+) ===")
+PORTFOLIO_PROMPT_RE = re.compile(r"^For the equities ((?:[A-Z0-9.\-^]+, )*[A-Z0-9.\-^]+)")
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer:
+    """Serves a handler class on 127.0.0.1 (free port) from a daemon thread; use as a context manager"""
+
+    def __init__(self, handler):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def answer_for(prompt):
+    """Plausible markdown for the pipeline's prompt shapes (batched, portfolio, single equity)"""
+    tickers = BATCH_MARKER_RE.findall(prompt)
+    if tickers:
+        return "\n\n".join(f"=== TICKER: {t} ===\n{ratings_section_markdown(t)}" for t in tickers)
+    match = PORTFOLIO_PROMPT_RE.match(prompt)
+    if match:
+        tickers = match.group(1).split(", ")
+        return portfolio_table_markdown(len(tickers), symbols=tickers)
+    match = re.match(r"For the equity (\S+)", prompt)
+    return ratings_section_markdown(match.group(1) if match else "XYZ")
+
+
+class FakeChatServer(StubServer):
+    """
+    POST /chat/completions like OpenAI / Perplexity, streaming (SSE) or not.
+
+    Args:
+        latency (float): Seconds per answer (streamed answers spread it over the chunks,
+            with the first token after ttft_share of it)
+        rate_limit_every (int): Answer every Nth request with 429 + Retry-After (0 = never)
+    """
+
+    def __init__(self, latency=0.5, chunks=20, ttft_share=0.3, rate_limit_every=0, retry_after=0.05):
+        super().__init__(self._handler())
+        self.latency = latency
+        self.chunks = chunks
+        self.ttft_share = ttft_share
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.rate_limited = 0
+
+    def _handler(self):
+        class Handler(_QuietHandler):
+            def do_POST(self):
+                stub = self.server.stub
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                number = stub.count_request()
+                if stub.rate_limit_every and number % stub.rate_limit_every == 0:
+                    stub.rate_limited += 1
+                    self.send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error"}},
+                                   {"Retry-After": str(stub.retry_after)})
+                    return
+                text = answer_for(request["messages"][-1]["content"])
+                model = request.get("model", "stub")
+                if request.get("stream"):
+                    stub.stream(self, text, model)
+                else:
+                    time.sleep(stub.latency)
+                    self.send_json(200, {
+                        "id": f"stub-{number}", "object": "chat.completion", "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                     "finish_reason": "stop"}],
+                        "usage": {"prompt_tokens": 100, "completion_tokens": len(text) // 4,
+                                  "total_tokens": 100 + len(text) // 4},
+                    })
+        return Handler
+
+    def stream(self, handler, text, model):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.end_headers()
+        time.sleep(self.latency * self.ttft_share)
+        size = max(1, len(text) // self.chunks + 1)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        gap = self.latency * (1 - self.ttft_share) / max(1, len(pieces))
+        for i, piece in enumerate(pieces):
+            chunk = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                     "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            if i == len(pieces) - 1:
+                chunk["usage"] = {"prompt_tokens": 100, "completion_tokens": len(text) // 4,
+                                  "total_tokens": 100 + len(text) // 4}
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            handler.wfile.flush()
+            if i < len(pieces) - 1:
+                time.sleep(gap)
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
+
+
+def fake_cik(index):
+    return 1000000 + index
+
+
+class FakeSecServer(StubServer):
+    """
+    The three EDGAR endpoints the pipeline uses, for the given tickers:
+    /files/company_tickers_exchange.json, /submissions/CIK##########.json and
+    /Archives/edgar/data/<cik>/<accession>/<document> (an HTML filing of document_kb KB).
+    Serve it as both SEC_www_url and SEC_data_url.
+    """
+
+    def __init__(self, tickers, latency=0.02, document_kb=200):
+        super().__init__(self._handler())
+        self.tickers = list(tickers)
+        self.latency = latency
+        self.document_kb = document_kb
+        self._document = None
+
+    def document(self):
+        if self._document is None:
+            paragraph = ("<p>Our business is subject to risks and uncertainties described in Item 1A. "
+                         "Risk Factors and discussed in Management's Discussion and Analysis.</p>\n")
+            body = ("<html><body>\n<h2>Item 1A. Risk Factors</h2>\n"
+                    + paragraph * max(1, self.document_kb * 1024 // 2 // len(paragraph))
+                    + "<h2>Item 7. Management's Discussion and Analysis</h2>\n"
+                    + paragraph * max(1, self.document_kb * 1024 // 2 // len(paragraph))
+                    + "</body></html>\n")
+            self._document = body.encode('utf-8')
+        return self._document
+
+    def submissions(self, cik):
+        forms = ["8-K", "10-Q", "8-K", "10-K"]
+        return {"cik": str(cik), "filings": {"recent": {
+            "form": forms,
+            "accessionNumber": [f"0000{cik}-26-{i:06d}" for i in range(len(forms))],
+            "filingDate": [f"2026-{10 - i:02d}-01" for i in range(len(forms))],
+            "primaryDocument": [f"doc{i}.htm" for i in range(len(forms))],
+        }}}
+
+    def _handler(self):
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                stub = self.server.stub
+                stub.count_request()
+                time.sleep(stub.latency)
+                if self.path.startswith("/files/company_tickers_exchange.json"):
+                    self.send_json(200, {"fields": ["cik", "name", "ticker", "exchange"],
+                                         "data": [[fake_cik(i), f"{t} Holdings Inc", t, "Nasdaq"]
+                                                  for i, t in enumerate(stub.tickers)]},
+                                   {"ETag": '"stub"'})
+                    return
+                match = re.match(r"^/submissions/CIK(\d{10})\.json$", self.path)
+                if match:
+                    self.send_json(200, stub.submissions(int(match.group(1))))
+                    return
+                if self.path.startswith("/Archives/edgar/data/"):
+                    body = stub.document()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_json(404, {"error": "not found"})
+        return Handler
+
+
+class SimulatedQuoteSource(StaticQuoteSource):
+    """StaticQuoteSource whose every bulk request takes `latency` seconds"""
+
+    def __init__(self, prices, latency=0.2, fail_symbols=()):
+        super().__init__(prices, fail_symbols)
+        self.latency = latency
+
+    def fetch(self, symbols):
+        time.sleep(self.latency)
+        return super().fetch(symbols)
+
+
+class SyntheticHistorySource:
+    """Random-walk daily bars (business days), `latency` seconds per symbol request"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def fetch(self, symbol, start, end):
+        time.sleep(self.latency)
+        dates = pd.bdate_range(start, end)
+        rng = np.random.default_rng(random.Random(symbol).randrange(2 ** 32))
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        frame = pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                              'adj_close': close, 'volume': rng.integers(1e5, 1e7, len(dates)).astype(float)},
+                             index=pd.DatetimeIndex(dates, name="date"))
+        return frame
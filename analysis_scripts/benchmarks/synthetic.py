@@ -0,0 +1,103 @@
+"""
+Synthetic Data
+Fake but realistically formatted inputs for the benchmarks (no real account data)
+"""
+
+import os
+import random
+
+FIDELITY_HEADER = ("Account Number,Account Name,Symbol,Description,Quantity,Last Price,Last Price Change,"
+                   "Current Value,Today's Gain/Loss Dollar,Today's Gain/Loss Percent,Total Gain/Loss Dollar,"
+                   "Total Gain/Loss Percent,Percent Of Account,Cost Basis Total,Average Cost Basis,Type,")
+
+FIDELITY_FOOTER = (
+    '\n"The data and information in this spreadsheet is provided to you solely for your use and is not for '
+    'distribution. The data and information in this spreadsheet is provided for informational purposes only."\n'
+    '\n"Brokerage services are provided by Fidelity Brokerage Services LLC (FBS), 900 Salem Street, Smithfield, '
+    'RI 02917."\n'
+    '\n"Date downloaded 10/17/2026 5:03 PM ET"\n'
+)
+
+
+def fake_symbols(count, seed=7):
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    symbols = set()
+    while len(symbols) < count:
+        symbols.add("".join(rng.choice(letters) for _ in range(rng.randint(2, 4))))
+    return sorted(symbols)
+
+
+def _money(value, signed=False):
+    sign = "-" if value < 0 else ("+" if signed else "")
+    return f"{sign}${abs(value):.2f}"
+
+
+def _percent(value):
+    return f"{'-' if value < 0 else '+'}{abs(value):.2f}%"
+
+
+def write_fidelity_export(path, rows, seed=7, accounts=5):
+    """Write a Portfolio_Positions-style CSV with `rows` positions, sweeps, pending rows and the footer"""
+    rng = random.Random(seed)
+    symbols = fake_symbols(max(50, rows // 20), seed)
+    lines = [FIDELITY_HEADER]
+    for i in range(rows):
+        account = f"Z{10000000 + i % accounts}"
+        name = f"Account {i % accounts}"
+        kind = rng.random()
+        if kind < 0.02:
+            lines.append(f'{account},{name},SPAXX**,HELD IN MONEY MARKET,,,,{_money(rng.uniform(10, 9e4))},,,,,'
+                         f'{rng.uniform(0, 5):.2f}%,,,Cash,')
+            continue
+        if kind < 0.03:
+            lines.append(f'{account},{name},Pending Activity,,,,,{_money(rng.uniform(-500, 500))},,,,,,,,,')
+            continue
+        qty = round(rng.uniform(1, 2000), 3)
+        price = rng.uniform(5, 900)
+        change = rng.uniform(-5, 5)
+        basis = price * rng.uniform(0.5, 1.5)
+        value = qty * price
+        lines.append(",".join([
+            account, name, rng.choice(symbols) + ("*" if rng.random() < 0.01 else ""),
+            f'"{rng.choice(symbols)} INC COM"', f"{qty}", _money(price), _money(change, True), _money(value),
+            _money(change * qty, True), _percent(change / price * 100), _money(value - basis * qty, True),
+            _percent((price / basis - 1) * 100) if rng.random() > 0.01 else "--", f"{rng.uniform(0, 10):.2f}%",
+            _money(basis * qty), _money(basis), "Margin" if rng.random() < 0.3 else "Cash", "",
+        ]))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("\n".join(lines) + "\n" + FIDELITY_FOOTER)
+    return path
+
+
+INDUSTRIES = ["Technology", "Healthcare", "Financials", "Energy", "Industrials", "Consumer", "Utilities"]
+RATINGS = ["Strong Buy", "Buy", "Hold", "Sell"]
+
+
+def portfolio_table_markdown(rows, seed=7, symbols=None):
+    """LLM-style portfolio answer: intro, one big markdown table with bold cells, notes"""
+    rng = random.Random(seed)
+    lines = ["## Portfolio Outlook", "", "Below is the **summary table** for the requested equities:", "",
+             "| Ticker | Company | Industry | Current Consensus Analyst Rating | Price Target | Upside | Notes |",
+             "|---|---|---|---|---|---|---|"]
+    for symbol in (symbols or fake_symbols(rows, seed))[:rows]:
+        lines.append(f"| **{symbol}** | {symbol} Holdings Inc | {rng.choice(INDUSTRIES)} | {rng.choice(RATINGS)} | "
+                     f"${rng.uniform(10, 900):.2f} | {rng.uniform(-20, 60):.1f}% | *Watch* next earnings call |")
+    lines += ["", "### Notes", "- Ratings reflect the last 30 days", "- **Sources**: analyst notes"]
+    return "\n".join(lines)
+
+
+def ratings_section_markdown(symbol, seed=7):
+    """LLM-style ratings change answer for one equity"""
+    rng = random.Random(f"{seed}-{symbol}")
+    lines = [f"### {symbol} Rating Changes", "",
+             f"Analysts made **{rng.randint(1, 5)} changes** to `{symbol}` in the last 30 days.", "",
+             "| Date | Firm | Action | From | To | Price Target |", "|---|---|---|---|---|---|"]
+    for _ in range(5):
+        lines.append(f"| 2026-10-{rng.randint(1, 28):02d} | Firm {rng.randint(1, 40)} | "
+                     f"{rng.choice(['Upgrade', 'Downgrade', 'Initiate'])} | {rng.choice(RATINGS)} | "
+                     f"{rng.choice(RATINGS)} | ${rng.uniform(10, 900):.0f} |")
+    lines += ["", "Key takeaways:", "- Consensus moved **higher**", "- Estimates revised after guidance",
+              "1. Watch margins", "2. Watch buybacks"]
+    return "\n".join(lines)
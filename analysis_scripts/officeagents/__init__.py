@@ -0,0 +1,4 @@
+"""
+OfficeAgents analysis helpers
+Reusable building blocks for the analysis notebooks (SEC filings, LLM clients, ...)
+"""
@@ -0,0 +1,37 @@
+"""
+Command line entry point (run from analysis_scripts so .env and relative paths resolve):
+
+    python -m officeagents ingest
+    python -m officeagents sec index reports
+    python -m officeagents reports --only ratings,portfolio
+"""
+
+import argparse
+import os
+import sys
+
+from .pipeline import REPORTS, STAGES, load_settings, run_stages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="officeagents", description="Run OfficeAgents pipeline stages headless")
+    parser.add_argument("stages", nargs="+", choices=STAGES, help="Stages to run, in order")
+    parser.add_argument("--only", default=",".join(REPORTS),
+                        help=f"Reports to write for the reports stage (comma separated: {', '.join(REPORTS)})")
+    parser.add_argument("--env", default=os.path.join(os.getcwd(), ".env"), help="Path of the .env file")
+    args = parser.parse_args(argv)
+
+    reports = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(reports) - set(REPORTS)
+    if unknown:
+        parser.error(f"unknown reports: {', '.join(sorted(unknown))}")
+
+    from dotenv import load_dotenv
+    load_dotenv(args.env)
+
+    results = run_stages(args.stages, load_settings(), reports)
+    return 0 if all(result['ok'] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Batched Prompts
+Pack several tickers into one request that answers with a delimited section per
+ticker, split the answer back apart and re-query only the tickers that came back
+missing or malformed
+"""
+
+import re
+import time
+
+# Each section of a batched answer starts with this line, e.g. "=== TICKER: AAPL ==="
+SECTION_MARKER = "=== TICKER: {ticker} ==="
+SECTION_RE = re.compile(r"^\s*[#*>\s]*=+\s*TICKER:\s*([A-Za-z0-9.\-^]+)\s*=+\s*[*]*\s*$", re.MULTILINE)
+
+# Sections shorter than this are treated as malformed and re-queried on their own
+MIN_SECTION_CHARS = 40
+
+
+def build_batch_prompt(tickers, template):
+    """One prompt asking for the template's analysis for each ticker, in marked sections"""
+    markers = "\n".join(SECTION_MARKER.format(ticker=t) for t in tickers)
+    return (
+        f"For each of the equities {', '.join(tickers)} separately: {template}\n\n"
+        f"Answer with exactly one section per equity, in the order listed. Start each section with "
+        f"its marker line on its own, exactly as written below, followed by that equity's full "
+        f"answer in markdown. Do not combine equities into one table or section.\n{markers}"
+    )
+
+
+def split_batch_response(text, tickers):
+    """
+    Split a batched answer into {ticker: section markdown or None}.
+    Sections for tickers that were not asked for are ignored.
+    """
+    wanted = {t.upper(): t for t in tickers}
+    sections = {t: None for t in tickers}
+    matches = list(SECTION_RE.finditer(text or ""))
+    for i, match in enumerate(matches):
+        ticker = wanted.get(match.group(1).upper())
+        if ticker is None:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        if len(body) >= MIN_SECTION_CHARS and sections[ticker] is None:
+            sections[ticker] = body
+    return sections
+
+
+def chunk(items, size):
+    return [items[i:i + size] for i in range(0, len(items), max(1, size))]
+
+
+def chat_batched(client, tickers, template, model, batch_size=5, single_prompt=None, on_result=None,
+                 stream=False):
+    """
+    Run template for every ticker using one request per batch_size tickers.
+
+    Args:
+        client: PerplexityClient (anything with chat_many)
+        tickers (list): Equities in report order
+        template (str): Per-equity prompt template
+        batch_size (int): Tickers per request; 1 disables batching
+        single_prompt (callable): single_prompt(ticker) -> prompt for individual re-queries,
+            default "For the equity {ticker} {template}"
+        on_result (callable): Optional on_result(ticker, result), called as soon as a
+            ticker's section is available (failed tickers are reported after their retry)
+        stream (bool): Stream the answers (see PerplexityClient.chat_stream)
+
+    Returns:
+        list of dicts in ticker order: {'text', 'error', 'seconds', 'batched'}
+    """
+    single_prompt = single_prompt or (lambda ticker: f"For the equity {ticker} {template}")
+    results = {}
+
+    batches = chunk(list(tickers), batch_size) if batch_size > 1 else []
+    if batches:
+        def split_batch(index, answer):
+            batch = batches[index]
+            sections = split_batch_response(answer['text'], batch) if answer['error'] is None else {}
+            for ticker in batch:
+                if sections.get(ticker):
+                    results[ticker] = {**answer, 'text': sections[ticker], 'batched': True}
+                    if on_result:
+                        on_result(ticker, results[ticker])
+
+        client.chat_many([build_batch_prompt(batch, template) for batch in batches], model=model,
+                         on_result=split_batch, stream=stream)
+
+    retry = [t for t in tickers if t not in results]
+    if batches and retry:
+        print(f"🔁 Re-querying {len(retry)} equities individually: {', '.join(retry)}")
+
+    def add_single(index, answer):
+        results[retry[index]] = {**answer, 'batched': False}
+        if on_result:
+            on_result(retry[index], results[retry[index]])
+
+    t0 = time.time()
+    client.chat_many([single_prompt(t) for t in retry], model=model, on_result=add_single, stream=stream)
+    if retry:
+        print(f"Individual requests: {len(retry)} in {time.time() - t0:.1f}s")
+    return [results[ticker] for ticker in tickers]
@@ -0,0 +1,224 @@
+"""
+Multi-Broker Consolidation
+Discovers the latest positions export in every broker folder, parses them in parallel
+through per-broker parsers (Fidelity, Schwab) and combines them into one holdings table
+"""
+
+import csv
+import fnmatch
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .ingest import detect_encoding, load_positions, parse_numeric
+from .snapshots import file_fingerprint
+
+# Columns every parser returns (Broker is added by the loader)
+HOLDING_COLUMNS = ['Account Number', 'Account Name', 'Symbol', 'Description', 'Quantity', 'Last Price',
+                   'Current Value', 'Cost Basis Total', 'Type']
+
+# name -> {'pattern': export filename pattern, 'parse': parse(path) -> DataFrame}
+BROKER_PARSERS = {}
+
+
+def register_parser(name, pattern):
+    """
+    Decorator registering parse(path) -> DataFrame with HOLDING_COLUMNS for a broker.
+    The broker folder name selects the parser (case-insensitive); folders without a
+    registered name are matched by export filename pattern.
+
+    Parsers must live in an importable module (not a notebook cell), because the
+    exports are parsed in worker processes.
+    """
+    def decorator(parse):
+        BROKER_PARSERS[name.lower()] = {'pattern': pattern, 'parse': parse}
+        return parse
+    return decorator
+
+
+@register_parser("fidelity", "Portfolio_Positions*.csv")
+def parse_fidelity(path):
+    return load_positions(path).reindex(columns=HOLDING_COLUMNS)
+
+
+# Schwab header (short or "Short (Long)" form, after removing the parenthesis) -> holding column
+SCHWAB_COLUMNS = {
+    'Symbol': 'Symbol',
+    'Description': 'Description',
+    'Quantity': 'Quantity',
+    'Price': 'Last Price',
+    'Market Value': 'Current Value',
+    'Cost Basis': 'Cost Basis Total',
+    'Security Type': 'Type',
+}
+SCHWAB_ACCOUNT_RE = re.compile(r'^(?:Positions for account\s+)?(?P<name>.*?)\s*(?P<number>\.\.\.\s*\d+|[A-Z]*\d[\d-]+)'
+                               r'(?:\s+as of .*)?$')
+SCHWAB_NOT_POSITIONS = ("Account Total", "Cash & Cash Investments")
+
+
+def _schwab_column(header):
+    match = re.fullmatch(r'.*\((.*)\)\s*', header)
+    return SCHWAB_COLUMNS.get((match.group(1) if match else header).strip())
+
+
+@register_parser("schwab", "*-Positions-*.csv")
+def parse_schwab(path):
+    """
+    Schwab "Positions" export: a title line naming the account, then a header row, then one
+    row per position up to "Account Total". All-accounts exports repeat this per account.
+    """
+    rows, account, columns = [], (None, None), None
+    with open(path, 'r', encoding=detect_encoding(path), newline='') as f:
+        for cells in csv.reader(f):
+            cells = [cell.strip() for cell in cells]
+            values = [cell for cell in cells if cell]
+            if not values:
+                continue
+            if cells[0] == 'Symbol':
+                columns = [_schwab_column(cell) for cell in cells]
+            elif len(values) == 1:
+                match = SCHWAB_ACCOUNT_RE.match(values[0])
+                account = (match['name'] or None, match['number']) if match else (values[0], values[0])
+                columns = None
+            elif columns and cells[0] != SCHWAB_NOT_POSITIONS[0]:
+                row = {column: cell for column, cell in zip(columns, cells) if column}
+                row['Account Name'], row['Account Number'] = account
+                if row.get('Symbol') in SCHWAB_NOT_POSITIONS:
+                    row['Description'], row['Symbol'] = row['Symbol'], None  # Cash sweep, like Fidelity's Pending rows
+                rows.append(row)
+
+    df = pd.DataFrame(rows).reindex(columns=HOLDING_COLUMNS)
+    for column in ('Quantity', 'Last Price', 'Current Value', 'Cost Basis Total'):
+        df[column] = parse_numeric(df[column].fillna('').astype(str))
+    return df
+
+
+def parser_for(folder_name, filename=None):
+    """Registered parser name for a broker folder (by name, else by export filename), or None"""
+    if folder_name.lower() in BROKER_PARSERS:
+        return folder_name.lower()
+    if filename:
+        return next((name for name, parser in BROKER_PARSERS.items()
+                     if fnmatch.fnmatch(filename, parser['pattern'])), None)
+    return None
+
+
+def discover_exports(source_dir):
+    """
+    Latest export per broker folder under source_dir.
+
+    Returns:
+        list of dicts: broker (folder name), parser, path, mtime
+    """
+    exports = []
+    with os.scandir(source_dir) as folders:
+        for folder in sorted(folders, key=lambda e: e.name):
+            if not folder.is_dir():
+                continue
+            with os.scandir(folder.path) as entries:
+                files = [e for e in entries if e.is_file()]
+            candidates = []
+            for entry in files:
+                parser = parser_for(folder.name, entry.name)
+                if parser and fnmatch.fnmatch(entry.name, BROKER_PARSERS[parser]['pattern']):
+                    candidates.append((entry.stat().st_mtime, entry.path, parser))
+            if candidates:
+                mtime, path, parser = max(candidates)
+                exports.append({'broker': folder.name, 'parser': parser, 'path': path, 'mtime': mtime})
+    return exports
+
+
+def _parse_export(export):
+    """Worker entry point: parse one export and tag it with its broker"""
+    df = BROKER_PARSERS[export['parser']]['parse'](export['path'])
+    df = df.reindex(columns=HOLDING_COLUMNS)
+    df.insert(0, 'Broker', export['broker'])
+    return df
+
+
+def load_all_brokers(source_dir, max_workers=None):
+    """
+    Parse every broker's latest export in parallel (one process per export, up to
+    max_workers / CPU count) and return the combined holdings.
+
+    The same export found in two folders is parsed once, and an account that appears in
+    several exports keeps only the rows of the newest one. Rows are never merged by value,
+    so identical lots and Pending rows stay separate positions.
+
+    Returns:
+        (holdings DataFrame, list of {'broker', 'path', 'rows' or 'error' or 'duplicate_of'})
+    """
+    exports, duplicates, seen = [], [], {}
+    for export in discover_exports(source_dir):
+        fingerprint = file_fingerprint(export['path'])
+        if fingerprint in seen:
+            duplicates.append({'broker': export['broker'], 'path': export['path'], 'duplicate_of': seen[fingerprint]})
+        else:
+            seen[fingerprint] = export['path']
+            exports.append(export)
+    if not exports:
+        return pd.DataFrame(columns=['Broker'] + HOLDING_COLUMNS), duplicates
+
+    workers = min(len(exports), max_workers or os.cpu_count() or 1)
+    if workers == 1:
+        results = []
+        for export in exports:
+            try:
+                results.append((export, _parse_export(export), None))
+            except Exception as e:
+                results.append((export, None, e))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(export, executor.submit(_parse_export, export)) for export in exports]
+            results = []
+            for export, future in futures:
+                try:
+                    results.append((export, future.result(), None))
+                except Exception as e:
+                    results.append((export, None, e))
+
+    frames, report, owner = {}, [], {}
+    # Newest export first, so it claims the accounts it shares with older exports
+    for export, df, error in sorted(results, key=lambda result: result[0]['mtime'], reverse=True):
+        if error is not None:
+            print(f"❌ Could not parse {export['broker']} export {os.path.basename(export['path'])}: {error}")
+            report.append({'broker': export['broker'], 'path': export['path'], 'error': str(error)})
+            continue
+        accounts = df['Account Number'].dropna().unique()
+        stale = [account for account in accounts if account in owner]
+        if stale:
+            print(f"⏭️  {export['broker']} {os.path.basename(export['path'])}: skipping accounts "
+                  f"{', '.join(map(str, stale))}, taken from the newer {os.path.basename(owner[stale[0]])}")
+            df = df[~df['Account Number'].isin(stale)]
+        owner.update({account: export['path'] for account in accounts if account not in owner})
+        frames[export['path']] = df
+        report.append({'broker': export['broker'], 'path': export['path'], 'rows': len(df)})
+
+    order = {export['path']: index for index, export in enumerate(exports)}
+    report.sort(key=lambda item: order[item['path']])
+    frames = [frames[item['path']] for item in report if item['path'] in frames]
+    holdings = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Broker'] + HOLDING_COLUMNS)
+    return holdings.reset_index(drop=True), report + duplicates
+
+
+def aggregate_by_symbol(holdings):
+    """
+    One row per symbol across all brokers and accounts: total quantity, value and cost,
+    number of accounts holding it, brokers, and share of the total portfolio value.
+    """
+    quoted = holdings.dropna(subset=['Symbol'])
+    grouped = quoted.groupby('Symbol', sort=False)
+    summary = grouped.agg(**{
+        'Description': ('Description', 'first'),
+        'Quantity': ('Quantity', 'sum'),
+        'Current Value': ('Current Value', 'sum'),
+        'Cost Basis Total': ('Cost Basis Total', 'sum'),
+        'Accounts': ('Account Number', 'nunique'),
+    })
+    brokers = quoted[['Symbol', 'Broker']].drop_duplicates().sort_values('Broker')
+    summary['Brokers'] = brokers.groupby('Symbol', sort=False)['Broker'].agg(', '.join)
+    summary['Total Gain Loss Dollar'] = summary['Current Value'] - summary['Cost Basis Total']
+    summary['Percent Of Portfolio'] = (summary['Current Value'] / summary['Current Value'].sum()).round(4)
+    return summary.sort_values('Current Value', ascending=False).reset_index()
@@ -0,0 +1,147 @@
+"""
+Script Runner
+Finds Python scripts under a folder through a cached os.scandir index and runs many of
+them at once, each in its own process (optionally in its own temporary working
+directory), with a timeout per script
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+
+# Folders that never hold scripts worth running (and are often huge)
+SKIP_DIRS = {'.git', '__pycache__', '.ipynb_checkpoints', '.venv', 'venv', 'node_modules', '.cache'}
+
+
+class FileIndex:
+    """
+    Files with a given suffix under root, from os.scandir stat results.
+
+    A directory's listing is kept with the directory's mtime; refresh() rescans only
+    directories whose mtime changed (files added, removed or renamed), so repeated
+    lookups on a large, mostly unchanged tree cost one stat per directory. Sizes are as
+    of the last scan of each file's directory.
+    """
+
+    def __init__(self, root, suffix=".py", skip_dirs=SKIP_DIRS):
+        self.root = os.path.abspath(root)
+        self.suffix = suffix
+        self.skip_dirs = set(skip_dirs)
+        self._dirs = {}  # path -> (mtime_ns, [file dicts], [subdirectory paths])
+        self.scanned = 0
+
+    def _scan(self, path):
+        files, subdirs = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in self.skip_dirs:
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(self.suffix) and entry.is_file():
+                    stat = entry.stat()
+                    files.append({'filename': entry.name, 'path': entry.path, 'size': stat.st_size,
+                                  'mtime': stat.st_mtime})
+        self.scanned += 1
+        return files, subdirs
+
+    def refresh(self):
+        """Rescan changed directories; returns the number of directories rescanned"""
+        scanned_before = self.scanned
+        seen = set()
+        pending = [self.root]
+        while pending:
+            path = pending.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(path)
+            cached = self._dirs.get(path)
+            if cached is None or cached[0] != mtime:
+                try:
+                    cached = (mtime, *self._scan(path))
+                except OSError:
+                    continue
+                self._dirs[path] = cached
+            pending.extend(cached[2])
+        for path in set(self._dirs) - seen:
+            del self._dirs[path]  # Deleted or now-skipped directories
+        return self.scanned - scanned_before
+
+    def files(self, refresh=True):
+        """List of {'filename', 'path', 'size', 'mtime'} sorted by path"""
+        if refresh:
+            self.refresh()
+        return sorted((f for _, files, _ in self._dirs.values() for f in files), key=lambda f: f['path'])
+
+
+def run_script(script_path, timeout=30, python=None, cwd=None, args=(), isolated=False):
+    """
+    Run one script in a fresh process, in cwd (default: the caller's working directory, so
+    relative paths resolve as before). isolated=True runs it in its own temporary folder
+    instead, which is deleted afterwards, so parallel scripts cannot trip over each other's
+    output files.
+
+    Returns:
+        dict: {'script', 'path', 'exit_code' (None if it timed out or could not start),
+        'success', 'timed_out', 'seconds', 'stdout', 'stderr', 'error'}
+    """
+    script_path = os.path.abspath(script_path)
+    result = {'script': os.path.basename(script_path), 'path': script_path, 'exit_code': None,
+              'success': False, 'timed_out': False, 'seconds': 0.0, 'stdout': '', 'stderr': '', 'error': None}
+    t0 = time.time()
+    with tempfile.TemporaryDirectory(prefix="script-") if isolated else nullcontext(cwd) as work_dir:
+        try:
+            completed = subprocess.run([python or sys.executable, script_path, *args], capture_output=True,
+                                       text=True, encoding='utf-8', errors='replace', timeout=timeout,
+                                       cwd=work_dir)
+            result.update(exit_code=completed.returncode, success=completed.returncode == 0,
+                          stdout=completed.stdout, stderr=completed.stderr)
+            if completed.returncode != 0:
+                lines = completed.stderr.strip().split('\n')
+                result['error'] = lines[-1] if lines[-1] else f"exit code {completed.returncode}"
+        except subprocess.TimeoutExpired as e:
+            result.update(timed_out=True, error=f"Timed out after {timeout} seconds",
+                          stdout=e.stdout.decode('utf-8', 'replace') if isinstance(e.stdout, bytes) else e.stdout or '')
+        except Exception as e:
+            result['error'] = str(e)
+    result['seconds'] = time.time() - t0
+    return result
+
+
+def run_scripts(script_paths, timeout=30, max_workers=None, python=None, cwd=None, on_result=None,
+                isolated=False):
+    """
+    Run many scripts at once, max_workers (default: CPU count) processes at a time, in cwd
+    or (isolated=True) each in its own temporary folder (see run_script).
+
+    Args:
+        timeout (float or dict): Seconds per script, or {script filename or path: seconds}
+            with an optional 'default' entry
+        on_result (callable): Optional on_result(result), called in this thread as each
+            script finishes
+
+    Returns:
+        list of run_script result dicts, in script_paths order
+    """
+    script_paths = list(script_paths)
+
+    def script_timeout(path):
+        if not isinstance(timeout, dict):
+            return timeout
+        return timeout.get(path, timeout.get(os.path.basename(path), timeout.get('default', 30)))
+
+    results = [None] * len(script_paths)
+    # Each script is its own process, so threads that wait on them are enough to use every core
+    with ThreadPoolExecutor(max_workers=max(1, max_workers or os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(run_script, path, script_timeout(path), python, cwd, (), isolated): index
+                   for index, path in enumerate(script_paths)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if on_result:
+                on_result(results[futures[future]])
+    return results
@@ -0,0 +1,192 @@
+"""
+Markdown to Word Renderer
+Tokenizes LLM markdown once with precompiled patterns and writes python-docx content,
+building tables row by row as XML so large tables render in linear time
+"""
+
+import re
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt
+
+BULLET_RE = re.compile(r"^\s*[-*•]\s+(.*)$")
+NUMBERED_RE = re.compile(r"^\s*\d+\.\s+(.*)$")
+TABLE_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+INLINE_RE = re.compile(r"(\*\*.+?\*\*|__.+?__|`.+?`)")
+MARKUP_RE = re.compile(r"\*\*|__|\*")
+
+DEFAULT_TABLE_STYLE = 'Light Grid Accent 1'
+
+# Block kinds produced by tokenize()
+HEADING, TABLE, BULLET, NUMBERED, PARAGRAPH = "heading", "table", "bullet", "numbered", "paragraph"
+
+
+def split_row(line):
+    """'| a | b |' -> ['a', 'b'] (empty cells are kept so columns stay aligned)"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split('|')]
+
+
+def tokenize(markdown_text):
+    """
+    One pass over the lines, producing (kind, payload) blocks:
+    heading -> (level, text), table -> [row cells, ...], bullet/numbered/paragraph -> text
+    """
+    blocks = []
+    lines = markdown_text.split('\n')
+    i, count = 0, len(lines)
+    while i < count:
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+
+        if line.startswith('#'):
+            level = len(line) - len(line.lstrip('#'))
+            blocks.append((HEADING, (min(level, 9), line.lstrip('#').strip())))
+        elif '|' in line and i + 1 < count and '|' in lines[i + 1]:
+            rows = [split_row(line)]
+            i += 1
+            while i < count and '|' in lines[i]:
+                if not TABLE_SEPARATOR_RE.match(lines[i]):
+                    rows.append(split_row(lines[i]))
+                i += 1
+            blocks.append((TABLE, rows))
+            continue
+        else:
+            match = BULLET_RE.match(line)
+            if match:
+                blocks.append((BULLET, match.group(1).strip()))
+            else:
+                match = NUMBERED_RE.match(line)
+                blocks.append((NUMBERED, match.group(1)) if match else (PARAGRAPH, line))
+        i += 1
+    return blocks
+
+
+def add_formatted_text(paragraph, text):
+    """Add text with **bold**, __bold__ and `code` markdown formatting to a paragraph"""
+    for part in INLINE_RE.split(text):
+        if not part:
+            continue
+        if (part.startswith('**') and part.endswith('**')) or (part.startswith('__') and part.endswith('__')):
+            paragraph.add_run(part[2:-2]).bold = True
+        elif part.startswith('`') and part.endswith('`'):
+            paragraph.add_run(part[1:-1]).font.name = 'Courier New'
+        else:
+            paragraph.add_run(part)
+
+
+def _cell_xml(text, width, bold=False, half_points=None):
+    """<w:tc> with one paragraph and (if text) one run, formatted at creation"""
+    tc = OxmlElement('w:tc')
+    tc_pr = OxmlElement('w:tcPr')
+    tc_w = OxmlElement('w:tcW')
+    tc_w.set(qn('w:w'), str(width))
+    tc_w.set(qn('w:type'), 'dxa')
+    tc_pr.append(tc_w)
+    tc.append(tc_pr)
+    p = OxmlElement('w:p')
+    if text:
+        r = OxmlElement('w:r')
+        if bold or half_points:
+            r_pr = OxmlElement('w:rPr')
+            if bold:
+                r_pr.append(OxmlElement('w:b'))
+            if half_points:
+                for tag in ('w:sz', 'w:szCs'):
+                    size = OxmlElement(tag)
+                    size.set(qn('w:val'), str(half_points))
+                    r_pr.append(size)
+            r.append(r_pr)
+        t = OxmlElement('w:t')
+        t.set('{http://www.w3.org/XML/1998/namespace}space', 'preserve')
+        t.text = text
+        r.append(t)
+        p.append(r)
+    tc.append(p)
+    return tc
+
+
+class StyleIds:
+    """
+    Style name -> style id, resolved once per document. python-docx scans every style
+    in the document each time a style is assigned by name.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._ids = {}
+
+    def __getitem__(self, name):
+        if name not in self._ids:
+            self._ids[name] = self.doc.styles[name].style_id
+        return self._ids[name]
+
+
+def add_styled_paragraph(doc, style_id=None, text=None):
+    """doc.add_paragraph(text, style) without the per-call style lookup"""
+    paragraph = doc.add_paragraph()
+    if style_id:
+        paragraph._p.style = style_id
+    if text:
+        paragraph.add_run(text)
+    return paragraph
+
+
+def add_table(doc, rows, style=DEFAULT_TABLE_STYLE, font_size=None, plain=False, style_ids=None):
+    """
+    Append a table built directly as <w:tr>/<w:tc> elements.
+
+    Args:
+        rows (list): Cell text lists; the first row is the (bold) header
+        font_size (Pt): Font size for every cell, applied as the runs are created
+        plain (bool): Strip markdown bold/asterisks and do not bold the header
+    """
+    columns = len(rows[0])
+    table = doc.add_table(rows=0, cols=columns)
+    tbl = table._tbl
+    if style:
+        tbl.tblPr.style = (style_ids or StyleIds(doc))[style]
+    widths = [col.get(qn('w:w')) for col in tbl.tblGrid.findall(qn('w:gridCol'))]
+    half_points = int(font_size.pt * 2) if font_size else None
+
+    for row_idx, cells in enumerate(rows):
+        tr = OxmlElement('w:tr')
+        bold = row_idx == 0 and not plain
+        for col_idx in range(columns):
+            text = cells[col_idx] if col_idx < len(cells) else ''
+            if plain:
+                text = MARKUP_RE.sub('', text)
+            tr.append(_cell_xml(text, widths[col_idx] if col_idx < len(widths) else 0, bold, half_points))
+        tbl.append(tr)
+    return table
+
+
+def add_markdown_to_word(doc, markdown_text, table_style=DEFAULT_TABLE_STYLE, table_font_size=None,
+                         plain_tables=False, style_ids=None):
+    """Convert markdown text to formatted Word document content"""
+    style_ids = style_ids or StyleIds(doc)
+    for kind, payload in tokenize(markdown_text):
+        if kind == HEADING:
+            level, text = payload
+            add_styled_paragraph(doc, style_ids[f"Heading {min(level, 9)}"], text)
+        elif kind == TABLE:
+            add_table(doc, payload, table_style, table_font_size, plain_tables, style_ids)
+            doc.add_paragraph()  # Add space after table
+        elif kind == BULLET:
+            add_formatted_text(add_styled_paragraph(doc, style_ids['List Bullet']), payload)
+        elif kind == NUMBERED:
+            add_formatted_text(add_styled_paragraph(doc, style_ids['List Number']), payload)
+        else:
+            add_formatted_text(doc.add_paragraph(), payload)
+
+
+# Portfolio tables: small print, no bold, no leftover markdown asterisks
+PORTFOLIO_TABLE_FORMAT = {'table_font_size': Pt(8), 'plain_tables': True}
@@ -0,0 +1,126 @@
+"""
+Report Fragments
+Durable per-ticker report sections: each section is written to its own file the moment
+it completes, so a crash keeps the finished work, a rerun only queries what is missing,
+and the final report is assembled from the fragments one at a time
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+from .settings import cache_dir
+
+UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+# Fragment folders untouched for this long are deleted by prune_stores
+RETENTION_DAYS = 7
+
+
+def store_name(prefix, date_str, *inputs):
+    """
+    "<prefix>-<date>-<hash>" where the hash covers everything that shapes a section
+    (prompt template, model, ...), so changing any of them starts a fresh store
+    """
+    digest = hashlib.sha256("\n\0".join(str(part) for part in inputs).encode('utf-8')).hexdigest()
+    return f"{prefix}-{date_str}-{digest[:10]}"
+
+
+def prune_stores(keep=(), max_age_days=RETENTION_DAYS, root=None):
+    """Delete fragment folders not modified for max_age_days (except keep); returns their names"""
+    root = root or cache_dir("fragments")
+    keep = {os.path.abspath(path) for path in keep}
+    cutoff = time.time() - max_age_days * 86400
+    removed = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir() and os.path.abspath(entry.path) not in keep and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed.append(entry.name)
+    return removed
+
+
+class FragmentStore:
+    """
+    root/<name>/<key>.json per completed section: the markdown text plus how it was
+    produced (seconds, ttft, tokens, ...). Writes go to a unique temp file followed by
+    os.replace, so a fragment is either complete or absent. A failed section only leaves
+    root/<name>/<key>.error.json with the error, so it still counts as missing.
+    """
+
+    def __init__(self, name, root=None):
+        self.root = os.path.join(root or cache_dir("fragments"), name)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key, suffix=".json"):
+        return os.path.join(self.root, UNSAFE_FILENAME_RE.sub("_", key) + suffix)
+
+    def _write(self, path, data):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def _read(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, key, fragment):
+        """Store a completed section (a dict with at least 'text'); non-JSON values are stringified"""
+        self._write(self._path(key), {'key': key, **fragment})
+        try:
+            os.remove(self._path(key, ".error.json"))
+        except FileNotFoundError:
+            pass
+
+    def save_error(self, key, error):
+        """Record why a section failed (kept until the section completes)"""
+        self._write(self._path(key, ".error.json"), {'key': key, 'error': str(error)})
+
+    def load(self, key):
+        """The stored fragment dict, or None"""
+        return self._read(self._path(key))
+
+    def error(self, key):
+        """The last recorded error for a key without a fragment, or None"""
+        failure = self._read(self._path(key, ".error.json"))
+        return failure['error'] if failure else None
+
+    def has(self, key):
+        return os.path.exists(self._path(key))
+
+    def missing(self, keys):
+        """Keys (in order) without a stored fragment"""
+        return [key for key in keys if not self.has(key)]
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+
+
+def assemble_report(doc, store, keys, render_section):
+    """
+    Add every key's section to doc in keys order, loading one fragment at a time.
+
+    Args:
+        render_section (callable): render_section(doc, key, fragment, error), where fragment
+            is None for keys that never completed and error is their recorded error (or None)
+
+    Returns:
+        list: Keys that had no fragment
+    """
+    missing = []
+    for key in keys:
+        fragment = store.load(key)
+        error = None
+        if fragment is None:
+            missing.append(key)
+            error = store.error(key)
+        render_section(doc, key, fragment, error)
+    return missing
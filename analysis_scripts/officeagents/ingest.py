@@ -0,0 +1,176 @@
+"""
+Broker CSV Ingestion
+Reads a Fidelity Portfolio_Positions export with an explicit column schema, stops
+before the disclaimer footer, and converts currency / percent columns in one
+vectorized step each
+"""
+
+import csv
+import os
+
+import pandas as pd
+
+# First line of Fidelity's footer; everything from the first blank line or this text on is not data
+FOOTER_MARKERS = ("the data and information in this spreadsheet", "brokerage services are provided by",
+                  "date downloaded")
+
+# Column kinds after renaming ('/', quotes and ':' become spaces, as in the original cleaning)
+TEXT, ACCOUNT, NUMBER, CURRENCY, PERCENT = "text", "account", "number", "currency", "percent"
+FIDELITY_SCHEMA = {
+    'Account Number': ACCOUNT,
+    'Account Name': TEXT,
+    'Symbol': TEXT,
+    'Description': TEXT,
+    'Quantity': NUMBER,
+    'Last Price': CURRENCY,
+    'Last Price Change': CURRENCY,
+    'Current Value': CURRENCY,
+    'Today s Gain Loss Dollar': CURRENCY,
+    'Today s Gain Loss Percent': PERCENT,
+    'Total Gain Loss Dollar': CURRENCY,
+    'Total Gain Loss Percent': PERCENT,
+    'Percent Of Account': PERCENT,
+    'Cost Basis Total': CURRENCY,
+    'Average Cost Basis': CURRENCY,
+    'Type': TEXT,
+}
+
+# Values used where the export leaves a cell empty
+FILL_VALUES = {
+    'Quantity': 1,
+    'Last Price': 1,
+    'Last Price Change': 0,
+    'Today s Gain Loss Dollar': 0,
+    'Today s Gain Loss Percent': 0,
+    'Total Gain Loss Dollar': 0,
+    'Total Gain Loss Percent': 0,
+    'Percent Of Account': 0,
+    'Cost Basis Total': 0,
+    'Average Cost Basis': 0,
+    'Description': 'Pending',
+    'Type': 'Pending',
+}
+
+COLUMN_ORDER = [
+    'Account Number',
+    'Account Name',
+    'Symbol',
+    'Description',
+    'Current Value',
+    'Percent Of Account',
+    'Total Gain Loss Dollar',
+    'Total Gain Loss Percent',
+    'Quantity',
+    'Last Price',
+    'Last Price Change',
+    'Today s Gain Loss Dollar',
+    'Today s Gain Loss Percent',
+    'Cost Basis Total',
+    'Average Cost Basis',
+    'Type',
+]
+
+# Everything that is not part of the number: currency sign, thousands separators, %, explicit +
+NUMBER_JUNK_RE = r"[$,%+\s]"
+NUMBER_RE = r"-?\d*\.?\d+(?:[eE][-+]?\d+)?"
+
+
+def normalize_column(name):
+    """"Today's Gain/Loss Dollar" -> "Today s Gain Loss Dollar" (matches the original cleaning)"""
+    for char in "/'\"\\:":
+        name = name.replace(char, " ")
+    return name
+
+
+def detect_encoding(path):
+    for encoding in ("utf-8-sig", "latin1"):
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                f.read(64 * 1024)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin1"
+
+
+def count_data_rows(path, encoding="utf-8-sig"):
+    """
+    Number of data rows before the footer, found by scanning raw lines (no parsing).
+    Returns (header line, row count).
+    """
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        header = f.readline()
+        rows = 0
+        for line in f:
+            stripped = line.strip().strip('"').lower()
+            if not stripped.strip(','):
+                break
+            if stripped.startswith(FOOTER_MARKERS):
+                break
+            rows += 1
+    return header, rows
+
+
+def parse_numeric(values):
+    """'$1,234.50' / '+12.3%' / '--' -> float64 (NaN for '--', blanks and anything else unparseable)"""
+    stripped = values.str.replace(NUMBER_JUNK_RE, "", regex=True)
+    return stripped.where(stripped.str.fullmatch(NUMBER_RE).fillna(False).astype(bool)).astype("float64")
+
+
+def read_positions_csv(path, schema=FIDELITY_SCHEMA):
+    """
+    Read the export with every known column as string (converted by clean_positions),
+    reading only the data rows above the footer.
+    """
+    encoding = detect_encoding(path)
+    header, rows = count_data_rows(path, encoding)
+    raw_columns = next(csv.reader([header]))
+    dtypes = {column: str for column in raw_columns if normalize_column(column).strip() in schema}
+    # Only empty cells are missing; tickers such as "NA" must stay text
+    df = pd.read_csv(path, nrows=rows, dtype=dtypes, encoding=encoding, index_col=False,
+                     skipinitialspace=True, keep_default_na=False, na_values=[""])
+    df.columns = [normalize_column(c).strip() for c in df.columns]
+    return df.loc[:, [c for c in df.columns if not c.startswith("Unnamed")]]
+
+
+def clean_positions(df, schema=FIDELITY_SCHEMA, fill_values=FILL_VALUES, column_order=COLUMN_ORDER,
+                    sort_by='Total Gain Loss Percent'):
+    """
+    Typed, cleaned positions table: Symbol without asterisks, empty cells filled,
+    currency columns as float, percent columns as fractions (3 decimals), sorted by
+    sort_by descending and in column_order.
+    """
+    out = {}
+    for column in df.columns:
+        kind = schema.get(column, TEXT)
+        values = df[column]
+        missing = values.isna()
+        if kind in (NUMBER, CURRENCY, PERCENT):
+            values = parse_numeric(values.astype(str))
+            if kind == PERCENT:
+                # '--' means no change for percentages
+                values = (values.fillna(0) / 100).round(3)
+        elif kind == ACCOUNT:
+            values = values.fillna('').astype(str)
+        if column == 'Symbol':
+            values = values.str.replace('*', '', regex=False)
+        if column in fill_values:
+            values = values.mask(missing, fill_values[column])
+        out[column] = values
+
+    cleaned = pd.DataFrame(out)
+    if sort_by in cleaned.columns:
+        cleaned = cleaned.sort_values(by=sort_by, ascending=False).reset_index(drop=True)
+    return cleaned[[c for c in column_order if c in cleaned.columns]]
+
+
+def load_positions(path, schema=FIDELITY_SCHEMA):
+    """Read and clean a positions export in one call"""
+    return clean_positions(read_positions_csv(path, schema), schema)
+
+
+def most_recent_export(folder, prefix="Portfolio_Positions", extension=".csv"):
+    """Newest matching export in folder, or None"""
+    with os.scandir(folder) as entries:
+        matches = [e for e in entries if e.is_file() and e.name.startswith(prefix) and e.name.endswith(extension)]
+    return max(matches, key=lambda e: e.stat().st_mtime).path if matches else None
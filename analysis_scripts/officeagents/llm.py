@@ -0,0 +1,219 @@
+"""
+LLM clients
+Perplexity (OpenAI-compatible) chat client with retries, timeouts, streaming and
+bounded concurrent fan-out for running one prompt per equity
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import openai
+from openai import OpenAI
+
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+# Status codes worth retrying: rate limited, or the service had a transient problem
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error):
+    """True for rate limits, timeouts, dropped connections and 5xx responses"""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
+    """Exponential backoff with full jitter; honours a server Retry-After when given"""
+    if retry_after:
+        try:
+            return min(float(retry_after), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_with_retries(fn, max_retries=5, base_delay=1.0, max_delay=60.0, on_retry=None):
+    """
+    Call fn(), retrying retryable API errors with exponential backoff and jitter;
+    on_retry(error), if given, is called before each retry
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            response = getattr(e, 'response', None)
+            retry_after = response.headers.get('retry-after') if response is not None else None
+            delay = backoff_delay(attempt, base_delay, max_delay, retry_after)
+            print(f"⏳ {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            if on_retry:
+                on_retry(e)
+            time.sleep(delay)
+
+
+class StreamInterrupted(RuntimeError):
+    """A streamed response failed after tokens were already delivered (not retried)"""
+
+
+class PerplexityClient:
+    """
+    Chat client for Perplexity's OpenAI-compatible API.
+
+    chat() sends one prompt; chat_stream() sends one prompt and consumes the answer
+    as it is generated; chat_many() sends a list of prompts with at most
+    max_concurrency requests in flight and returns results in prompt order.
+    With a ResponseCache, identical requests are answered from disk (streamed and
+    non-streamed requests share entries). With an LlmMetrics, every call's latency,
+    tokens, retries and estimated cost are recorded (see llm_metrics.py).
+    """
+
+    def __init__(self, api_key, base_url=PERPLEXITY_BASE_URL, max_concurrency=4, timeout=120,
+                 max_retries=5, cache=None, metrics=None):
+        # Retries are handled here (with jitter), not by the OpenAI SDK
+        self.client = OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.cache = cache
+        self.metrics = metrics
+
+    def _call(self, request, model, message, params, stats):
+        """request() through retries (and the cache), recording the call in self.metrics"""
+        def on_retry(error):
+            stats['retries'] += 1
+
+        t0 = time.time()
+        try:
+            if self.cache is None:
+                text = call_with_retries(request, self.max_retries, on_retry=on_retry)
+            else:
+                text = self.cache.cached("perplexity", model, message,
+                                         lambda: call_with_retries(request, self.max_retries, on_retry=on_retry),
+                                         params)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.record(model, time.time() - t0, retries=stats['retries'], stream=stats['stream'],
+                                    error=e)
+            raise
+        if self.metrics is not None:
+            self.metrics.record(model, time.time() - t0, stats['prompt_tokens'], stats['completion_tokens'],
+                                stats['retries'], cached=not stats['requested'], ttft=stats.get('ttft'),
+                                stream=stats['stream'])
+        return text
+
+    def chat(self, message, model="sonar-pro", **params):
+        usage = {'prompt_tokens': None, 'completion_tokens': None, 'retries': 0, 'requested': False,
+                 'stream': False}
+
+        def request():
+            usage['requested'] = True
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": message}],
+                **params
+            )
+            if response.usage is not None:
+                usage['prompt_tokens'] = response.usage.prompt_tokens
+                usage['completion_tokens'] = response.usage.completion_tokens
+            return response.choices[0].message.content
+
+        return self._call(request, model, message, params, usage)
+
+    def chat_stream(self, message, model="sonar-pro", on_token=None, **params):
+        """
+        Stream one completion.
+
+        Args:
+            on_token (callable): Optional on_token(text), called with each piece of the
+                answer as it arrives
+
+        Returns:
+            dict: {'text', 'seconds', 'ttft' (seconds to the first token), 'tokens',
+            'tokens_per_second', 'cached'}; timings are None for cached answers
+        """
+        stats = {'ttft': None, 'tokens': None, 'tokens_per_second': None, 'cached': self.cache is not None}
+        usage_stats = {'prompt_tokens': None, 'completion_tokens': None, 'retries': 0, 'requested': False,
+                       'stream': True}
+
+        def request():
+            stats['cached'] = False
+            usage_stats['requested'] = True
+            t0 = time.time()
+            parts, deltas, usage_tokens = [], 0, None
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": message}],
+                stream=True,
+                **params
+            )
+            try:
+                for chunk in stream:
+                    usage = getattr(chunk, 'usage', None)
+                    if usage is not None and usage.completion_tokens:
+                        usage_tokens = usage.completion_tokens
+                        usage_stats['prompt_tokens'] = usage.prompt_tokens
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    if stats['ttft'] is None:
+                        stats['ttft'] = time.time() - t0
+                    parts.append(text)
+                    deltas += 1
+                    if on_token:
+                        on_token(text)
+            except Exception as e:
+                # Retrying now would replay tokens the caller has already consumed
+                if parts:
+                    raise StreamInterrupted(f"stream failed after {deltas} chunks: {e}") from e
+                raise
+            # Providers that report usage give exact completion tokens; otherwise count chunks
+            stats['tokens'] = usage_stats['completion_tokens'] = usage_tokens or deltas
+            usage_stats['ttft'] = stats['ttft']
+            generating = time.time() - t0 - (stats['ttft'] or 0)
+            stats['tokens_per_second'] = stats['tokens'] / generating if generating > 0 else None
+            return "".join(parts)
+
+        t0 = time.time()
+        text = self._call(request, model, message, params, usage_stats)
+        if stats['cached'] and on_token:
+            on_token(text)
+        return {'text': text, 'seconds': time.time() - t0, **stats}
+
+    def chat_many(self, messages, model="sonar-pro", on_result=None, stream=False, **params):
+        """
+        Run many prompts concurrently.
+
+        Args:
+            messages (list): Prompts to send
+            on_result (callable): Optional on_result(index, result), called in this thread
+                as each request finishes (e.g. to save a report straight away)
+            stream (bool): Stream each answer; results also carry chat_stream's
+                'ttft', 'tokens', 'tokens_per_second' and 'cached'
+
+        Returns:
+            list of dicts in the same order as messages:
+            {'text': str or None, 'error': Exception or None, 'seconds': float}
+        """
+        def timed_chat(message):
+            t0 = time.time()
+            try:
+                if stream:
+                    return {**self.chat_stream(message, model=model, **params), 'error': None}
+                return {'text': self.chat(message, model=model, **params), 'error': None,
+                        'seconds': time.time() - t0}
+            except Exception as e:
+                return {'text': None, 'error': e, 'seconds': time.time() - t0}
+
+        results = [None] * len(messages)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as executor:
+            futures = {executor.submit(timed_chat, message): index for index, message in enumerate(messages)}
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                if on_result:
+                    on_result(index, results[index])
+        return results
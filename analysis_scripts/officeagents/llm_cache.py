@@ -0,0 +1,134 @@
+"""
+LLM Response Cache
+Content-addressed on-disk cache of chat completions, keyed by provider, model,
+request parameters and prompt, so reruns do not pay for answers they already have
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from .settings import cache_dir
+
+# Freshness presets: an answer is reused while it is from the same calendar day,
+# or for a fixed number of seconds, or forever
+FRESH_SAME_DAY = "day"
+FRESH_FOREVER = None
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def cache_key(provider, model, prompt, params=None):
+    """sha256 of the canonical JSON request, so any change in model/params/prompt is a miss"""
+    request = {'provider': provider, 'model': model, 'params': params or {}, 'prompt': prompt}
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    One JSON file per response under root/<first two hex chars>/<key>.json.
+
+    Writes go to a unique temp file followed by os.replace, so concurrent threads or
+    processes never see partial entries. When the folder grows past max_bytes the
+    least recently used entries (hits refresh the file mtime) are evicted.
+    """
+
+    def __init__(self, root=None, freshness=FRESH_SAME_DAY, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or cache_dir("llm")
+        self.freshness = freshness
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def _is_fresh(self, created_at):
+        if self.freshness is FRESH_FOREVER:
+            return True
+        if self.freshness == FRESH_SAME_DAY:
+            return datetime.fromtimestamp(created_at).date() == datetime.now().date()
+        return time.time() - created_at < self.freshness
+
+    def get(self, key):
+        """Cached response text, or None if missing or stale"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        if not self._is_fresh(entry.get('created_at', 0)):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return entry['response']
+
+    def put(self, key, response, **info):
+        """Store response text; info (model, prompt, ...) is saved alongside for inspection"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({'created_at': time.time(), 'response': response, **info}, ensure_ascii=False)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._total_bytes()
+            else:
+                self._approx_bytes += len(data.encode('utf-8'))
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for shard in os.scandir(self.root):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".json"):
+                        yield entry
+
+    def _total_bytes(self):
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is back to 80% of max_bytes"""
+        entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()))
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.8
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._approx_bytes = total
+
+    def cached(self, provider, model, prompt, call, params=None):
+        """Return the cached response for this request, or call() and cache its result"""
+        key = cache_key(provider, model, prompt, params)
+        response = self.get(key)
+        if response is None:
+            response = call()
+            if response:
+                self.put(key, response, provider=provider, model=model, params=params or {}, prompt=prompt)
+        return response
+
+    def clear(self):
+        for entry in list(self._entries()):
+            os.remove(entry.path)
+        self._approx_bytes = 0
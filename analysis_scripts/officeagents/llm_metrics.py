@@ -0,0 +1,188 @@
+"""
+LLM Call Metrics
+Records latency, tokens, retries and estimated cost for every chat call a client makes,
+summarises a run (p50/p95 latency, tokens per ticker, cost by model) and exports the
+calls as JSONL and the summary as a Prometheus textfile
+"""
+
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from .settings import cache_dir
+
+# USD per million (prompt, completion) tokens and per 1000 requests (low search context).
+# Estimates for sizing runs; check the provider's price list when it changes.
+MODEL_PRICES = {
+    'sonar': {'prompt': 1.0, 'completion': 1.0, 'request': 5.0},
+    'sonar-pro': {'prompt': 3.0, 'completion': 15.0, 'request': 6.0},
+    'sonar-reasoning': {'prompt': 1.0, 'completion': 5.0, 'request': 5.0},
+    'sonar-reasoning-pro': {'prompt': 2.0, 'completion': 8.0, 'request': 6.0},
+    'sonar-deep-research': {'prompt': 2.0, 'completion': 8.0, 'request': 5.0},
+}
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, prices=MODEL_PRICES):
+    """Estimated USD for one request, or None for a model without prices"""
+    price = prices.get(model)
+    if price is None:
+        return None
+    return ((prompt_tokens or 0) * price['prompt'] + (completion_tokens or 0) * price['completion']) / 1e6 \
+        + price['request'] / 1000
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * pct / 100)) - 1]
+
+
+class LlmMetrics:
+    """
+    Thread-safe record of chat calls for one run. Pass it to PerplexityClient(metrics=...);
+    wrap each report in section() so the summary can give tokens per ticker:
+
+        with metrics.section("ratings", tickers=len(equities)):
+            write_ratings_report(client, ...)
+    """
+
+    def __init__(self, run_id=None, prices=MODEL_PRICES):
+        self.run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.prices = prices
+        self.calls = []
+        self.tickers = {}
+        self._section = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def section(self, name, tickers=None):
+        """Label the calls made inside the block (reports run one after another)"""
+        previous, self._section = self._section, name
+        if tickers:
+            self.tickers[name] = self.tickers.get(name, 0) + tickers
+        try:
+            yield
+        finally:
+            self._section = previous
+
+    def record(self, model, latency, prompt_tokens=None, completion_tokens=None, retries=0, cached=False,
+               ttft=None, stream=False, error=None):
+        """Add one call; cached answers cost nothing and carry no tokens"""
+        call = {
+            'run_id': self.run_id,
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'section': self._section,
+            'model': model,
+            'stream': stream,
+            'cached': cached,
+            'latency': round(latency, 4),
+            'ttft': round(ttft, 4) if ttft is not None else None,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'retries': retries,
+            'cost': None if cached or error else estimate_cost(model, prompt_tokens, completion_tokens, self.prices),
+            'error': type(error).__name__ if error is not None else None,
+        }
+        with self._lock:
+            self.calls.append(call)
+        return call
+
+    def _summarise(self, calls):
+        live = [c for c in calls if not c['cached'] and c['error'] is None]
+        latencies = [c['latency'] for c in live]
+        ttfts = [c['ttft'] for c in live if c['ttft'] is not None]
+        costs = [c['cost'] for c in live if c['cost'] is not None]
+        return {
+            'calls': len(calls),
+            'cached': sum(c['cached'] for c in calls),
+            'errors': sum(c['error'] is not None for c in calls),
+            'retries': sum(c['retries'] for c in calls),
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_max': max(latencies) if latencies else None,
+            'ttft_p50': percentile(ttfts, 50),
+            'prompt_tokens': sum(c['prompt_tokens'] or 0 for c in live),
+            'completion_tokens': sum(c['completion_tokens'] or 0 for c in live),
+            'cost': round(sum(costs), 6),
+        }
+
+    def summary(self):
+        """Run totals plus the same figures by model and by section (with tokens per ticker)"""
+        with self._lock:
+            calls = list(self.calls)
+        summary = {'run_id': self.run_id, **self._summarise(calls), 'models': {}, 'sections': {}}
+        for model in sorted({c['model'] for c in calls}):
+            summary['models'][model] = self._summarise([c for c in calls if c['model'] == model])
+        for section in sorted({c['section'] for c in calls if c['section']}):
+            figures = self._summarise([c for c in calls if c['section'] == section])
+            tickers = self.tickers.get(section)
+            if tickers:
+                figures['tickers'] = tickers
+                figures['tokens_per_ticker'] = (figures['prompt_tokens'] + figures['completion_tokens']) / tickers
+            summary['sections'][section] = figures
+        return summary
+
+    def write_jsonl(self, path):
+        """Append one JSON line per call (files accumulate runs; filter on run_id)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            calls = list(self.calls)
+        with open(path, 'a', encoding='utf-8') as f:
+            for call in calls:
+                f.write(json.dumps(call) + "\n")
+        return path
+
+    def write_prometheus(self, path, prefix="officeagents_llm"):
+        """Overwrite a node_exporter textfile with this run's summary, labelled by model"""
+        summary = self.summary()
+        metrics = [
+            ('calls', 'calls', 'Chat calls in the last run'),
+            ('cached', 'cached_calls', 'Calls answered from the response cache'),
+            ('errors', 'errors', 'Calls that failed after retries'),
+            ('retries', 'retries', 'Retried requests (429/5xx/timeouts)'),
+            ('latency_p50', 'latency_p50_seconds', 'Median latency of API calls'),
+            ('latency_p95', 'latency_p95_seconds', '95th percentile latency of API calls'),
+            ('prompt_tokens', 'prompt_tokens', 'Prompt tokens'),
+            ('completion_tokens', 'completion_tokens', 'Completion tokens'),
+            ('cost', 'cost_usd', 'Estimated cost in USD'),
+        ]
+        lines = []
+        for key, name, help_text in metrics:
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} gauge"]
+            for model, figures in summary['models'].items():
+                if figures[key] is not None:
+                    lines.append(f'{prefix}_{name}{{model="{model}"}} {figures[key]}')
+        lines += [f"# HELP {prefix}_last_run_timestamp_seconds When the last run finished",
+                  f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+                  f"{prefix}_last_run_timestamp_seconds {time.time():.0f}"]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)  # Never let the exporter read a half-written file
+        return path
+
+    def export(self, folder=None):
+        """llm_calls.jsonl (appended) and llm.prom (replaced) in folder, default cache_dir("metrics")"""
+        folder = folder or cache_dir("metrics")
+        return {'jsonl': self.write_jsonl(os.path.join(folder, "llm_calls.jsonl")),
+                'prometheus': self.write_prometheus(os.path.join(folder, "llm.prom"))}
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary['calls']:
+            return
+        p50, p95 = summary['latency_p50'], summary['latency_p95']
+        print(f"📊 LLM calls: {summary['calls']} ({summary['cached']} cached, {summary['errors']} failed, "
+              f"{summary['retries']} retries), latency p50 {p50 or 0:.1f}s / p95 {p95 or 0:.1f}s, "
+              f"{summary['prompt_tokens'] + summary['completion_tokens']:,} tokens, ~${summary['cost']:.2f}")
+        for section, figures in summary['sections'].items():
+            if 'tokens_per_ticker' in figures:
+                print(f"   {section}: {figures['tokens_per_ticker']:,.0f} tokens per ticker, ~${figures['cost']:.2f}")
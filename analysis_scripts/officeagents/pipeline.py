@@ -0,0 +1,241 @@
+"""
+Headless Pipeline
+The notebooks' production stages as plain functions, so the scheduler (or a shell) can
+run them without a kernel: ingest (broker exports -> cleaned snapshot, prices, Excel),
+sec (filings download), index (filings -> full-text index, see sec_index.py) and
+reports (Perplexity Word reports).
+Run with `python -m officeagents <stage> ...` from analysis_scripts.
+"""
+
+import os
+import time
+
+from .settings import sec_user_agent
+
+STAGES = ("ingest", "sec", "index", "reports")
+REPORTS = ("equities", "portfolio", "ratings")
+
+# Model configuration; the Perplexity notebook imports these, so both front ends stay in step
+MODEL = "sonar-pro"
+MAX_CONCURRENT_REQUESTS = 4  # API requests in flight at the same time
+RATINGS_BATCH_SIZE = 5  # Tickers per Ratings Change request (1 = one request per ticker)
+# Equities per portfolio request; longer lists are queried in concurrent chunks and merged
+PORTFOLIO_CHUNK_SIZE = 25
+
+
+def load_settings():
+    """Folders, files and keys from the environment (.env), as the notebooks read them"""
+    return {
+        'source_files_dir': os.getenv("Portfolio_source_files_dir"),
+        'broker': os.getenv("Broker"),
+        'portfolio_output_dir': os.getenv("Portfolio_output_dir", "C:/Users/patty/portfolio_files"),
+        'equity_list_file': os.getenv("EQUITY_LIST_FILE"),
+        'prompt_individual_file': os.getenv("PROMPT_INDIVIDUAL_EQUITY_FILE"),
+        'prompt_portfolio_file': os.getenv("PROMPT_PORTFOLIO_FILE"),
+        'prompt_ratings_change_file': os.getenv("PROMPT_RATINGS_CHANGE_FILE"),
+        'output_dir_sec_filings': os.getenv("Output_dir_sec_filings"),
+        'output_dir_individual': os.getenv("Output_dir_individual_equities"),
+        'output_dir_portfolio': os.getenv("Output_dir_portfolio"),
+        'perplexity_api_key': os.getenv("PERPLEXITY_API_KEY"),
+        'perplexity_base_url': os.getenv("PERPLEXITY_BASE_URL"),  # None = api.perplexity.ai
+        'user_agent': sec_user_agent(),
+        'model': MODEL,
+        'max_concurrency': MAX_CONCURRENT_REQUESTS,
+        'ratings_batch_size': RATINGS_BATCH_SIZE,
+        'portfolio_chunk_size': PORTFOLIO_CHUNK_SIZE,
+        # LLM call metrics (llm_calls.jsonl + llm.prom); None = .cache/metrics
+        'metrics_dir': os.getenv("Metrics_dir"),
+        # Market data sources for the ingest stage (None = Yahoo Finance)
+        'quote_source': None,
+        'history_source': None,
+    }
+
+
+def _require(settings, *keys):
+    missing = [key for key in keys if not settings.get(key)]
+    if missing:
+        raise ValueError(f"Missing settings: {', '.join(missing)} (set them in .env)")
+
+
+def up_to_date(output, sources):
+    """True if output exists and is newer than every source file"""
+    if not os.path.exists(output):
+        return False
+    written = os.path.getmtime(output)
+    return all(os.path.getmtime(source) <= written for source in sources)
+
+
+def ingest_export(path, snapshot_store):
+    """
+    Cleaned positions for one export, parsing it only if its content was not ingested before.
+
+    Returns:
+        (DataFrame, bool changed)
+    """
+    from .ingest import load_positions
+    from .snapshots import file_fingerprint
+
+    fingerprint = file_fingerprint(path)
+    if snapshot_store.has(fingerprint):
+        return snapshot_store.load(fingerprint), False
+    df = load_positions(path)
+    snapshot_store.add(df, fingerprint, path)
+    return df, True
+
+
+def run_ingest(settings):
+    """
+    Latest export of the configured broker -> snapshot, refreshed prices, price history and
+    fidelity_portfolio.xlsx; then every broker folder -> consolidated_portfolio.xlsx.
+    Outputs are only rebuilt when an export changed (or they are missing).
+    """
+    import pandas as pd
+    from .brokers import aggregate_by_symbol, discover_exports, load_all_brokers
+    from .ingest import most_recent_export
+    from .price_history import PriceHistoryStore
+    from .prices import refresh_prices, quotable_mask
+    from .snapshots import SnapshotStore
+
+    _require(settings, 'source_files_dir', 'broker', 'portfolio_output_dir')
+    source_dir, output_folder = settings['source_files_dir'], settings['portfolio_output_dir']
+    export = most_recent_export(os.path.join(source_dir, settings['broker']))
+    if export is None:
+        raise FileNotFoundError(f"No Portfolio_Positions*.csv export in {os.path.join(source_dir, settings['broker'])}")
+
+    snapshot_store = SnapshotStore()
+    df_data, changed = ingest_export(export, snapshot_store)
+    print(f"{'✅ Ingested' if changed else '⏭️  Unchanged'} {os.path.basename(export)}: {len(df_data)} rows")
+    position_changes = snapshot_store.diff_latest()
+    if position_changes is not None:
+        counts = position_changes['change'].value_counts()
+        print(f"🔄 Since last snapshot: {counts.get('new', 0)} new, {counts.get('closed', 0)} closed, "
+              f"{counts.get('resized', 0)} resized positions")
+
+    # An unchanged export keeps the prices, price history and Excel files of the run that ingested it
+    fidelity_output = os.path.join(output_folder, 'fidelity_portfolio.xlsx')
+    price_report = {'updated': 0, 'failed': []}
+    if changed or not os.path.exists(fidelity_output):
+        df_data, price_report = refresh_prices(df_data, source=settings.get('quote_source'))
+        print(f"✅ Updated {price_report['updated']} prices ({price_report['seconds']:.1f}s)")
+        if price_report['failed']:
+            print(f"⚠️ No price data for: {', '.join(price_report['failed'])}")
+        history_store = PriceHistoryStore(source=settings.get('history_source'))
+        history_report = history_store.update(df_data.loc[quotable_mask(df_data), 'Symbol'].astype(str).str.strip())
+        print(f"📈 Price history: {sum(history_report['new_bars'].values())} new daily bars")
+
+        os.makedirs(output_folder, exist_ok=True)
+        df_data.to_excel(fidelity_output, index=False)
+    else:
+        print(f"⏭️  Keeping prices, price history and {os.path.basename(fidelity_output)} from the last ingest")
+
+    consolidated_output = os.path.join(output_folder, 'consolidated_portfolio.xlsx')
+    broker_report = []
+    if changed or not up_to_date(consolidated_output, [e['path'] for e in discover_exports(source_dir)]):
+        all_holdings, broker_report = load_all_brokers(source_dir)
+        symbol_summary = aggregate_by_symbol(all_holdings)
+        os.makedirs(output_folder, exist_ok=True)
+        with pd.ExcelWriter(consolidated_output) as writer:
+            all_holdings.to_excel(writer, sheet_name='Holdings', index=False)
+            symbol_summary.to_excel(writer, sheet_name='By Symbol', index=False)
+        print(f"✅ {len(all_holdings)} positions from {len(broker_report)} brokers, "
+              f"{len(symbol_summary)} distinct symbols")
+    else:
+        print(f"⏭️  No broker export changed since {os.path.basename(consolidated_output)} was written")
+
+    return {'export': export, 'changed': changed, 'rows': len(df_data), 'prices_updated': price_report['updated'],
+            'prices_failed': price_report['failed'], 'brokers': broker_report}
+
+
+def run_sec(settings):
+    """SEC filings (10-K, 10-Q, 8-K) for every equity in the equity list"""
+    from .reports import read_lines
+    from .sec import CikResolver, SecFilingDownloader
+
+    _require(settings, 'equity_list_file', 'output_dir_sec_filings', 'user_agent')
+    tickers = read_lines(settings['equity_list_file'])
+    ciks = CikResolver(user_agent=settings['user_agent']).resolve_many(tickers)
+    results = SecFilingDownloader(user_agent=settings['user_agent']).download_all(ciks, settings['output_dir_sec_filings'])
+    statuses = [filing['status'] for filings in results.values() for filing in filings]
+    report = {status: statuses.count(status) for status in ('saved', 'skipped', 'failed')}
+    resolved = sum(cik is not None for cik in ciks.values())  # Unknown tickers map to None
+    print(f"✅ SEC filings for {resolved} of {len(tickers)} tickers: {report['saved']} saved, "
+          f"{report['skipped']} already downloaded, {report['failed']} failed")
+    return {'tickers': len(tickers), 'resolved': resolved, **report}
+
+
+def run_index(settings):
+    """Parse new or changed filings in the SEC filings folder into the full-text index"""
+    from .sec_index import FilingIndex
+
+    _require(settings, 'output_dir_sec_filings')
+    filing_index = FilingIndex()
+    report = filing_index.index_folder(settings['output_dir_sec_filings'])
+    return {**report, 'failed': len(report['failed']), **filing_index.stats()}
+
+
+def run_reports(settings, which=REPORTS):
+    """Perplexity reports: 'equities' (one per equity), 'portfolio' and 'ratings'"""
+    from .llm import PERPLEXITY_BASE_URL, PerplexityClient
+    from .llm_cache import ResponseCache
+    from .llm_metrics import LlmMetrics
+    from .reports import (read_lines, read_prompt, write_equity_reports, write_portfolio_report,
+                          write_ratings_report)
+
+    _require(settings, 'perplexity_api_key', 'equity_list_file')
+    equities = read_lines(settings['equity_list_file'])
+    client = PerplexityClient(api_key=settings['perplexity_api_key'],
+                              base_url=settings.get('perplexity_base_url') or PERPLEXITY_BASE_URL,
+                              max_concurrency=settings['max_concurrency'], cache=ResponseCache(freshness="day"),
+                              metrics=LlmMetrics())
+    model = settings['model']
+    report = {}
+    try:
+        if 'equities' in which:
+            _require(settings, 'prompt_individual_file', 'output_dir_individual')
+            with client.metrics.section('equities', tickers=len(equities)):
+                result = write_equity_reports(client, equities, read_prompt(settings['prompt_individual_file']),
+                                              settings['output_dir_individual'], model)
+            report['equities'] = {key: len(value) for key, value in result.items()}
+        if 'portfolio' in which:
+            _require(settings, 'prompt_portfolio_file', 'output_dir_portfolio')
+            with client.metrics.section('portfolio', tickers=len(equities)):
+                report['portfolio'] = write_portfolio_report(
+                    client, equities, read_prompt(settings['prompt_portfolio_file']),
+                    settings['output_dir_portfolio'], model, chunk_size=settings['portfolio_chunk_size'])
+        if 'ratings' in which:
+            _require(settings, 'prompt_ratings_change_file', 'output_dir_portfolio')
+            with client.metrics.section('ratings', tickers=len(equities)):
+                result = write_ratings_report(client, equities, read_prompt(settings['prompt_ratings_change_file']),
+                                              settings['output_dir_portfolio'], model,
+                                              batch_size=settings['ratings_batch_size'])
+            report['ratings'] = {'path': result['path'], 'missing': result['missing']}
+    finally:
+        # Export whatever was called, also when a report failed part way
+        client.metrics.print_summary()
+        client.metrics.export(settings.get('metrics_dir'))
+    report['llm'] = client.metrics.summary()
+    return report
+
+
+def run_stages(stages, settings=None, reports=REPORTS):
+    """
+    Run stages in order; a failing stage is reported and the next one still runs.
+
+    Returns:
+        dict: stage -> {'ok': bool, 'seconds': float, 'report' or 'error'}
+    """
+    settings = settings or load_settings()
+    runners = {'ingest': run_ingest, 'sec': run_sec, 'index': run_index,
+               'reports': lambda s: run_reports(s, reports)}
+    results = {}
+    for stage in stages:
+        print(f"▶️  {stage}")
+        t0 = time.time()
+        try:
+            results[stage] = {'ok': True, 'report': runners[stage](settings)}
+        except Exception as e:
+            print(f"❌ {stage} failed: {e}")
+            results[stage] = {'ok': False, 'error': str(e)}
+        results[stage]['seconds'] = time.time() - t0
+        print(f"⏱️  {stage}: {results[stage]['seconds']:.1f}s")
+    return results
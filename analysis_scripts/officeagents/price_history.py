@@ -0,0 +1,158 @@
+"""
+Price History Store
+Daily bars kept locally as one Parquet file per symbol. Updates only fetch the
+sessions missing since the last stored bar; reads are column/row filtered Parquet scans
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timedelta
+
+import pandas as pd
+
+from .prices import yahoo_symbol
+from .settings import cache_dir
+
+COLUMNS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+# Bars are only stored once the session has closed, so a mid-day run never saves a partial bar
+MARKET_CLOSE = dtime(16, 30)
+DEFAULT_HISTORY_YEARS = 5
+
+NASDAQ_COMPOSITE = "^IXIC"
+
+
+def last_completed_session(now=None):
+    """Date of the most recent weekday session that has closed (local clock, holidays ignored)"""
+    now = now or datetime.now()
+    day = now.date() if now.time() >= MARKET_CLOSE else now.date() - timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+class YahooHistorySource:
+    """Daily bars from Yahoo Finance"""
+
+    def fetch(self, symbol, start, end):
+        """DataFrame indexed by date with COLUMNS for start <= date <= end"""
+        import yfinance as yf
+
+        data = yf.download(yahoo_symbol(symbol), start=start, end=end + timedelta(days=1), interval="1d",
+                           auto_adjust=False, progress=False, threads=False)
+        if data is None or data.empty:
+            return pd.DataFrame(columns=COLUMNS)
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        data = data.rename(columns=lambda c: c.lower().replace(" ", "_"))
+        data.index = pd.to_datetime(data.index).tz_localize(None).normalize()
+        data.index.name = "date"
+        return data.reindex(columns=COLUMNS)
+
+
+class PriceHistoryStore:
+    """
+    store.update(symbols) appends missing daily bars; store.read(symbol, start, end)
+    and store.closes(symbols, start, end) serve history without network access.
+    """
+
+    def __init__(self, root=None, source=None, history_years=DEFAULT_HISTORY_YEARS):
+        self.root = root or cache_dir("prices")
+        self.source = source or YahooHistorySource()
+        self.history_years = history_years
+
+    def _path(self, symbol):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol.upper())
+        return os.path.join(self.root, f"{safe}.parquet")
+
+    def last_date(self, symbol):
+        """Date of the newest stored bar, or None"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        dates = pd.read_parquet(path, columns=["date"])["date"]
+        return dates.max().date() if len(dates) else None
+
+    def update_symbol(self, symbol, now=None):
+        """Fetch and append the sessions after the last stored bar; returns the number of new bars"""
+        end = last_completed_session(now)
+        last = self.last_date(symbol)
+        if last is not None and last >= end:
+            return 0
+        start = last + timedelta(days=1) if last else end - timedelta(days=365 * self.history_years)
+
+        bars = self.source.fetch(symbol, start, end)
+        bars = bars[(bars.index >= pd.Timestamp(start)) & (bars.index <= pd.Timestamp(end))].dropna(how="all")
+        if bars.empty:
+            return 0
+        bars = bars.reset_index()[["date"] + COLUMNS]
+
+        path = self._path(symbol)
+        if os.path.exists(path):
+            bars = pd.concat([pd.read_parquet(path), bars], ignore_index=True)
+            bars = bars.drop_duplicates("date", keep="last").sort_values("date")
+        tmp_path = path + ".tmp"
+        bars.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return len(bars) if last is None else int((bars["date"] > pd.Timestamp(last)).sum())
+
+    def update(self, symbols, max_workers=4, now=None):
+        """
+        Bring every symbol up to the last completed session.
+
+        Returns:
+            dict: {'new_bars': {symbol: count}, 'failed': {symbol: error message}}
+        """
+        def update_one(symbol):
+            try:
+                return symbol, self.update_symbol(symbol, now), None
+            except Exception as e:
+                return symbol, 0, str(e)
+
+        new_bars, failed = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for symbol, count, error in executor.map(update_one, list(dict.fromkeys(symbols))):
+                if error:
+                    failed[symbol] = error
+                else:
+                    new_bars[symbol] = count
+        return {'new_bars': new_bars, 'failed': failed}
+
+    def read(self, symbol, start=None, end=None, columns=None):
+        """Stored bars for symbol between start and end (inclusive), indexed by date"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns or COLUMNS, index=pd.DatetimeIndex([], name="date"))
+        filters = []
+        if start is not None:
+            filters.append(("date", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("date", "<=", pd.Timestamp(end)))
+        bars = pd.read_parquet(path, columns=["date"] + (columns or COLUMNS), filters=filters or None)
+        return bars.set_index("date")
+
+    def closes(self, symbols, start=None, end=None, column="adj_close"):
+        """Wide DataFrame of one price column: dates x symbols"""
+        return pd.DataFrame({symbol: self.read(symbol, start, end, [column])[column] for symbol in symbols})
+
+    def trailing_returns(self, symbols, years=5, end=None):
+        """Total return over the trailing window per symbol (NaN if history does not cover it)"""
+        end = pd.Timestamp(end or last_completed_session())
+        start = end - pd.DateOffset(years=years)
+        prices = self.closes(symbols, start - pd.Timedelta(days=7), end)
+        returns = {}
+        for symbol in symbols:
+            series = prices[symbol].dropna() if symbol in prices else pd.Series(dtype=float)
+            covered = len(series) and series.index[0] <= start + pd.Timedelta(days=7)
+            returns[symbol] = series.iloc[-1] / series[series.index >= start].iloc[0] - 1 if covered else float("nan")
+        return pd.Series(returns)
+
+
+def performance_vs_benchmark(store, symbol, benchmark=NASDAQ_COMPOSITE, years=5):
+    """One line of trailing performance from local history, for adding to an LLM prompt"""
+    store.update([symbol, benchmark])
+    returns = store.trailing_returns([symbol, benchmark], years)
+    if returns.isna().any():
+        return None
+    return (f"Trailing {years}-year total return through {last_completed_session():%Y-%m-%d}: "
+            f"{symbol} {returns[symbol]:+.1%} vs Nasdaq Composite {returns[benchmark]:+.1%}.")
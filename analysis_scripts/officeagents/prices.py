@@ -0,0 +1,126 @@
+"""
+Market Price Refresh
+Fetch latest prices for every portfolio symbol in chunked bulk requests, concurrently
+and with retries, then write them back into the positions table with one vectorized join
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Rows that never have a market quote: unsettled activity and cash / money-market sweeps
+NON_QUOTE_SYMBOLS = {"", "PENDING", "PENDING ACTIVITY", "NAN"}
+NON_QUOTE_DESCRIPTION_RE = r"MONEY MARKET|PENDING"
+
+
+def yahoo_symbol(symbol):
+    """Broker class-share notation (BRK.B) to Yahoo's (BRK-B)"""
+    return symbol.replace('.', '-').replace('/', '-')
+
+
+class YahooQuoteSource:
+    """Last daily close from Yahoo Finance, many symbols per HTTP request"""
+
+    def __init__(self, period="5d"):
+        self.period = period
+
+    def fetch(self, symbols):
+        """Return {symbol: last close} for the symbols Yahoo knows about"""
+        import yfinance as yf
+
+        by_yahoo = {yahoo_symbol(s): s for s in symbols}
+        data = yf.download(list(by_yahoo), period=self.period, interval="1d", auto_adjust=False,
+                           progress=False, threads=False)
+        if data is None or data.empty:
+            return {}
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(next(iter(by_yahoo)))
+        last = close.ffill().iloc[-1].dropna()
+        return {by_yahoo[col]: float(price) for col, price in last.items() if col in by_yahoo}
+
+
+class StaticQuoteSource:
+    """Fixed {symbol: price} quotes, for running the refresh offline"""
+
+    def __init__(self, prices, fail_symbols=()):
+        self.prices = dict(prices)
+        self.fail_symbols = set(fail_symbols)
+        self.requests = 0
+
+    def fetch(self, symbols):
+        self.requests += 1
+        return {s: self.prices[s] for s in symbols if s in self.prices and s not in self.fail_symbols}
+
+
+def quotable_mask(df, symbol_col="Symbol", description_col="Description"):
+    """Boolean Series: rows whose symbol can be priced (not Pending, cash or money market)"""
+    symbols = df[symbol_col].astype("string").str.strip().str.upper().fillna("")
+    mask = ~symbols.isin(NON_QUOTE_SYMBOLS)
+    if description_col in df.columns:
+        descriptions = df[description_col].astype("string").str.upper().fillna("")
+        mask &= ~descriptions.str.contains(NON_QUOTE_DESCRIPTION_RE, regex=True)
+    return mask
+
+
+def fetch_prices(symbols, source=None, chunk_size=50, max_workers=4, retries=2):
+    """
+    Fetch prices for symbols in chunks of chunk_size, max_workers chunks at a time.
+    A chunk that raises is retried with backoff; symbols still missing afterwards
+    are returned as failed.
+
+    Returns:
+        (dict {symbol: price}, list of failed symbols)
+    """
+    source = source or YahooQuoteSource()
+    symbols = list(dict.fromkeys(symbols))
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+
+    def fetch_chunk(chunk):
+        for attempt in range(retries + 1):
+            try:
+                return source.fetch(chunk)
+            except Exception as e:
+                if attempt == retries:
+                    print(f"❌ Price request failed for {len(chunk)} symbols: {e}")
+                    return {}
+                time.sleep(2 ** attempt)
+
+    prices = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for result in executor.map(fetch_chunk, chunks):
+            prices.update(result)
+    failed = [s for s in symbols if s not in prices]
+    return prices, failed
+
+
+def refresh_prices(df, source=None, symbol_col="Symbol", price_col="Last Price", chunk_size=50,
+                   max_workers=4, retries=2):
+    """
+    Update price_col from fresh quotes for every quotable row.
+
+    Returns:
+        (updated DataFrame copy, report dict with 'updated' row count, 'prices' found,
+        'failed' symbols, 'skipped' symbols and 'seconds')
+    """
+    t0 = time.time()
+    mask = quotable_mask(df, symbol_col)
+    symbols = df.loc[mask, symbol_col].astype(str).str.strip()
+    skipped = sorted(set(df.loc[~mask, symbol_col].dropna().astype(str)))
+
+    prices, failed = fetch_prices(symbols.unique().tolist(), source, chunk_size, max_workers, retries)
+
+    df = df.copy()
+    new_prices = symbols.map(prices).dropna()
+    df[price_col] = pd.to_numeric(df[price_col], errors='coerce')
+    df.loc[new_prices.index, price_col] = new_prices.astype(float)
+
+    report = {
+        'updated': len(new_prices),
+        'prices': len(prices),
+        'failed': failed,
+        'skipped': skipped,
+        'seconds': time.time() - t0,
+    }
+    return df, report
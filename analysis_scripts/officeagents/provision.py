@@ -0,0 +1,183 @@
+"""
+Environment Provisioning
+Fingerprints the requirements files and the interpreter's installed packages so that
+notebooks and the scheduler skip pip installs and environment probes when nothing
+changed since the last successful provisioning (standard library only, so it runs
+before any requirement is installed)
+
+Usage (from analysis_scripts, with the venv's python):
+    python -m officeagents.provision [requirements.txt ...] [--force]
+"""
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+import site
+import subprocess
+import sys
+import sysconfig
+import time
+from datetime import datetime
+
+from .settings import cache_dir
+
+DEFAULT_REQUIREMENTS = ["requirements.txt"]
+REQUIREMENT_NAME_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def site_dirs():
+    """Folders this interpreter installs packages into (pip adds/removes entries there)"""
+    paths = sysconfig.get_paths()
+    dirs = [paths['purelib'], paths['platlib']]
+    if site.ENABLE_USER_SITE:
+        dirs.append(site.getusersitepackages())
+    return sorted({os.path.normcase(os.path.abspath(d)) for d in dirs if d and os.path.isdir(d)})
+
+
+def environment_fingerprint(executable, dirs, requirements_files):
+    """
+    sha256 over the requirements file contents, the interpreter binary and the
+    modification times of its package folders. Installing, upgrading or removing a
+    package changes a folder's mtime, so any change to the environment is a new fingerprint.
+    """
+    digest = hashlib.sha256()
+    for path in requirements_files:
+        digest.update(os.path.abspath(path).encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            digest.update(b"<missing>")
+    for path in [executable] + list(dirs):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}|{stat.st_mtime_ns}|{stat.st_size}".encode('utf-8'))
+        except FileNotFoundError:
+            digest.update(f"{path}|<missing>".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _stamp_path(executable):
+    key = hashlib.sha256(os.path.normcase(os.path.abspath(executable)).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir("provision"), f"{key}.json")
+
+
+def load_stamp(executable):
+    try:
+        with open(_stamp_path(executable), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def current_stamp(executable, requirements_files=None):
+    """
+    The provisioning record for executable if the environment is unchanged since it
+    was written, else None. Only stat()s files, so it can check another interpreter
+    (e.g. the scheduler checking the notebooks' venv) without starting it.
+    """
+    requirements_files = requirements_files or DEFAULT_REQUIREMENTS
+    stamp = load_stamp(executable)
+    if stamp is None:
+        return None
+    fingerprint = environment_fingerprint(executable, stamp['site_dirs'], requirements_files)
+    return stamp if fingerprint == stamp['fingerprint'] else None
+
+
+def requirement_names(requirements_files):
+    """Distribution names listed in requirements files (versions, extras and markers ignored)"""
+    names = []
+    for path in requirements_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                match = REQUIREMENT_NAME_RE.match(line)
+                if match and not line.startswith('-'):
+                    names.append(match.group(1))
+    return names
+
+
+def missing_requirements(requirements_files):
+    """Requirements without installed package metadata (no pip or import needed to check)"""
+    missing = []
+    for name in requirement_names(requirements_files):
+        # e.g. "typing": a backport package on PyPI, part of the standard library here
+        if name in getattr(sys, 'stdlib_module_names', ()):
+            continue
+        try:
+            importlib.metadata.distribution(name)
+        except importlib.metadata.PackageNotFoundError:
+            missing.append(name)
+    return missing
+
+
+def ensure_environment(requirements_files=None, force=False):
+    """
+    Make sure every requirement is installed in this interpreter, doing nothing when the
+    environment fingerprint matches the last successful provisioning.
+
+    Returns:
+        dict: {'skipped': bool, 'installed': [names], 'seconds': time spent now,
+        'saved_seconds': time the last provisioning that installed packages took (when skipped)}
+    """
+    requirements_files = requirements_files or DEFAULT_REQUIREMENTS
+    t0 = time.time()
+    stamp = None if force else current_stamp(sys.executable, requirements_files)
+    if stamp is not None:
+        print(f"✅ Environment unchanged since {stamp['provisioned_at']} - skipped package installs "
+              f"(saved ~{stamp['provision_seconds']:.1f}s)")
+        return {'skipped': True, 'installed': [], 'seconds': time.time() - t0,
+                'saved_seconds': stamp['provision_seconds']}
+
+    missing = missing_requirements(requirements_files)
+    if missing:
+        print(f"📦 Installing {len(missing)} missing packages: {', '.join(missing)}")
+        result = subprocess.run([sys.executable, '-m', 'pip', 'install', '-q'] + missing,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            # No stamp, so the next run tries again
+            raise RuntimeError(f"pip install failed: {result.stderr.strip()[-2000:]}")
+        importlib.invalidate_caches()
+    else:
+        print("✅ All requirements already installed")
+
+    dirs = site_dirs()
+    elapsed = time.time() - t0
+    # What a skipped run saves: the cost of the last provisioning that had to run pip
+    previous = load_stamp(sys.executable) or {}
+    provision_seconds = elapsed if missing else max(elapsed, previous.get('provision_seconds', 0))
+    stamp = {
+        'executable': sys.executable,
+        'python_version': sys.version.split()[0],
+        'prefix': sys.prefix,
+        'site_dirs': dirs,
+        'requirements': [os.path.abspath(p) for p in requirements_files],
+        'fingerprint': environment_fingerprint(sys.executable, dirs, requirements_files),
+        'provisioned_at': datetime.now().isoformat(timespec='seconds'),
+        'provision_seconds': round(provision_seconds, 2),
+    }
+    path = _stamp_path(sys.executable)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(stamp, f, indent=1)
+    os.replace(path + ".tmp", path)
+    print(f"🔏 Environment fingerprint recorded ({elapsed:.1f}s)")
+    return {'skipped': False, 'installed': missing, 'seconds': elapsed, 'saved_seconds': 0.0}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    force = '--force' in argv
+    requirements_files = [a for a in argv if a != '--force'] or DEFAULT_REQUIREMENTS
+    try:
+        ensure_environment(requirements_files, force=force)
+    except Exception as e:
+        print(f"❌ Provisioning failed: {e}")
+        return 1
+    print(f"🐍 Python {sys.version.split()[0]} ({sys.executable})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+"""
+Report Writers
+The Perplexity notebook's report loops as functions: one Word report per equity,
+the portfolio outlook report and the ratings change report
+"""
+
+import os
+import time
+from datetime import datetime
+
+from docx import Document
+
+from .batch_prompts import chat_batched, chunk
+from .docx_render import add_markdown_to_word, PORTFOLIO_TABLE_FORMAT
+from .fragments import FragmentStore, assemble_report, prune_stores, store_name
+
+GENERATED_BY = "Perplexity Sonar Pro Model Generated: {date}"
+
+
+def read_lines(path):
+    """Non-empty stripped lines of a text file (e.g. the equity list)"""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def read_prompt(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def _table_bounds(lines):
+    """(first line, line after the last) of the first markdown table, or (None, None)"""
+    table_start = None
+    for i, line in enumerate(lines):
+        if '|' in line and table_start is None:
+            table_start = i
+        elif table_start is not None and ('|' not in line or not line.strip()):
+            return table_start, i
+    return table_start, None
+
+
+def sort_markdown_table_by_industry(markdown_text):
+    """Sort the rows of the first markdown table by its Industry (or Category) column"""
+    lines = markdown_text.split('\n')
+    table_start, table_end = _table_bounds(lines)
+    if table_start is None or table_end is None:
+        return markdown_text  # No table found
+
+    header = lines[table_start]
+    separator = lines[table_start + 1]
+    rows = lines[table_start + 2:table_end]
+    columns = [col.strip().lower() for col in header.split('|')]
+    if 'industry' in columns:
+        industry_idx = columns.index('industry')
+    elif 'category' in columns:
+        industry_idx = columns.index('category')
+    else:
+        return markdown_text  # No industry/category column
+
+    def get_industry(row):
+        cells = [cell.strip() for cell in row.split('|')]
+        return cells[industry_idx] if industry_idx < len(cells) else ''
+
+    sorted_table = [header, separator] + sorted(rows, key=get_industry)
+    return '\n'.join(lines[:table_start] + sorted_table + lines[table_end:])
+
+
+def sort_and_clean_markdown_table(markdown_text, sort_column_name='Current Consensus Analyst Rating'):
+    """Remove bold/asterisks from the first markdown table and sort it by sort_column_name"""
+    lines = markdown_text.split('\n')
+    table_start, table_end = _table_bounds(lines)
+    if table_start is None or table_end is None:
+        return markdown_text  # No table found
+
+    def clean(text):
+        return text.replace('**', '').replace('*', '').replace('__', '')
+
+    header_clean = clean(lines[table_start])
+    separator = lines[table_start + 1]
+    rows_clean = [clean(row) for row in lines[table_start + 2:table_end]]
+    columns = [col.strip().lower() for col in header_clean.split('|')]
+    if sort_column_name.lower() not in columns:
+        return '\n'.join([header_clean, separator] + rows_clean + lines[table_end:])
+    sort_idx = columns.index(sort_column_name.lower())
+
+    def get_sort_key(row):
+        cells = [cell.strip() for cell in row.split('|')]
+        return cells[sort_idx] if sort_idx < len(cells) else ''
+
+    sorted_table = [header_clean, separator] + sorted(rows_clean, key=get_sort_key)
+    return '\n'.join(lines[:table_start] + sorted_table + lines[table_end:])
+
+
+def _cells(row):
+    """Cells of a markdown table row, without the outer pipes"""
+    cells = [cell.strip() for cell in row.strip().split('|')]
+    return cells[1:-1] if row.strip().startswith('|') else cells
+
+
+def _row_ticker(cells, ticker_idx):
+    if ticker_idx >= len(cells):
+        return ''
+    words = cells[ticker_idx].replace('*', '').replace('_', '').replace('`', '').split()
+    return words[0].upper() if words else ''
+
+
+def merge_markdown_tables(answers, tickers):
+    """
+    Merge the first markdown table of each chunk's answer into one table. Rows are matched to
+    tickers by the Ticker/Symbol column (else the first column); rows for tickers that were
+    not asked for, or already seen, are dropped. The text around the first table is kept.
+
+    Returns:
+        (merged markdown or None if no answer had a table, list of tickers without a row)
+    """
+    wanted = {t.upper(): t for t in tickers}
+    seen = set()
+    base, header, merged_rows = None, None, []
+    for answer in answers:
+        lines = (answer or '').split('\n')
+        table_start, table_end = _table_bounds(lines)
+        if table_start is None or table_start + 1 >= len(lines):
+            continue
+        table_end = table_end or len(lines)
+        columns = [col.lower() for col in _cells(lines[table_start])]
+        if header is None:
+            base, header = (lines, table_start, table_end), columns
+        ticker_idx = next((columns.index(name) for name in ('ticker', 'symbol') if name in columns), 0)
+        # Line up columns by name when this chunk's header matches the first one's
+        order = [columns.index(col) for col in header] if set(header) <= set(columns) else None
+        for row in lines[table_start + 2:table_end]:
+            cells = _cells(row)
+            ticker = wanted.get(_row_ticker(cells, ticker_idx))
+            if ticker is None or ticker in seen:
+                continue
+            seen.add(ticker)
+            if order is not None:
+                cells = [cells[i] if i < len(cells) else '' for i in order]
+            merged_rows.append('| ' + ' | '.join(cells) + ' |')
+
+    missing = [t for t in tickers if t not in seen]
+    if base is None:
+        return None, missing
+    lines, table_start, table_end = base
+    table = lines[table_start:table_start + 2] + merged_rows
+    return '\n'.join(lines[:table_start] + table + (lines[table_end:] or [''])), missing
+
+
+def chat_portfolio_chunked(client, equities, template, model, chunk_size=25):
+    """
+    Map-reduce the portfolio prompt: one request per chunk_size equities (client.chat_many runs
+    them concurrently), the chunks' tables merged into one, and equities missing from the merged
+    table re-requested once in their own chunks.
+
+    Returns:
+        (merged markdown, list of equities still missing, list of the ticker lists sent
+        (chunks, then re-requests), one per request)
+    """
+    def prompt(tickers):
+        return f"For the equities {', '.join(tickers)} {template}"
+
+    chunks = chunk(list(equities), chunk_size)
+    sent = list(chunks)
+    t0 = time.time()
+    results = client.chat_many([prompt(tickers) for tickers in chunks], model=model)
+    for tickers, result in zip(chunks, results):
+        if result['error'] is not None:
+            print(f"❌ Chunk {tickers[0]}..{tickers[-1]} failed: {result['error']}")
+    answers = [result['text'] for result in results]
+    merged, missing = merge_markdown_tables(answers, equities)
+    print(f"Portfolio: {len(chunks)} chunks of up to {chunk_size} equities in {time.time() - t0:.1f}s")
+
+    if missing:
+        print(f"🔁 Re-requesting {len(missing)} equities missing from the table: {', '.join(missing)}")
+        retry_chunks = chunk(missing, chunk_size)
+        sent += retry_chunks
+        retry = client.chat_many([prompt(tickers) for tickers in retry_chunks], model=model)
+        answers += [result['text'] for result in retry]
+        merged, missing = merge_markdown_tables(answers, equities)
+    if merged is None:
+        raise RuntimeError("No chunk of the portfolio answer contained a table")
+    return merged, missing, sent
+
+
+def new_report(title, date_str):
+    doc = Document()
+    doc.add_heading(title, 0)
+    doc.add_paragraph(GENERATED_BY.format(date=date_str))
+    doc.add_paragraph()
+    return doc
+
+
+def write_equity_reports(client, equities, template, output_dir, model, date_str=None):
+    """
+    One "Equity Report - <ticker> <date>.docx" per equity, skipping equities that already
+    have today's report. Reports are saved as each API call finishes.
+
+    Returns:
+        dict: {'saved': [tickers], 'skipped': [tickers], 'failed': {ticker: error}}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    report = {'saved': [], 'skipped': [], 'failed': {}}
+
+    pending = []
+    for equity in equities:
+        output_path = os.path.join(output_dir, f"Equity Report - {equity} {date_str}.docx")
+        if os.path.exists(output_path):
+            report['skipped'].append(equity)
+            continue
+        pending.append((equity, f"For the equity {equity} {template}", output_path))
+
+    def save_equity_report(index, result):
+        equity, prompt, output_path = pending[index]
+        if result['error'] is not None:
+            print(f"❌ Error processing {equity}: {result['error']}")
+            report['failed'][equity] = str(result['error'])
+            return
+        try:
+            doc = new_report(f"Market Outlook Report - {equity}", date_str)
+            add_markdown_to_word(doc, result['text'])
+            doc.add_paragraph()
+            doc.add_heading("Prompt Used:", level=2)
+            doc.add_paragraph(prompt)
+            doc.save(output_path)
+            report['saved'].append(equity)
+            print(f"✅ {equity} ({result['seconds']:.1f}s)")
+        except Exception as e:
+            print(f"❌ Error processing {equity}: {e}")
+            report['failed'][equity] = str(e)
+
+    print(f"Querying Perplexity API for {len(pending)} equities ({client.max_concurrency} at a time)...")
+    client.chat_many([prompt for _, prompt, _ in pending], model=model, on_result=save_equity_report)
+    return report
+
+
+def write_portfolio_report(client, equities, template, output_dir, model, date_str=None, chunk_size=None):
+    """
+    "Portfolio Report <date>.docx": one prompt for the whole equity list, table sorted by
+    industry and rendered small and plain. With chunk_size, lists longer than chunk_size are
+    queried in concurrent chunks and merged (see chat_portfolio_chunked).
+
+    Returns:
+        str or None: Path of the saved report (None if today's report already existed)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    output_filename = f"Portfolio Report {date_str}.docx"
+    output_path = os.path.join(output_dir, output_filename)
+    if os.path.exists(output_path):
+        print(f"⏭️  Skipping portfolio - report already exists for {date_str}")
+        return None
+
+    sent = None
+    if chunk_size and len(equities) > chunk_size:
+        generated_text, missing, sent = chat_portfolio_chunked(client, equities, template, model, chunk_size)
+        if missing:
+            print(f"⚠️  No row for {len(missing)} equities: {', '.join(missing)}")
+    else:
+        generated_text = client.chat(f"For the equities {', '.join(equities)} {template}", model=model)
+    sorted_markdown = sort_markdown_table_by_industry(generated_text)
+
+    doc = new_report("Market Outlook Portfolio Report", date_str)
+    add_markdown_to_word(doc, sorted_markdown, **PORTFOLIO_TABLE_FORMAT)
+    doc.add_paragraph()
+    doc.add_heading("Prompt Used:", level=2)
+    if sent is None:
+        doc.add_paragraph(f"For the equities {', '.join(equities)} {template}")
+    else:
+        # The prompts actually sent: the template once, then the equities of each request
+        doc.add_paragraph(f"For the equities <chunk> {template}")
+        doc.add_paragraph(f"Sent as {len(sent)} requests of up to {chunk_size} equities; <chunk> was:")
+        for tickers in sent:
+            doc.add_paragraph(', '.join(tickers), style='List Number')
+    doc.save(output_path)
+    print(f"✅ Saved: {output_filename}")
+    return output_path
+
+
+def write_ratings_report(client, equities, template, output_dir, model, batch_size=5, date_str=None):
+    """
+    "Ratings Change Report <date>.docx" with one section per equity. Sections are saved as
+    fragments as soon as they arrive (see fragments.py), so a rerun after a crash only
+    queries the equities without one; the report is assembled from the fragments.
+    Fragment folders older than a week are deleted once the report is saved.
+
+    Returns:
+        dict: {'path', 'queried', 'missing': [tickers without a section], 'seconds'}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    date_str = date_str or datetime.now().strftime('%Y-%m-%d')
+    output_filename = f"Ratings Change Report {date_str}.docx"
+    output_path = os.path.join(output_dir, output_filename)
+
+    # Sections saved under another prompt or model are not reused
+    fragments = FragmentStore(store_name("ratings-change", date_str, template, model))
+    pending = fragments.missing(equities)
+
+    def save_fragment(equity, result):
+        if result['error'] is not None:
+            print(f"❌ Error processing {equity}: {result['error']}")
+            fragments.save_error(equity, result['error'])
+            return
+        fragments.save(equity, result)
+        if result.get('ttft') is not None:
+            print(f"✅ {equity}: first token {result['ttft']:.1f}s, {result['tokens_per_second'] or 0:.0f} tokens/s")
+
+    print(f"Querying {len(pending)} of {len(equities)} equities ({len(equities) - len(pending)} already saved)")
+    t0 = time.time()
+    chat_batched(client, pending, template, model=model, batch_size=batch_size, on_result=save_fragment,
+                 stream=True)
+    seconds = time.time() - t0
+    print(f"Ratings change API calls for {len(pending)} equities: {seconds:.2f} seconds")
+
+    doc = new_report("Ratings Change Report", date_str)
+
+    def render_section(doc, equity, fragment, error):
+        doc.add_heading(f"{equity}", level=1)
+        if fragment is not None:
+            add_markdown_to_word(doc, fragment['text'])
+        else:
+            doc.add_paragraph(f"❌ Error processing {equity}: {error or 'no response'}")
+        doc.add_paragraph()  # Space between equities
+
+    missing = assemble_report(doc, fragments, equities, render_section)
+    doc.add_heading("Prompt Template Used:", level=2)
+    doc.add_paragraph(template)
+    doc.save(output_path)
+    print(f"✅ Saved: {output_filename} in {output_dir}")
+    removed = prune_stores(keep=[fragments.root])
+    if removed:
+        print(f"🧹 Removed {len(removed)} old fragment folders")
+    if missing:
+        print(f"⚠️  {len(missing)} equities failed; rerun to retry them: {', '.join(missing)}")
+    return {'path': output_path, 'queried': len(pending), 'missing': missing, 'seconds': seconds}
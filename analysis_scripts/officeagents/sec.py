@@ -0,0 +1,365 @@
+"""
+SEC EDGAR helpers
+Ticker -> CIK resolution backed by an on-disk copy of SEC's company ticker file, and a
+concurrent, rate-limited filing downloader
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .settings import cache_dir, sec_base_urls, sec_user_agent
+
+# Paths under www.sec.gov / data.sec.gov (roots from settings.sec_base_urls)
+COMPANY_TICKERS_PATH = "/files/company_tickers_exchange.json"
+SUBMISSIONS_PATH = "/submissions/CIK{cik}.json"
+ARCHIVES_PATH = "/Archives/edgar/data/{cik}/{accession}/{document}"
+
+# SEC fair-access policy: no more than 10 requests per second per user
+SEC_MAX_REQUESTS_PER_SECOND = 10
+
+# Records which accession numbers are already downloaded into an output folder
+MANIFEST_FILE = ".sec_manifest.json"
+
+
+class CikResolver:
+    """
+    Resolve stock tickers to zero-padded CIK codes.
+
+    The multi-MB company_tickers_exchange.json is downloaded once, kept on disk and
+    only revalidated (ETag / Last-Modified) after ttl_hours. Lookups use an in-memory
+    dict, so resolving a whole equity list costs at most one HTTP request.
+    """
+
+    def __init__(self, user_agent=None, ttl_hours=24, cache_path=None, session=None):
+        self.user_agent = user_agent or sec_user_agent()
+        self.tickers_url = sec_base_urls()[0] + COMPANY_TICKERS_PATH
+        self.ttl_seconds = ttl_hours * 3600
+        self.cache_path = cache_path or os.path.join(cache_dir("sec"), "company_tickers_exchange.json")
+        self.meta_path = self.cache_path + ".meta"
+        self.session = session or requests.Session()
+        self._index = None
+        self._fetched_at = 0
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_atomic(self, path, content):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _refresh_cache(self):
+        """Download or revalidate the ticker file if it is missing or older than the TTL"""
+        meta = self._read_meta()
+        have_cache = os.path.exists(self.cache_path)
+        self._fetched_at = meta.get('fetched_at', 0)
+        if have_cache and time.time() - self._fetched_at < self.ttl_seconds:
+            return
+
+        headers = {"User-Agent": self.user_agent}
+        if have_cache and meta.get('etag'):
+            headers["If-None-Match"] = meta['etag']
+        if have_cache and meta.get('last_modified'):
+            headers["If-Modified-Since"] = meta['last_modified']
+
+        try:
+            resp = self.session.get(self.tickers_url, headers=headers, timeout=60)
+        except requests.RequestException as e:
+            if have_cache:
+                print(f"⚠️ Could not revalidate SEC ticker file ({e}) - using cached copy")
+                self._fetched_at = time.time()
+                return
+            raise
+
+        if resp.status_code == 304:
+            meta['fetched_at'] = time.time()
+        elif resp.status_code == 200:
+            self._write_atomic(self.cache_path, resp.content)
+            meta = {
+                'fetched_at': time.time(),
+                'etag': resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+            }
+            self._index = None
+        elif have_cache:
+            print(f"⚠️ SEC ticker file refresh failed (status {resp.status_code}) - using cached copy")
+            self._fetched_at = time.time()
+            return
+        else:
+            raise RuntimeError(f"Failed to fetch CIK data. Status code: {resp.status_code}")
+        self._fetched_at = meta['fetched_at']
+        self._write_atomic(self.meta_path, json.dumps(meta).encode('utf-8'))
+
+    @staticmethod
+    def build_index(data):
+        """Turn SEC's {'fields': [...], 'data': [[...], ...]} layout into {TICKER: CIK}"""
+        if not (isinstance(data, dict) and "fields" in data and "data" in data):
+            raise ValueError("Unexpected SEC JSON structure.")
+        fields = [f.lower() for f in data["fields"]]
+        ticker_idx = next((i for i, f in enumerate(fields) if f == "ticker"), None)
+        cik_idx = next((i for i, f in enumerate(fields) if "cik" in f), None)
+        if ticker_idx is None or cik_idx is None:
+            raise ValueError("Could not find required fields in SEC data.")
+
+        index = {}
+        for entry in data["data"]:
+            ticker = entry[ticker_idx]
+            # First listing wins, matching the original linear scan
+            if ticker and ticker.upper() not in index:
+                index[ticker.upper()] = str(entry[cik_idx]).zfill(10)
+        return index
+
+    @property
+    def index(self):
+        if self._index is None or time.time() - self._fetched_at >= self.ttl_seconds:
+            self._refresh_cache()
+            if self._index is None:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self._index = self.build_index(json.load(f))
+        return self._index
+
+    def get(self, ticker):
+        """CIK for one ticker as a zero-padded string, or None if SEC does not list it"""
+        return self.index.get(ticker.strip().upper())
+
+    def resolve_many(self, tickers):
+        """
+        Resolve a whole list in one pass.
+
+        Returns:
+            dict: {ticker: CIK or None}, in the order given
+        """
+        index = self.index
+        resolved = {ticker: index.get(ticker.strip().upper()) for ticker in tickers}
+        missing = [ticker for ticker, cik in resolved.items() if cik is None]
+        if missing:
+            print(f"Tickers not found in SEC database: {', '.join(missing)}")
+        return resolved
+
+
+_default_resolver = None
+
+
+def get_cik(ticker):
+    """
+    Retrieve the CIK (Central Index Key) for a given stock ticker from the SEC database.
+    Returns the CIK as a zero-padded string if found, otherwise None.
+    """
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = CikResolver()
+    try:
+        cik = _default_resolver.get(ticker)
+    except Exception as e:
+        print(f"Failed to fetch CIK data: {e}")
+        return None
+    if cik is None:
+        print(f"Ticker {ticker} not found in SEC database.")
+    return cik
+
+
+class TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request may be sent"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SecFilingDownloader:
+    """
+    Fetches recent filings for many companies in parallel.
+
+    All requests share one pooled Session and one token bucket, so total throughput
+    stays under SEC's limit no matter how many worker threads are running. Filings
+    already listed in the output folder's manifest (by accession number) are skipped
+    and documents are streamed straight to disk.
+    """
+
+    def __init__(self, user_agent=None, max_workers=8, requests_per_second=SEC_MAX_REQUESTS_PER_SECOND,
+                 session=None, retries=3):
+        self.user_agent = user_agent or sec_user_agent()
+        self.www_url, self.data_url = sec_base_urls()
+        self.max_workers = max_workers
+        self.retries = retries
+        self.limiter = TokenBucket(requests_per_second)
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": self.user_agent})
+        self._manifest_lock = threading.Lock()
+
+    def _get(self, url, stream=False):
+        """Rate-limited GET; backs off and retries when SEC answers 429/503"""
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            resp = self.session.get(url, stream=stream, timeout=60)
+            if resp.status_code not in (429, 503) or attempt == self.retries:
+                return resp
+            resp.close()
+            time.sleep(float(resp.headers.get("Retry-After") or 2 ** attempt))
+        return resp
+
+    def get_sec_filings(self, cik, forms=("10-K", "10-Q", "8-K")):
+        """
+        Retrieve the most recent filing of each requested form type for a given CIK.
+        Returns a list of up to len(forms) filings (one per form type).
+        """
+        try:
+            resp = self._get(self.data_url + SUBMISSIONS_PATH.format(cik=str(cik).zfill(10)))
+            if resp.status_code != 200:
+                print(f"Failed to fetch filings for CIK {cik}. Status code: {resp.status_code}")
+                return []
+            data = resp.json()
+        except Exception as e:
+            print(f"Error fetching filings for CIK {cik}: {e}")
+            return []
+
+        filings_dict = {}
+        recent = data.get("filings", {}).get("recent", {})
+        accession_list = recent.get("accessionNumber", [])
+        filing_dates = recent.get("filingDate", [])
+        primary_docs = recent.get("primaryDocument", [])
+        for i, form in enumerate(recent.get("form", [])):
+            if form in forms and form not in filings_dict:
+                has_doc = i < len(accession_list) and i < len(primary_docs)
+                filings_dict[form] = {
+                    "form": form,
+                    "date": filing_dates[i] if i < len(filing_dates) else None,
+                    "accession": accession_list[i] if i < len(accession_list) else None,
+                    "url": self.www_url + ARCHIVES_PATH.format(
+                        cik=int(cik), accession=accession_list[i].replace('-', ''), document=primary_docs[i]
+                    ) if has_doc else None,
+                }
+                if len(filings_dict) == len(forms):
+                    break
+        return [filings_dict[form] for form in forms if form in filings_dict]
+
+    def _read_manifest(self, output_dir):
+        try:
+            with open(os.path.join(output_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _record_download(self, output_dir, accession, filename):
+        with self._manifest_lock:
+            manifest = self._read_manifest(output_dir)
+            manifest[accession] = filename
+            tmp_path = os.path.join(output_dir, MANIFEST_FILE + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1)
+            os.replace(tmp_path, os.path.join(output_dir, MANIFEST_FILE))
+
+    def download_sec_filings(self, ticker, filings, output_dir):
+        """
+        Download SEC filings into output_dir as {ticker}_{form}_{date}.html, skipping
+        accession numbers that were already downloaded.
+
+        Returns:
+            list: the filings, each with 'path' and 'status' (saved | skipped | failed)
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = self._read_manifest(output_dir)
+        results = []
+        for filing in filings:
+            filing = dict(filing)
+            url, form, date = filing.get("url"), filing.get("form"), filing.get("date")
+            if not url or not form or not date:
+                print(f"Skipping incomplete filing for {ticker}: {filing}")
+                filing['status'] = 'failed'
+                results.append(filing)
+                continue
+
+            filename = f"{ticker}_{form}_{date}.html"
+            filepath = os.path.join(output_dir, filename)
+            filing['path'] = filepath
+            accession = filing.get("accession")
+            known = manifest.get(accession)
+            if known and os.path.exists(os.path.join(output_dir, known)):
+                filing['path'] = os.path.join(output_dir, known)
+                filing['status'] = 'skipped'
+                results.append(filing)
+                continue
+            if os.path.exists(filepath):
+                # Downloaded before the manifest existed
+                if accession:
+                    self._record_download(output_dir, accession, filename)
+                filing['status'] = 'skipped'
+                results.append(filing)
+                continue
+
+            try:
+                with self._get(url, stream=True) as resp:
+                    if resp.status_code != 200:
+                        print(f"Failed to download {url} (status {resp.status_code})")
+                        filing['status'] = 'failed'
+                        results.append(filing)
+                        continue
+                    tmp_path = filepath + ".part"
+                    with open(tmp_path, "wb") as f:
+                        for chunk in resp.iter_content(chunk_size=64 * 1024):
+                            f.write(chunk)
+                os.replace(tmp_path, filepath)
+                if accession:
+                    self._record_download(output_dir, accession, filename)
+                print(f"Saved: {filepath}")
+                filing['status'] = 'saved'
+            except Exception as e:
+                print(f"Error downloading {url}: {e}")
+                if os.path.exists(filepath + ".part"):
+                    os.remove(filepath + ".part")
+                filing['status'] = 'failed'
+            results.append(filing)
+        return results
+
+    def download_all(self, ciks, output_dir, forms=("10-K", "10-Q", "8-K")):
+        """
+        Fetch and download the latest filings for every ticker concurrently.
+
+        Args:
+            ciks (dict): {ticker: CIK or None}, e.g. from CikResolver.resolve_many
+            output_dir (str): Folder for the filing HTML files
+
+        Returns:
+            dict: {ticker: [filings with 'path' and 'status']} in the order given
+        """
+        def fetch(ticker, cik):
+            return self.download_sec_filings(ticker, self.get_sec_filings(cik, forms), output_dir)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {ticker: executor.submit(fetch, ticker, cik) for ticker, cik in ciks.items() if cik}
+            results = {ticker: future.result() for ticker, future in futures.items()}
+
+        statuses = [filing['status'] for filings in results.values() for filing in filings]
+        print(f"SEC filings: {statuses.count('saved')} saved, {statuses.count('skipped')} already on disk, "
+              f"{statuses.count('failed')} failed")
+        return results
@@ -0,0 +1,323 @@
+"""
+SEC Filing Index
+Parses each downloaded filing ({ticker}_{form}_{date}.html) once into clean text, finds
+the Risk Factors and MD&A sections, and stores the text as passages in a SQLite FTS5
+table, so prompts can pull relevant excerpts in milliseconds.
+
+Usage (from analysis_scripts):
+    python -m officeagents index                     # as a pipeline stage
+    python -m officeagents.sec_index search "supply chain" --ticker AAPL --section risk_factors
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from datetime import datetime
+
+from .settings import cache_dir
+
+SECTIONS = ("risk_factors", "mda", "other")
+# filings column telling whether a filing has the section
+SECTION_CHARS = {'risk_factors': 'risk_factors_chars', 'mda': 'mda_chars', 'other': 'chars'}
+PASSAGE_CHARS = 1200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    ticker TEXT,
+    form TEXT,
+    date TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    chars INTEGER,
+    risk_factors_chars INTEGER,
+    mda_chars INTEGER,
+    indexed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_filings_ticker ON filings(ticker, date);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text, ticker UNINDEXED, form UNINDEXED, date UNINDEXED, section UNINDEXED, filing_id UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+# Block elements end a line of text; table cells are separated by a space
+BLOCK_TAGS = ['p', 'div', 'br', 'tr', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'title']
+CELL_TAGS = ['td', 'th']
+
+ITEM_HEADING_RE = re.compile(r"^\s*item\s*(\d{1,2}[a-z]?)\b", re.IGNORECASE)
+MAX_HEADING_CHARS = 200
+
+
+def parse_filename(path):
+    """(ticker, form, date) from {ticker}_{form}_{date}.html, or (None, None, None)"""
+    parts = os.path.splitext(os.path.basename(path))[0].rsplit('_', 2)
+    return tuple(parts) if len(parts) == 3 else (None, None, None)
+
+
+def html_to_lines(html):
+    """Visible text of a filing as non-empty, whitespace-normalised lines"""
+    from bs4 import BeautifulSoup
+    try:
+        soup = BeautifulSoup(html, 'lxml')
+    except Exception:
+        soup = BeautifulSoup(html, 'html.parser')
+    # Inline XBRL carries a hidden header of facts; scripts and styles are not text
+    for tag in soup.find_all(['script', 'style', 'ix:header']):
+        tag.decompose()
+    for tag in soup.find_all(CELL_TAGS):
+        tag.append(' ')
+    for tag in soup.find_all(BLOCK_TAGS):
+        tag.append('\n')
+    lines = (' '.join(line.split()) for line in soup.get_text().split('\n'))
+    return [line for line in lines if line]
+
+
+def _section_of(heading):
+    """'risk_factors' / 'mda' for an Item heading line, else None"""
+    text = heading.lower()
+    item = ITEM_HEADING_RE.match(heading).group(1).lower()
+    if item == '1a' and 'risk factors' in text:
+        return 'risk_factors'
+    if item in ('7', '2') and 'management' in text and 'discussion' in text:
+        return 'mda'  # Item 7 in a 10-K, Part I Item 2 in a 10-Q
+    return None
+
+
+def find_sections(lines):
+    """
+    {section: (first line, line after the last)} for Risk Factors and MD&A. A section runs
+    from its Item heading to the next Item heading; when a heading appears more than once
+    (table of contents, cross references) the longest span wins.
+    """
+    headings = [i for i, line in enumerate(lines)
+                if len(line) <= MAX_HEADING_CHARS and ITEM_HEADING_RE.match(line)]
+    spans = {}
+    for n, start in enumerate(headings):
+        section = _section_of(lines[start])
+        if section is None:
+            continue
+        end = headings[n + 1] if n + 1 < len(headings) else len(lines)
+        length = sum(len(line) for line in lines[start:end])
+        if section not in spans or length > spans[section][2]:
+            spans[section] = (start, end, length)
+    return {section: (start, end) for section, (start, end, _) in spans.items()}
+
+
+def split_passages(lines, sections, max_chars=PASSAGE_CHARS):
+    """[(section, text)] with passages of about max_chars, never crossing a section boundary"""
+    labels = ['other'] * len(lines)
+    for section, (start, end) in sections.items():
+        labels[start:end] = [section] * (end - start)
+    passages, current, size = [], [], 0
+    for i, line in enumerate(lines):
+        if current and (labels[i] != labels[i - 1] or size + len(line) > max_chars):
+            passages.append((labels[i - 1], '\n'.join(current)))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        passages.append((labels[-1], '\n'.join(current)))
+    return passages
+
+
+def parse_filing(path):
+    """Parse one filing file into its metadata and passages (runs in a worker process)"""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        lines = html_to_lines(f.read())
+    sections = find_sections(lines)
+    ticker, form, date = parse_filename(path)
+    return {
+        'path': os.path.abspath(path),
+        'ticker': ticker,
+        'form': form,
+        'date': date,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'chars': sum(len(line) for line in lines),
+        'section_chars': {section: sum(len(line) for line in lines[start:end])
+                          for section, (start, end) in sections.items()},
+        'passages': split_passages(lines, sections),
+    }
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query of quoted terms (all must match)"""
+    terms = re.findall(r"[\w'&.-]+", text)
+    return ' '.join('"' + term.replace('"', '') + '"' for term in terms)
+
+
+class FilingIndex:
+    """SQLite database of parsed filings with an FTS5 passage table (one short connection per call)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir("sec"), "filings.db")
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _store(self, conn, filing):
+        """Replace a filing's row and passages (one transaction per filing)"""
+        with conn:
+            old = conn.execute("SELECT id FROM filings WHERE path = ?", (filing['path'],)).fetchone()
+            if old is not None:
+                conn.execute("DELETE FROM passages WHERE filing_id = ?", (old['id'],))
+                conn.execute("DELETE FROM filings WHERE id = ?", (old['id'],))
+            filing_id = conn.execute(
+                "INSERT INTO filings (path, ticker, form, date, size, mtime_ns, chars, risk_factors_chars, mda_chars, "
+                "indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (filing['path'], filing['ticker'], filing['form'], filing['date'], filing['size'],
+                 filing['mtime_ns'], filing['chars'], filing['section_chars'].get('risk_factors', 0),
+                 filing['section_chars'].get('mda', 0), datetime.now().isoformat(timespec='seconds'))).lastrowid
+            conn.executemany(
+                "INSERT INTO passages (text, ticker, form, date, section, filing_id) VALUES (?, ?, ?, ?, ?, ?)",
+                [(text, filing['ticker'], filing['form'], filing['date'], section, filing_id)
+                 for section, text in filing['passages']])
+
+    def index_folder(self, folder, max_workers=None):
+        """
+        Index new and changed *.html filings in folder (by size and mtime) in parallel worker
+        processes, and drop filings whose file is gone.
+
+        Returns:
+            dict: {'indexed', 'unchanged', 'removed', 'failed': {path: error}, 'seconds'}
+        """
+        t0 = time.time()
+        folder = os.path.abspath(folder)
+        on_disk = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(('.html', '.htm')):
+                    stat = entry.stat()
+                    on_disk[entry.path] = (stat.st_size, stat.st_mtime_ns)
+
+        with closing(self._connect()) as conn:
+            known = {row['path']: (row['id'], row['size'], row['mtime_ns']) for row in conn.execute(
+                "SELECT id, path, size, mtime_ns FROM filings WHERE path LIKE ?", (os.path.join(folder, '%'),))}
+            pending = [path for path, stamp in on_disk.items() if known.get(path, (None, None, None))[1:] != stamp]
+            removed = [filing_id for path, (filing_id, _, _) in known.items() if path not in on_disk]
+            with conn:
+                for filing_id in removed:
+                    conn.execute("DELETE FROM passages WHERE filing_id = ?", (filing_id,))
+                    conn.execute("DELETE FROM filings WHERE id = ?", (filing_id,))
+
+            failed = {}
+
+            def store(path, parsed):
+                try:
+                    self._store(conn, parsed())
+                except Exception as e:
+                    print(f"❌ Could not index {os.path.basename(path)}: {e}")
+                    failed[path] = str(e)
+
+            print(f"📚 Indexing {len(pending)} of {len(on_disk)} filings ({len(on_disk) - len(pending)} unchanged)")
+            if len(pending) > 1:
+                # Parsing HTML is CPU bound: one process per core; results are written here, one at a time
+                with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                    for path, future in [(path, executor.submit(parse_filing, path)) for path in pending]:
+                        store(path, future.result)
+            else:
+                for path in pending:
+                    store(path, lambda: parse_filing(path))
+            indexed = len(pending) - len(failed)
+
+        report = {'indexed': indexed, 'unchanged': len(on_disk) - len(pending), 'removed': len(removed),
+                  'failed': failed, 'seconds': time.time() - t0}
+        print(f"✅ Indexed {indexed} filings in {report['seconds']:.1f}s ({len(removed)} removed, {len(failed)} failed)")
+        return report
+
+    def search(self, query, ticker=None, section=None, form=None, limit=10, raw=False):
+        """
+        Best matching passages (bm25) as dicts {'ticker', 'form', 'date', 'section', 'excerpt',
+        'text', 'score'}. query is free text unless raw=True (FTS5 syntax: OR, NEAR, prefix*).
+        """
+        match = query if raw else fts_query(query)
+        if not match:
+            return []
+        sql = ("SELECT ticker, form, date, section, text, bm25(passages) AS score, "
+               "snippet(passages, 0, '**', '**', ' … ', 24) AS excerpt FROM passages WHERE passages MATCH ?")
+        params = [match]
+        for column, value in (('ticker', ticker), ('section', section), ('form', form)):
+            if value:
+                sql += f" AND {column} = ?"
+                params.append(value.upper() if column == 'ticker' else value)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    def excerpts(self, ticker, query=None, sections=("risk_factors", "mda"), max_chars=4000):
+        """
+        Prompt-ready excerpts for one ticker: the passages best matching query, or without a
+        query the opening passages of each section of the latest filing that has it.
+        """
+        if query:
+            passages = [p for section in sections for p in self.search(query, ticker=ticker, section=section,
+                                                                         limit=5)]
+            passages.sort(key=lambda p: p['score'])
+        else:
+            passages = []
+            with closing(self._connect()) as conn:
+                for section in sections:
+                    passages += [dict(row) for row in conn.execute(
+                        "SELECT p.ticker, p.form, p.date, p.section, p.text FROM passages p "
+                        "WHERE p.filing_id = (SELECT f.id FROM filings f WHERE f.ticker = ? AND "
+                        f"f.{SECTION_CHARS[section]} > 0 ORDER BY f.date DESC LIMIT 1) AND p.section = ? "
+                        "ORDER BY p.rowid LIMIT 3", (ticker.upper(), section))]
+        parts, size = [], 0
+        for p in passages:
+            block = f"[{p['ticker']} {p['form']} {p['date']}, {p['section']}]\n{p['text']}"
+            if size + len(block) > max_chars and parts:
+                break
+            parts.append(block[:max_chars])
+            size += len(block)
+        return "\n\n".join(parts)
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT COUNT(*) AS filings, COUNT(DISTINCT ticker) AS tickers, "
+                               "COALESCE(SUM(chars), 0) AS chars FROM filings").fetchone()
+            passages = conn.execute("SELECT COUNT(*) FROM passages").fetchone()[0]
+        return {**dict(row), 'passages': passages, 'bytes': os.path.getsize(self.path)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="officeagents.sec_index", description="Index and search SEC filings")
+    sub = parser.add_subparsers(dest="command", required=True)
+    index = sub.add_parser("index", help="Index new filings in a folder")
+    index.add_argument("folder", nargs="?", default=os.getenv("Output_dir_sec_filings"))
+    search = sub.add_parser("search", help="Full-text search of the indexed filings")
+    search.add_argument("query")
+    search.add_argument("--ticker")
+    search.add_argument("--section", choices=SECTIONS)
+    search.add_argument("--form")
+    search.add_argument("--limit", type=int, default=10)
+    search.add_argument("--raw", action="store_true", help="Query is FTS5 syntax (OR, NEAR, prefix*)")
+    parser.add_argument("--db", help="Index database (default .cache/sec/filings.db)")
+    args = parser.parse_args(argv)
+
+    filing_index = FilingIndex(args.db)
+    if args.command == "index":
+        if not args.folder:
+            parser.error("folder required (or set Output_dir_sec_filings)")
+        filing_index.index_folder(args.folder)
+        print(filing_index.stats())
+        return 0
+    for hit in filing_index.search(args.query, args.ticker, args.section, args.form, args.limit, raw=args.raw):
+        print(f"{hit['ticker']} {hit['form']} {hit['date']} [{hit['section']}] {hit['excerpt']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
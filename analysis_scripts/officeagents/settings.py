@@ -0,0 +1,30 @@
+"""
+Shared settings read from the environment (.env is loaded by the notebooks)
+"""
+
+import os
+
+
+def cache_dir(*parts):
+    """
+    Local cache folder (Cache_dir in .env, default analysis_scripts/.cache),
+    created on first use. Extra parts name a sub-folder.
+    """
+    root = os.getenv("Cache_dir") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def sec_user_agent():
+    """SEC requires a descriptive User-Agent (name + email) on every request"""
+    return os.getenv("User_Agent")
+
+
+def sec_base_urls():
+    """
+    (www.sec.gov root, data.sec.gov root). SEC_www_url / SEC_data_url in .env point the
+    SEC helpers elsewhere, e.g. at the local stand-in servers used by the benchmarks.
+    """
+    return (os.getenv("SEC_www_url") or "https://www.sec.gov").rstrip("/"), \
+        (os.getenv("SEC_data_url") or "https://data.sec.gov").rstrip("/")
@@ -0,0 +1,159 @@
+"""
+Positions Snapshot Store
+Fingerprints broker exports so unchanged files are not reprocessed, keeps every cleaned
+snapshot in a Parquet history keyed by export and account, and diffs positions between snapshots
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from .settings import cache_dir
+
+INDEX_FILE = "snapshots.json"
+KEY_COLUMNS = ['Account Number', 'Symbol']
+
+# Position changes reported by diff_positions
+NEW, CLOSED, RESIZED = "new", "closed", "resized"
+
+
+def file_fingerprint(path, chunk_size=1024 * 1024):
+    """sha256 of the file content (a re-downloaded but identical export has the same fingerprint)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def diff_positions(old, new, quantity_col='Quantity', value_col='Current Value', tolerance=1e-6):
+    """
+    Position-level changes between two cleaned snapshots, keyed by account and symbol.
+
+    Returns:
+        DataFrame with Account Number, Symbol, change (new | closed | resized),
+        quantity_old, quantity_new, quantity_change, value_old, value_new
+    """
+    def positions(df):
+        if df is None or df.empty:
+            return pd.DataFrame(columns=KEY_COLUMNS + [quantity_col, value_col])
+        return (df.dropna(subset=['Symbol'])
+                  .groupby(KEY_COLUMNS, as_index=False)[[quantity_col, value_col]].sum())
+
+    merged = positions(old).merge(positions(new), on=KEY_COLUMNS, how='outer', suffixes=('_old', '_new'),
+                                  indicator=True)
+    merged = merged.rename(columns={f'{quantity_col}_old': 'quantity_old', f'{quantity_col}_new': 'quantity_new',
+                                    f'{value_col}_old': 'value_old', f'{value_col}_new': 'value_new'})
+    merged['quantity_change'] = merged['quantity_new'].fillna(0) - merged['quantity_old'].fillna(0)
+    merged['change'] = None
+    merged.loc[merged['_merge'] == 'right_only', 'change'] = NEW
+    merged.loc[merged['_merge'] == 'left_only', 'change'] = CLOSED
+    merged.loc[(merged['_merge'] == 'both') & (merged['quantity_change'].abs() > tolerance), 'change'] = RESIZED
+    changes = merged.dropna(subset=['change'])
+    return changes[KEY_COLUMNS + ['change', 'quantity_old', 'quantity_new', 'quantity_change',
+                                  'value_old', 'value_new']].reset_index(drop=True)
+
+
+class SnapshotStore:
+    """
+    root/snapshots.json lists every ingested export (fingerprint, source, snapshot time);
+    root/positions/positions_<fingerprint>.parquet holds that export's cleaned positions with
+    a snapshot_date column (the export's modification time), so the folder reads as one dataset.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or cache_dir("snapshots")
+        self.positions_dir = os.path.join(self.root, "positions")
+        os.makedirs(self.positions_dir, exist_ok=True)
+        self.index_path = os.path.join(self.root, INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _write_index(self, index):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def _path(self, entry):
+        # Snapshots stored before they were keyed by fingerprint are named by date
+        name = entry.get('file') or f"positions_{entry['snapshot_date']}.parquet"
+        return os.path.join(self.positions_dir, name)
+
+    def entry(self, fingerprint_or_time):
+        """Index entry for an already ingested export (by fingerprint or snapshot time), or None"""
+        return next((e for e in self._read_index()
+                     if fingerprint_or_time in (e['fingerprint'], e['snapshot_date'])), None)
+
+    def has(self, fingerprint):
+        entry = self.entry(fingerprint)
+        return entry is not None and os.path.exists(self._path(entry))
+
+    def snapshot_dates(self):
+        """Snapshot times (ISO strings), oldest first"""
+        return [e['snapshot_date'] for e in self._read_index()]
+
+    def add(self, df, fingerprint, source, snapshot_date=None):
+        """
+        Store a cleaned snapshot under its fingerprint. snapshot_date defaults to the export's
+        modification time, so several exports from the same day are all kept.
+        """
+        if snapshot_date is None:
+            snapshot_date = datetime.fromtimestamp(os.path.getmtime(source)).isoformat(timespec='seconds')
+        snapshot = df.copy()
+        snapshot.insert(0, 'snapshot_date', pd.Timestamp(snapshot_date))
+        entry = {'fingerprint': fingerprint, 'source': os.path.basename(source), 'snapshot_date': snapshot_date,
+                 'file': f"positions_{fingerprint[:16]}.parquet", 'rows': len(df),
+                 'ingested_at': datetime.now().isoformat(timespec='seconds')}
+        path = self._path(entry)
+        tmp_path = path + ".tmp"
+        snapshot.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+        index = [e for e in self._read_index() if e['fingerprint'] != fingerprint]
+        index.append(entry)
+        self._write_index(sorted(index, key=lambda e: (pd.Timestamp(e['snapshot_date']), e['ingested_at'])))
+        return snapshot_date
+
+    def load(self, fingerprint_or_time):
+        """Cleaned positions of one snapshot (by export fingerprint or snapshot time)"""
+        entry = self.entry(fingerprint_or_time)
+        if entry is None:
+            raise KeyError(f"No snapshot {fingerprint_or_time}")
+        return pd.read_parquet(self._path(entry)).drop(columns=['snapshot_date'])
+
+    def history(self, start=None, end=None, accounts=None, columns=None):
+        """All stored snapshots (optionally filtered by date range and accounts) as one frame"""
+        filters = []
+        if start is not None:
+            filters.append(('snapshot_date', '>=', pd.Timestamp(start)))
+        if end is not None:
+            end = pd.Timestamp(end)
+            if end == end.normalize():  # A plain date includes every snapshot taken that day
+                filters.append(('snapshot_date', '<', end + pd.Timedelta(days=1)))
+            else:
+                filters.append(('snapshot_date', '<=', end))
+        if accounts is not None:
+            filters.append(('Account Number', 'in', list(accounts)))
+        if columns is not None:
+            columns = ['snapshot_date'] + [c for c in columns if c != 'snapshot_date']
+        return pd.read_parquet(self.positions_dir, columns=columns, filters=filters or None)
+
+    def diff(self, old, new):
+        """Changes between two snapshots (each by fingerprint or snapshot time)"""
+        return diff_positions(self.load(old), self.load(new))
+
+    def diff_latest(self):
+        """Changes between the two most recent snapshots (None if there is only one)"""
+        index = self._read_index()
+        if len(index) < 2:
+            return None
+        return self.diff(index[-2]['fingerprint'], index[-1]['fingerprint'])
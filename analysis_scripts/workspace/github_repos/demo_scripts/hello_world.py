@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-
+import os
+import sys
 
 print("Hello from Jupyter notebook execution!")
 print("This script was run interactively")
@@ -0,0 +1,180 @@
+"""
+Notebook Checkpoints
+Per-cell progress records and namespace snapshots so that a failed scheduled run
+resumes from the first failed notebook and cell instead of starting over
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+
+
+# Checkpoints live next to the logs folder, relative to the scheduler directory
+CHECKPOINT_DIR = "checkpoints"
+
+
+def cell_hash(source):
+    """Short fingerprint of a cell's source, used to detect edits between attempts"""
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file so a crash never leaves a half-written checkpoint"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Could not read checkpoint {path}: {e}")
+        return None
+
+
+def definition_code(source):
+    """
+    Extract the top-level function and class definitions from a cell.
+
+    Functions and classes defined in a notebook cannot be pickled by value, so on
+    resume they are re-created by replaying just their definitions. IPython magics
+    and shell escapes are replaced with `pass` so the rest of the cell still parses.
+    """
+    lines = []
+    for line in source.splitlines():
+        stripped = line.lstrip()
+        if stripped.startswith(('%', '!')):
+            line = line[:len(line) - len(stripped)] + "pass"
+        lines.append(line)
+    try:
+        tree = ast.parse('\n'.join(lines))
+    except SyntaxError:
+        return ""
+    definitions = [node for node in tree.body
+                   if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+    return '\n\n'.join(ast.unparse(node) for node in definitions)
+
+
+class RunState:
+    """Batch-level record of which notebooks already succeeded for one scheduled period"""
+
+    def __init__(self, root, scheduled_for):
+        self.root = Path(root)
+        self.path = self.root / "run_state.json"
+        self.scheduled_for = scheduled_for
+        self._lock = threading.Lock()
+
+        data = read_json(self.path)
+        if data and data.get('scheduled_for') == scheduled_for:
+            self.notebooks = data.get('notebooks', {})
+        else:
+            if data:
+                # Checkpoints from an older period must never leak into this one
+                logging.info(f"🧹 Discarding checkpoints from {data.get('scheduled_for')}")
+                shutil.rmtree(self.root, ignore_errors=True)
+            self.notebooks = {}
+
+    def completed(self):
+        return {notebook for notebook, status in self.notebooks.items() if status == "success"}
+
+    def mark(self, notebook, status):
+        with self._lock:
+            self.notebooks[notebook] = status
+            self.root.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(self.path, {
+                'scheduled_for': self.scheduled_for,
+                'updated': datetime.now().isoformat(),
+                'notebooks': self.notebooks
+            })
+
+    def clear(self):
+        """Forget everything once the whole batch has succeeded"""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.notebooks = {}
+
+
+class NotebookCheckpoint:
+    """
+    Progress of one notebook within a scheduled period.
+
+    Files in checkpoints/<notebook name>/:
+        progress.json   completed cell indices + source hashes, failed cell and error
+        namespace.pkl   pickled user variables after the last completed cell
+        partial.ipynb   the notebook with outputs of every completed cell
+    """
+
+    def __init__(self, root, notebook_path, scheduled_for):
+        self.dir = Path(root) / Path(notebook_path).stem
+        self.progress_path = self.dir / "progress.json"
+        self.snapshot_path = str(self.dir / "namespace.pkl")
+        self.partial_path = str(self.dir / "partial.ipynb")
+        self.scheduled_for = scheduled_for
+
+        data = read_json(self.progress_path)
+        if data and data.get('scheduled_for') == scheduled_for:
+            self.progress = data
+        else:
+            self.progress = self._fresh()
+
+    def _fresh(self):
+        return {'scheduled_for': self.scheduled_for, 'completed': {}, 'failed_cell': None, 'error': None}
+
+    def _save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.progress['updated'] = datetime.now().isoformat()
+        write_json_atomic(self.progress_path, self.progress)
+
+    def resume_point(self, cells):
+        """
+        Index of the first code cell that still has to run (0 = start from scratch).
+
+        Completed cells only count while their source is unchanged; editing an earlier
+        cell invalidates everything after it.
+        """
+        completed = self.progress['completed']
+        if not completed or not os.path.exists(self.snapshot_path):
+            return 0
+
+        for index, cell in enumerate(cells):
+            if cell['cell_type'] != 'code' or not cell['source'].strip():
+                continue
+            if completed.get(str(index)) != cell_hash(cell['source']):
+                return index
+        return len(cells)
+
+    def definitions(self, cells, before_index):
+        """Definition-only code for every completed cell before the resume point"""
+        blocks = []
+        for cell in cells[:before_index]:
+            if cell['cell_type'] == 'code':
+                code = definition_code(cell['source'])
+                if code:
+                    blocks.append(code)
+        return blocks
+
+    def record_cell(self, index, source):
+        self.progress['completed'][str(index)] = cell_hash(source)
+        self.progress['failed_cell'] = None
+        self.progress['error'] = None
+        self._save()
+
+    def record_failure(self, index, error):
+        self.progress['failed_cell'] = index
+        self.progress['error'] = error
+        self._save()
+
+    def reset(self):
+        """Start this notebook from cell 0 (e.g. after an earlier cell was edited)"""
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.progress = self._fresh()
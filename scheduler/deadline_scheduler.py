@@ -0,0 +1,116 @@
+"""
+Deadline Scheduler
+Sleeps exactly until the next due job (or until another thread submits work)
+instead of waking up every minute to poll
+"""
+
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# Long waits are capped so a machine waking from sleep/hibernate re-checks the wall
+# clock within this many seconds (monotonic timers may not advance while suspended)
+MAX_SLEEP_SECONDS = 3600
+
+
+def parse_weekly_schedule(day, time_str):
+    """Turn ("Sunday", "17:32") into (weekday index, time); raises ValueError if invalid"""
+    try:
+        weekday = WEEKDAYS.index(day.strip().lower())
+    except ValueError:
+        raise ValueError(f"Invalid day: {day}") from None
+    return weekday, datetime.strptime(time_str, "%H:%M").time()
+
+
+def last_weekly_occurrence(day, time_str, now=None):
+    """Most recent occurrence of the weekly day/time at or before now"""
+    now = now or datetime.now()
+    weekday, at = parse_weekly_schedule(day, time_str)
+    candidate = datetime.combine(now.date() - timedelta(days=(now.weekday() - weekday) % 7), at)
+    if candidate > now:
+        candidate -= timedelta(days=7)
+    return candidate
+
+
+def next_weekly_occurrence(day, time_str, now=None):
+    """First occurrence of the weekly day/time strictly after now"""
+    now = now or datetime.now()
+    return last_weekly_occurrence(day, time_str, now) + timedelta(days=7)
+
+
+class DeadlineScheduler:
+    """
+    Single-threaded job loop. Jobs run on the loop thread, one at a time, so a
+    weekly run and a file-triggered run can never overlap.
+    """
+
+    def __init__(self):
+        self._jobs = {}  # name -> {'due': datetime, 'action': callable, 'reschedule': callable or None}
+        self._submitted = queue.Queue()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def add_job(self, name, due, action, reschedule=None):
+        """
+        Schedule action() at due. If reschedule is given it is called with the time the
+        job ran and returns the next due time; otherwise the job runs once.
+        """
+        self._jobs[name] = {'due': due, 'action': action, 'reschedule': reschedule}
+        self._wakeup.set()
+
+    def cancel(self, name):
+        self._jobs.pop(name, None)
+
+    def next_run(self, name=None):
+        """Due time of the named job, or of the earliest job"""
+        if name is not None:
+            job = self._jobs.get(name)
+            return job['due'] if job else None
+        return min((job['due'] for job in self._jobs.values()), default=None)
+
+    def submit(self, action):
+        """Thread-safe: run action() on the loop thread as soon as possible"""
+        self._submitted.put(action)
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def _run(self, name, action):
+        try:
+            action()
+        except Exception as e:
+            logging.error(f"💥 Scheduled job '{name}' failed: {e}")
+
+    def run_forever(self):
+        """Block, running jobs as they fall due, until stop() is called"""
+        while not self._stopped:
+            # Work handed over by other threads (e.g. file watchers)
+            while not self._submitted.empty():
+                action = self._submitted.get_nowait()
+                self._run(getattr(action, '__name__', 'submitted'), action)
+
+            now = datetime.now()
+            for name, job in sorted(self._jobs.items(), key=lambda item: item[1]['due']):
+                if job['due'] > now or self._jobs.get(name) is not job:
+                    continue
+                self._run(name, job['action'])
+                if self._jobs.get(name) is job:
+                    if job['reschedule']:
+                        job['due'] = job['reschedule'](datetime.now())
+                        logging.info(f"📅 Next '{name}' run: {job['due'].strftime('%Y-%m-%d %H:%M:%S')}")
+                    else:
+                        del self._jobs[name]
+
+            next_due = self.next_run()
+            if next_due is None:
+                timeout = MAX_SLEEP_SECONDS
+            else:
+                timeout = min(max((next_due - datetime.now()).total_seconds(), 0), MAX_SLEEP_SECONDS)
+            if timeout > 0 and self._submitted.empty():
+                self._wakeup.wait(timeout)
+            self._wakeup.clear()
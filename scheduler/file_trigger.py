@@ -0,0 +1,176 @@
+"""
+File Arrival Trigger
+Watches a folder for new files matching a pattern (e.g. broker Portfolio_Positions*.csv
+downloads) and fires a callback once each new file has finished being written
+"""
+
+import fnmatch
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    # Native change notifications (inotify / ReadDirectoryChangesW / FSEvents)
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+# Fallback polling interval when watchdog is not installed
+POLL_SECONDS = 30
+
+
+class _ArrivalHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notice(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notice(event.src_path)
+
+    def on_moved(self, event):
+        # Browsers download to a temp name and rename when complete
+        if not event.is_directory:
+            self.watcher.notice(event.dest_path)
+
+
+class FileArrivalWatcher:
+    """
+    Calls callback(path) for every new or replaced file matching pattern in folder.
+
+    A file only counts once its size has stopped changing for settle_seconds, and
+    each (path, size, mtime) is handled once, including across scheduler restarts
+    (state_file). Files that arrived while the scheduler was down are handled at start.
+    """
+
+    def __init__(self, folder, pattern, callback, settle_seconds=10, state_file="file_triggers.json"):
+        self.folder = folder
+        self.pattern = pattern
+        self.callback = callback
+        self.settle_seconds = settle_seconds
+        self.state_file = state_file
+        self._timers = {}
+        self._lock = threading.Lock()
+        self._observer = None
+        self._stop = threading.Event()
+        self._handled = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.warning(f"Could not read file trigger state: {e}")
+            return {}
+
+    def _save_state(self):
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self._handled, f, indent=2)
+        except Exception as e:
+            logging.warning(f"Could not save file trigger state: {e}")
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _matching_files(self):
+        with os.scandir(self.folder) as entries:
+            return [entry.path for entry in entries
+                    if entry.is_file() and fnmatch.fnmatch(entry.name, self.pattern)]
+
+    def notice(self, path):
+        """Record activity on path and (re)start its settle timer"""
+        if not fnmatch.fnmatch(os.path.basename(path), self.pattern):
+            return
+        with self._lock:
+            timer = self._timers.pop(path, None)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(self.settle_seconds, self._settled, args=(path,))
+            timer.daemon = True
+            self._timers[path] = timer
+            timer.start()
+
+    def _settled(self, path):
+        with self._lock:
+            self._timers.pop(path, None)
+        try:
+            signature = self._signature(path)
+        except FileNotFoundError:
+            return  # Temp file renamed away or deleted
+        if self._handled.get(path) == signature:
+            return
+
+        # Still growing? Check again after another quiet period
+        time.sleep(1)
+        try:
+            if self._signature(path) != signature:
+                self.notice(path)
+                return
+        except FileNotFoundError:
+            return
+
+        self._handled[path] = signature
+        self._save_state()
+        logging.info(f"📥 New file detected: {os.path.basename(path)}")
+        self.callback(path)
+
+    def start(self):
+        if not self.folder or not os.path.isdir(self.folder):
+            logging.warning(f"⚠️  Watch folder not found - file trigger disabled: {self.folder}")
+            return False
+
+        # Catch up on the newest export if it arrived while the scheduler was not running;
+        # older exports are only recorded so they never trigger a run
+        try:
+            paths = sorted(self._matching_files(), key=os.path.getmtime)
+            for path in paths[:-1]:
+                self._handled[path] = self._signature(path)
+            self._save_state()
+            if paths and self._handled.get(paths[-1]) != self._signature(paths[-1]):
+                self.notice(paths[-1])
+        except OSError as e:
+            logging.warning(f"Could not scan {self.folder}: {e}")
+
+        if WATCHDOG_AVAILABLE:
+            self._observer = Observer()
+            self._observer.schedule(_ArrivalHandler(self), self.folder, recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+            logging.info(f"👀 Watching {self.folder} for {self.pattern}")
+        else:
+            thread = threading.Thread(target=self._poll, daemon=True)
+            thread.start()
+            logging.info(f"👀 Polling {self.folder} for {self.pattern} every {POLL_SECONDS}s "
+                         f"(pip install watchdog for instant notifications)")
+        return True
+
+    def _poll(self):
+        while not self._stop.wait(POLL_SECONDS):
+            try:
+                for path in self._matching_files():
+                    if self._handled.get(path) != self._signature(path) and path not in self._timers:
+                        self.notice(path)
+            except OSError as e:
+                logging.warning(f"Could not scan {self.folder}: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._observer:
+            self._observer.stop()
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
@@ -0,0 +1,508 @@
+"""
+Warm Kernel Pool
+Keeps pre-warmed Jupyter kernels in the scheduler's virtual environment and
+reuses them across notebooks and scheduled runs instead of spawning
+`jupyter nbconvert` (and paying interpreter + import start-up) per notebook
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+
+import nbformat
+from jupyter_client import KernelManager
+from jupyter_client.kernelspec import KernelSpec, KernelSpecManager
+
+from streamed_process import notebook_logger
+
+
+# Heavy modules the analysis notebooks import; loading them once per kernel is the
+# start-up cost the pool exists to avoid. Missing modules are ignored.
+WARMUP_MODULES = [
+    "numpy",
+    "pandas",
+    "matplotlib.pyplot",
+    "plotly.graph_objs",
+    "sklearn",
+    "openai",
+    "requests",
+    "docx",
+    "dotenv",
+]
+
+# Run once per kernel: remember the pristine environment so every notebook starts from it
+BASELINE_CODE = """
+import os as _os, sys as _sys, types as _types
+_baseline = _types.ModuleType('_scheduler_baseline')
+_baseline.environ = dict(_os.environ)
+_baseline.path = list(_sys.path)
+_sys.modules['_scheduler_baseline'] = _baseline
+del _os, _sys, _types, _baseline
+"""
+
+WARMUP_CODE = """
+import importlib as _importlib
+for _module in {modules!r}:
+    try:
+        _importlib.import_module(_module)
+    except Exception:
+        pass
+del _importlib, _module
+"""
+
+# Run before every notebook: restore environment, close figures, clear the user namespace.
+# Imported modules stay loaded in sys.modules, which is what keeps the kernel warm.
+RESET_CODE = """
+def _scheduler_reset(cwd):
+    import os, sys
+    baseline = sys.modules['_scheduler_baseline']
+    os.environ.clear()
+    os.environ.update(baseline.environ)
+    sys.path[:] = baseline.path
+    if 'matplotlib.pyplot' in sys.modules:
+        sys.modules['matplotlib.pyplot'].close('all')
+    os.chdir(cwd)
+_scheduler_reset({cwd!r})
+get_ipython().run_line_magic('reset', '-f')
+"""
+
+# Pickle every picklable user variable after a completed cell. Modules are recorded by
+# name and notebook-defined functions/classes are skipped (they are replayed on resume).
+SNAPSHOT_CODE = """
+def _scheduler_snapshot(path):
+    import os, pickle, types
+    state, modules = {{}}, {{}}
+    for name, value in list(globals().items()):
+        if name.startswith('_') or name in ('In', 'Out', 'exit', 'quit', 'get_ipython'):
+            continue
+        if isinstance(value, types.ModuleType):
+            modules[name] = value.__name__
+            continue
+        if getattr(value, '__module__', None) == '__main__' and isinstance(value, (type, types.FunctionType)):
+            continue
+        try:
+            state[name] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            pass
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump({{'modules': modules, 'state': state}}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+_scheduler_snapshot({path!r})
+del _scheduler_snapshot
+"""
+
+# Restore a snapshot; only_missing=True retries values that needed replayed classes
+RESTORE_CODE = """
+def _scheduler_restore(path, only_missing):
+    import importlib, pickle
+    with open(path, 'rb') as f:
+        snapshot = pickle.load(f)
+    namespace = globals()
+    for name, module in snapshot['modules'].items():
+        if name not in namespace:
+            try:
+                namespace[name] = importlib.import_module(module)
+            except Exception:
+                pass
+    for name, blob in snapshot['state'].items():
+        if only_missing and name in namespace:
+            continue
+        try:
+            namespace[name] = pickle.loads(blob)
+        except Exception:
+            pass
+_scheduler_restore({path!r}, {only_missing!r})
+del _scheduler_restore
+"""
+
+
+def venv_kernel_spec_manager(python_exe):
+    """Kernel spec manager that always launches ipykernel with the given interpreter"""
+    spec = KernelSpec(
+        argv=[python_exe, "-m", "ipykernel_launcher", "-f", "{connection_file}"],
+        display_name="Scheduler virtual environment",
+        language="python",
+    )
+
+    class VenvKernelSpecManager(KernelSpecManager):
+        def get_kernel_spec(self, kernel_name):
+            return spec
+
+    return VenvKernelSpecManager()
+
+
+class WarmKernel:
+    """A running kernel plus its client, warmed up with the analysis imports"""
+
+    def __init__(self, python_exe, env, cwd, warmup_modules=None, startup_timeout=120):
+        start_time = time.time()
+        self.km = KernelManager(kernel_name="scheduler-venv",
+                                kernel_spec_manager=venv_kernel_spec_manager(python_exe))
+        self.km.start_kernel(env=env, cwd=cwd)
+        self.kc = self.km.client()
+        self.kc.start_channels()
+        self.kc.wait_for_ready(timeout=startup_timeout)
+
+        self.run_silent(BASELINE_CODE, timeout=startup_timeout)
+        modules = WARMUP_MODULES if warmup_modules is None else warmup_modules
+        self.run_silent(WARMUP_CODE.format(modules=list(modules)), timeout=startup_timeout)
+
+        self.uses = 0
+        self.startup_seconds = time.time() - start_time
+        logging.info(f"🔥 Kernel warmed up in {self.startup_seconds:.2f} seconds")
+
+    def is_alive(self):
+        return self.km.is_alive()
+
+    def run_silent(self, code, timeout=60):
+        """Execute bookkeeping code without touching history or execution counts"""
+        reply = self.kc.execute_interactive(code, silent=True, store_history=False,
+                                            timeout=timeout, output_hook=lambda msg: None)
+        if reply['content']['status'] != 'ok':
+            content = reply['content']
+            raise RuntimeError(f"{content.get('ename')}: {content.get('evalue')}")
+
+    def reset(self, cwd):
+        """Isolate the next notebook from whatever ran before it"""
+        self.run_silent(RESET_CODE.format(cwd=cwd))
+
+    def snapshot(self, path):
+        """Persist the user namespace to a kernel-independent pickle"""
+        self.run_silent(SNAPSHOT_CODE.format(path=path), timeout=600)
+
+    def restore(self, path, only_missing=False):
+        self.run_silent(RESTORE_CODE.format(path=path, only_missing=only_missing), timeout=600)
+
+    def execute_cell(self, cell, timeout, progress=None):
+        """
+        Execute one code cell, filling in its outputs, execution count and timing metadata.
+        With progress (NotebookProgress), outputs are reported as they arrive and
+        progress.check() runs about once a second while the cell is busy (it raises
+        StallError to abandon the cell).
+
+        Returns:
+            bool: True if the cell finished without raising
+        """
+        outputs = []
+        timing = {}
+        deadline = time.time() + timeout
+
+        def wait_seconds():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Cell did not finish within {timeout:.0f} seconds")
+            return min(1.0, remaining)
+
+        msg_id = self.kc.execute(cell.source, allow_stdin=False)
+        while True:
+            try:
+                msg = self.kc.get_iopub_msg(timeout=wait_seconds())
+            except queue.Empty:
+                if progress is not None:
+                    progress.check()
+                continue
+            if msg['parent_header'].get('msg_id') != msg_id:
+                continue
+            msg_type = msg['msg_type']
+            content = msg['content']
+            if msg_type == 'status':
+                if content['execution_state'] == 'idle':
+                    break
+                continue
+            if msg_type == 'execute_input':
+                timing['iopub.execute_input'] = msg['header']['date'].isoformat()
+                continue
+            if msg_type == 'clear_output':
+                outputs.clear()
+            elif (msg_type == 'stream' and outputs and outputs[-1].get('output_type') == 'stream'
+                  and outputs[-1].get('name') == content['name']):
+                outputs[-1]['text'] += content['text']  # Coalesce consecutive prints
+            elif msg_type in ('stream', 'display_data', 'execute_result', 'error'):
+                outputs.append(nbformat.v4.output_from_msg(msg))
+            if progress is not None:
+                progress.output(output_text(msg_type, content))
+                progress.check()
+
+        while True:
+            try:
+                reply = self.kc.get_shell_msg(timeout=wait_seconds())
+            except queue.Empty:
+                continue
+            if reply['parent_header'].get('msg_id') == msg_id:
+                break
+        timing['shell.execute_reply'] = reply['header']['date'].isoformat()
+
+        cell.outputs = outputs
+        cell.execution_count = reply['content'].get('execution_count')
+        cell.metadata['execution'] = timing
+        return reply['content']['status'] == 'ok'
+
+    def shutdown(self):
+        try:
+            self.kc.stop_channels()
+            self.km.shutdown_kernel(now=True)
+        except Exception as e:
+            logging.warning(f"Could not shut down kernel cleanly: {e}")
+
+
+def output_text(msg_type, content):
+    """Printable text of an iopub output message, for the notebook log"""
+    if msg_type == 'stream':
+        return content['text']
+    if msg_type == 'error':
+        return f"{content['ename']}: {content['evalue']}"
+    if msg_type in ('display_data', 'execute_result'):
+        return content.get('data', {}).get('text/plain', f"[{msg_type}]")
+    return ""
+
+
+class StallError(TimeoutError):
+    """A notebook made no progress (no finished cell, no output) for its stall timeout"""
+
+
+class NotebookProgress:
+    """
+    Heartbeats and stall detection for a notebook running in a pooled kernel. Progress is
+    a finished cell or output from the running cell; both are also written to
+    logs/notebooks/<log_name>.log, like the nbconvert and pipeline backends' output.
+    """
+
+    def __init__(self, label, log_name, total_cells, stall_timeout=None, heartbeat=60):
+        self.label = label
+        self.log = notebook_logger(log_name)
+        self.total_cells = total_cells
+        self.stall_timeout = stall_timeout
+        self.heartbeat = heartbeat
+        self.start = self.last_progress = self.last_heartbeat = time.time()
+        self.cell = None
+        self.cells_done = 0
+        self.latest = None
+
+    def cell_started(self, index):
+        self.cell = index
+        self.log.info(f"----- cell {index}")
+
+    def cell_finished(self, index, ok):
+        self.cells_done += 1
+        self.last_progress = time.time()
+        self.log.info(f"----- cell {index} {'done' if ok else 'failed'}")
+
+    def output(self, text):
+        self.last_progress = time.time()
+        for line in text.splitlines():
+            self.log.info(line)
+            if line.strip():
+                self.latest = line
+
+    def check(self):
+        """Log a heartbeat when one is due; raise StallError after stall_timeout without progress"""
+        now = time.time()
+        if self.stall_timeout and now - self.last_progress > self.stall_timeout:
+            raise StallError(f"no cell finished and no output for {self.stall_timeout / 60:.0f} min "
+                             f"(cell {self.cell})")
+        if self.heartbeat and now - self.last_heartbeat >= self.heartbeat:
+            self.last_heartbeat = now
+            latest = self.latest[:120] if self.latest else "(no output yet)"
+            logging.info(f"💓 {self.label} running {(now - self.start) / 60:.1f} min, cell {self.cell} "
+                         f"({self.cells_done}/{self.total_cells} cells done), last progress "
+                         f"{now - self.last_progress:.0f}s ago: {latest}")
+
+
+class KernelPool:
+    """Fixed-size pool of warm kernels shared by concurrently running notebooks"""
+
+    def __init__(self, python_exe, env, cwd, size=1, max_uses=10, warmup_modules=None):
+        self.python_exe = python_exe
+        self.env = env
+        self.cwd = cwd
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.warmup_modules = warmup_modules
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _new_kernel(self):
+        return WarmKernel(self.python_exe, self.env, self.cwd, self.warmup_modules)
+
+    def start(self):
+        """Pre-warm kernels up to the pool size (in parallel) so the first notebooks start hot"""
+        with self._lock:
+            missing = self.size - self._created
+            self._created += missing
+        threads = [threading.Thread(target=self._warm_one) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _warm_one(self):
+        try:
+            self._idle.put(self._new_kernel())
+        except Exception as e:
+            logging.error(f"❌ Failed to start warm kernel: {e}")
+            with self._lock:
+                self._created -= 1
+
+    def acquire(self, cwd):
+        """
+        Get a reset kernel whose working directory is cwd.
+
+        Returns:
+            tuple: (WarmKernel, startup seconds spent on starting and/or resetting it)
+        """
+        start_time = time.time()
+        kernel = None
+        try:
+            kernel = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    kernel = self._new_kernel()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                kernel = self._idle.get()
+
+        if not kernel.is_alive():
+            logging.warning("⚠️  Pooled kernel died - starting a replacement")
+            kernel.shutdown()
+            kernel = self._new_kernel()
+
+        kernel.reset(cwd)
+        kernel.uses += 1
+        return kernel, time.time() - start_time
+
+    def release(self, kernel, healthy=True):
+        """Return a kernel to the pool, retiring it if it is broken or worn out"""
+        if healthy and kernel.uses < self.max_uses and kernel.is_alive():
+            self._idle.put(kernel)
+            return
+        logging.info(f"♻️  Retiring kernel after {kernel.uses} notebook(s)")
+        kernel.shutdown()
+        with self._lock:
+            self._created -= 1
+
+    def shutdown(self):
+        while True:
+            try:
+                self._idle.get_nowait().shutdown()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+
+def execute_notebook_in_pool(pool, notebook_path, cwd, timeout=3600, checkpoint=None, label=None,
+                             stall_timeout=None, heartbeat=60):
+    """
+    Execute a notebook cell by cell in a pooled kernel and save it in place
+    (like `nbconvert --execute --inplace`).
+
+    With a checkpoint (see checkpoints.py), the namespace is snapshotted after every
+    completed cell and a previous failed attempt is resumed from its failed cell.
+    A 💓 heartbeat is logged every heartbeat seconds, and the notebook is stopped after
+    stall_timeout seconds (None = never) in which no cell finished and nothing was printed.
+
+    Returns:
+        dict: success, startup_seconds, execution_seconds, cells_executed,
+        resumed_from_cell, stalled, error
+    """
+    nb = nbformat.read(notebook_path, as_version=4)
+
+    start_index = 0
+    if checkpoint is not None:
+        start_index = checkpoint.resume_point(nb.cells)
+        if start_index and os.path.exists(checkpoint.partial_path):
+            # Carry over outputs of the cells that already ran in the failed attempt
+            partial = nbformat.read(checkpoint.partial_path, as_version=4)
+            for cell, previous in zip(nb.cells[:start_index], partial.cells):
+                if cell.cell_type == 'code' and previous.cell_type == 'code':
+                    cell.outputs = previous.outputs
+                    cell.execution_count = previous.execution_count
+                    cell.metadata['execution'] = previous.metadata.get('execution', {})
+        elif start_index == 0:
+            checkpoint.reset()
+
+    kernel, startup_seconds = pool.acquire(cwd)
+
+    result = {'success': True, 'startup_seconds': startup_seconds, 'execution_seconds': 0.0,
+              'cells_executed': 0, 'resumed_from_cell': start_index or None, 'stalled': False, 'error': None}
+    code_cells = [index for index, cell in enumerate(nb.cells)
+                  if index >= start_index and cell.cell_type == 'code' and cell.source.strip()]
+    progress = NotebookProgress(label or os.path.basename(notebook_path),
+                                os.path.splitext(os.path.basename(notebook_path))[0], len(code_cells),
+                                stall_timeout=stall_timeout, heartbeat=heartbeat)
+    progress.log.info(f"===== {notebook_path} in pooled kernel")
+    healthy = True
+    index = start_index
+    start_time = time.time()
+    try:
+        if start_index:
+            restore_start = time.time()
+            logging.info(f"⏩ Resuming {os.path.basename(notebook_path)} from cell {start_index}")
+            kernel.restore(checkpoint.snapshot_path)
+            for code in checkpoint.definitions(nb.cells, start_index):
+                kernel.run_silent(code)
+            kernel.restore(checkpoint.snapshot_path, only_missing=True)
+            result['startup_seconds'] += time.time() - restore_start
+
+        for index in code_cells:
+            cell = nb.cells[index]
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                raise TimeoutError(f"Notebook exceeded {timeout} seconds")
+            progress.cell_started(index)
+            ok = kernel.execute_cell(cell, timeout=remaining, progress=progress)
+            progress.cell_finished(index, ok)
+            result['cells_executed'] += 1
+            if not ok:
+                error = next((o for o in cell.outputs if o.get('output_type') == 'error'), None)
+                detail = f"{error['ename']}: {error['evalue']}" if error else "unknown error"
+                result.update(success=False, error=f"Cell {index} failed - {detail}")
+                break
+            if checkpoint is not None:
+                save_checkpoint(kernel, checkpoint, nb, index)
+    except TimeoutError as e:
+        # A timed-out or stalled kernel may still be busy; interrupt it and never reuse it
+        kernel.km.interrupt_kernel()
+        healthy = False
+        if isinstance(e, StallError):
+            result.update(success=False, stalled=True, error=f"Stalled: {e}")
+        else:
+            result.update(success=False, error=f"Timed out: {e}")
+    except Exception as e:
+        healthy = False
+        result.update(success=False, error=str(e))
+    finally:
+        result['execution_seconds'] = time.time() - start_time
+        pool.release(kernel, healthy=healthy)
+        nbformat.write(nb, notebook_path)
+        progress.log.info(f"===== {'success' if result['success'] else result['error']} after "
+                          f"{result['execution_seconds']:.1f}s")
+
+    if checkpoint is not None:
+        if result['success']:
+            checkpoint.reset()
+        else:
+            checkpoint.record_failure(index, result['error'])
+    return result
+
+
+def save_checkpoint(kernel, checkpoint, nb, index):
+    """Snapshot the namespace and outputs after a completed cell (never fails the run)"""
+    try:
+        os.makedirs(checkpoint.dir, exist_ok=True)
+        kernel.snapshot(checkpoint.snapshot_path)
+        nbformat.write(nb, checkpoint.partial_path)
+        checkpoint.record_cell(index, nb.cells[index].source)
+    except Exception as e:
+        logging.warning(f"⚠️  Could not checkpoint cell {index}: {e}")
@@ -0,0 +1,152 @@
+"""
+Notebook Dependency Graph
+Parses `after:` annotations from the notebooks list and runs independent
+notebooks concurrently while respecting declared dependencies
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+# Separator used in the notebooks file to declare dependencies, e.g.
+#   Report.ipynb  after: Integrated-portfolio-analysis.ipynb, Other.ipynb
+AFTER_MARKER = "after:"
+
+# Status values returned by run_notebook_graph
+SUCCESS = "success"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def parse_notebook_line(line):
+    """Split a notebooks-file line into (notebook name, [dependency names])"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None, []
+
+    if AFTER_MARKER in line:
+        name, deps = line.split(AFTER_MARKER, 1)
+        dependencies = [d.strip() for d in deps.split(',') if d.strip()]
+    else:
+        name, dependencies = line, []
+    return name.strip(), dependencies
+
+
+def load_notebook_graph(file_path, source_dir):
+    """
+    Read the notebooks file into an ordered dict of {notebook path: [dependency paths]}.
+    Dependency names are resolved against source_dir just like notebook names.
+    """
+    graph = {}
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                name, dependencies = parse_notebook_line(line)
+                if name:
+                    graph[str(Path(source_dir) / name)] = [str(Path(source_dir) / d) for d in dependencies]
+    except Exception as e:
+        print(f"❌ Failed to read notebooks list from {file_path}: {e}")
+        return {}
+    return graph
+
+
+def validate_graph(graph):
+    """Return a list of error strings for unknown dependencies and cycles"""
+    errors = []
+    for notebook, dependencies in graph.items():
+        for dep in dependencies:
+            if dep not in graph:
+                errors.append(f"❌ {Path(notebook).name} depends on unlisted notebook: {Path(dep).name}")
+    if errors:
+        return errors
+
+    # Depth-first search for cycles (0 = unvisited, 1 = in progress, 2 = done)
+    state = {notebook: 0 for notebook in graph}
+
+    def visit(notebook, trail):
+        state[notebook] = 1
+        for dep in graph[notebook]:
+            if state[dep] == 1:
+                cycle = trail[trail.index(dep):] + [dep]
+                errors.append("❌ Dependency cycle: " + " -> ".join(Path(n).name for n in cycle))
+            elif state[dep] == 0:
+                visit(dep, trail + [dep])
+        state[notebook] = 2
+
+    for notebook in graph:
+        if state[notebook] == 0:
+            visit(notebook, [notebook])
+    return errors
+
+
+def dependents_of(graph, notebook):
+    """All notebooks that directly or transitively depend on the given notebook"""
+    found = set()
+    frontier = [notebook]
+    while frontier:
+        current = frontier.pop()
+        for candidate, dependencies in graph.items():
+            if current in dependencies and candidate not in found:
+                found.add(candidate)
+                frontier.append(candidate)
+    return found
+
+
+def run_notebook_graph(graph, run_notebook, max_workers=1, completed=None):
+    """
+    Execute every notebook in the graph, starting each one as soon as all of its
+    dependencies have succeeded.
+
+    Args:
+        graph (dict): {notebook path: [dependency paths]} in file order
+        run_notebook (callable): run_notebook(notebook_path) -> bool success
+        max_workers (int): Maximum number of notebooks running at the same time
+        completed (set): Notebooks that already succeeded (e.g. in an earlier attempt
+            of the same scheduled run); they count as successful and are not re-run
+
+    Returns:
+        dict: {notebook path: "success" | "failed" | "skipped"}. A failed notebook
+        marks everything downstream of it as skipped; independent branches keep running.
+    """
+    results = {notebook: SUCCESS for notebook in (completed or ()) if notebook in graph}
+    pending = [n for n in graph if n not in results]  # File order, so max_workers=1 runs sequentially
+    running = {}
+    max_workers = max(1, max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Submit every notebook whose dependencies have all succeeded
+            for notebook in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if all(results.get(dep) == SUCCESS for dep in graph[notebook]):
+                    pending.remove(notebook)
+                    running[executor.submit(run_notebook, notebook)] = notebook
+
+            if not running:
+                # Nothing can start: everything left is blocked by a failure
+                for notebook in pending:
+                    results[notebook] = SKIPPED
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                notebook = running.pop(future)
+                try:
+                    succeeded = bool(future.result())
+                except Exception as e:
+                    logging.error(f"💥 Unexpected error executing {Path(notebook).name}: {e}")
+                    succeeded = False
+
+                if succeeded:
+                    results[notebook] = SUCCESS
+                    continue
+
+                results[notebook] = FAILED
+                for dependent in dependents_of(graph, notebook):
+                    if dependent in pending:
+                        pending.remove(dependent)
+                        results[dependent] = SKIPPED
+                        logging.warning(f"⏭️  Skipping {Path(dependent).name} - depends on failed {Path(notebook).name}")
+
+    return {notebook: results[notebook] for notebook in graph}
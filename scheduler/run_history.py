@@ -0,0 +1,277 @@
+"""
+Run History Store
+SQLite record of every scheduled run: per-notebook and per-cell wall time, status,
+retries and output size, plus a report that flags performance regressions
+
+Usage:
+    python run_history.py report [--runs 8]
+    python run_history.py regressions [--threshold 2.0] [--min-seconds 5]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+HISTORY_DB = "run_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,               -- weekly | retry | triggered
+    scheduled_for TEXT,
+    backend TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    wall_seconds REAL,
+    status TEXT                       -- running | success | failed
+);
+CREATE TABLE IF NOT EXISTS notebook_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    notebook TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    wall_seconds REAL,
+    startup_seconds REAL,
+    status TEXT,
+    exit_code INTEGER,
+    attempt INTEGER DEFAULT 0,
+    resumed_from_cell INTEGER,
+    output_bytes INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS cell_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    notebook_run_id INTEGER NOT NULL REFERENCES notebook_runs(id),
+    cell_index INTEGER NOT NULL,
+    cell_hash TEXT,
+    first_line TEXT,
+    wall_seconds REAL,
+    status TEXT,
+    output_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_notebook_runs_name ON notebook_runs(notebook, started_at);
+CREATE INDEX IF NOT EXISTS idx_cell_runs_parent ON cell_runs(notebook_run_id);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _parse_timestamp(value):
+    """Kernel timestamps are UTC ISO strings, sometimes with a trailing Z"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def notebook_cell_metrics(notebook_path, since=None):
+    """
+    Per-cell timing and output size from an executed notebook's execution metadata
+    (written by both nbconvert and the kernel pool).
+
+    Args:
+        notebook_path (str): Executed notebook
+        since (datetime): Aware UTC datetime; cells executed before it (e.g. outputs
+            carried over from a resumed attempt) are ignored
+
+    Returns:
+        list of dicts: cell_index, cell_hash, first_line, wall_seconds, status, output_bytes
+    """
+    from checkpoints import cell_hash
+
+    with open(notebook_path, 'r', encoding='utf-8') as f:
+        nb = json.load(f)
+
+    metrics = []
+    for index, cell in enumerate(nb.get('cells', [])):
+        if cell.get('cell_type') != 'code':
+            continue
+        execution = cell.get('metadata', {}).get('execution', {})
+        started = _parse_timestamp(execution.get('iopub.execute_input'))
+        finished = _parse_timestamp(execution.get('shell.execute_reply'))
+        if started is None or finished is None or (since is not None and started < since):
+            continue
+        source = ''.join(cell['source']) if isinstance(cell['source'], list) else cell['source']
+        outputs = cell.get('outputs', [])
+        metrics.append({
+            'cell_index': index,
+            'cell_hash': cell_hash(source),
+            'first_line': source.strip().split('\n')[0][:80],
+            'wall_seconds': (finished - started).total_seconds(),
+            'status': 'error' if any(o.get('output_type') == 'error' for o in outputs) else 'ok',
+            'output_bytes': len(json.dumps(outputs, ensure_ascii=False).encode('utf-8')),
+        })
+    return metrics
+
+
+class RunHistoryStore:
+    """Thin wrapper around the SQLite history database (one short connection per call)"""
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _execute(self, sql, params=()):
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(sql, params).lastrowid
+
+    def _query(self, sql, params=()):
+        with closing(self._connect()) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def start_run(self, kind, scheduled_for=None, backend=None):
+        return self._execute(
+            "INSERT INTO runs (kind, scheduled_for, backend, started_at, status) VALUES (?, ?, ?, ?, 'running')",
+            (kind, scheduled_for, backend, _now()))
+
+    def finish_run(self, run_id, status, wall_seconds):
+        self._execute("UPDATE runs SET finished_at = ?, wall_seconds = ?, status = ? WHERE id = ?",
+                      (_now(), wall_seconds, status, run_id))
+
+    def record_notebook(self, run_id, notebook, started_at, wall_seconds, result, attempt=0, cells=()):
+        """Store one notebook execution and its cells; result is the backend's result dict"""
+        output_bytes = os.path.getsize(notebook) if os.path.exists(notebook) else None
+        with closing(self._connect()) as conn, conn:
+            notebook_run_id = conn.execute(
+                "INSERT INTO notebook_runs (run_id, notebook, started_at, wall_seconds, startup_seconds, status,"
+                " exit_code, attempt, resumed_from_cell, output_bytes, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, os.path.basename(notebook), started_at.isoformat(timespec='seconds'), wall_seconds,
+                 result.get('startup_seconds'), 'success' if result['success'] else 'failed',
+                 result.get('exit_code'), attempt, result.get('resumed_from_cell'), output_bytes,
+                 result.get('error'))).lastrowid
+            conn.executemany(
+                "INSERT INTO cell_runs (notebook_run_id, cell_index, cell_hash, first_line, wall_seconds,"
+                " status, output_bytes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(notebook_run_id, c['cell_index'], c['cell_hash'], c['first_line'], c['wall_seconds'],
+                  c['status'], c['output_bytes']) for c in cells])
+        return notebook_run_id
+
+    def last_successful_run(self, kinds=('weekly', 'retry')):
+        """Start time of the most recent successful weekly run (retries complete a weekly run)"""
+        placeholders = ','.join('?' for _ in kinds)
+        rows = self._query(f"SELECT MAX(started_at) AS started_at FROM runs"
+                           f" WHERE status = 'success' AND kind IN ({placeholders})", kinds)
+        value = rows[0]['started_at'] if rows else None
+        return datetime.fromisoformat(value) if value else None
+
+    def notebook_history(self, limit_runs=8):
+        """Notebook executions from the most recent runs, newest first per notebook"""
+        return self._query(
+            "SELECT n.id, n.notebook, n.started_at, n.wall_seconds, n.startup_seconds, n.status, n.attempt,"
+            " n.output_bytes, r.kind FROM notebook_runs n JOIN runs r ON r.id = n.run_id"
+            " WHERE n.run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)"
+            " ORDER BY n.notebook, n.started_at DESC", (limit_runs,))
+
+    def cell_durations(self, notebook):
+        """[(notebook_run_id, started_at, cell_hash, first_line, wall_seconds)] for successful cells, newest first"""
+        return self._query(
+            "SELECT c.notebook_run_id, n.started_at, c.cell_index, c.cell_hash, c.first_line, c.wall_seconds"
+            " FROM cell_runs c JOIN notebook_runs n ON n.id = c.notebook_run_id"
+            " WHERE n.notebook = ? AND c.status = 'ok' ORDER BY n.started_at DESC", (notebook,))
+
+    def notebooks(self):
+        return [row['notebook'] for row in self._query("SELECT DISTINCT notebook FROM notebook_runs ORDER BY notebook")]
+
+    def find_regressions(self, threshold=2.0, min_seconds=5.0, baseline_runs=4):
+        """
+        Cells whose latest duration is at least `threshold` times the median of their
+        previous `baseline_runs` durations (same cell source) and slower by min_seconds.
+        """
+        regressions = []
+        for notebook in self.notebooks():
+            by_cell = {}
+            for row in self.cell_durations(notebook):
+                by_cell.setdefault(row['cell_hash'], []).append(row)
+            for cell_hash, rows in by_cell.items():
+                latest, previous = rows[0], rows[1:1 + baseline_runs]
+                if not previous:
+                    continue
+                baseline = statistics.median(r['wall_seconds'] for r in previous)
+                delta = latest['wall_seconds'] - baseline
+                if baseline > 0 and latest['wall_seconds'] / baseline >= threshold and delta >= min_seconds:
+                    regressions.append({
+                        'notebook': notebook,
+                        'cell_index': latest['cell_index'],
+                        'first_line': latest['first_line'],
+                        'latest_seconds': latest['wall_seconds'],
+                        'baseline_seconds': baseline,
+                        'ratio': latest['wall_seconds'] / baseline,
+                        'run_started': latest['started_at'],
+                    })
+        return sorted(regressions, key=lambda r: r['ratio'], reverse=True)
+
+
+def print_report(store, runs=8):
+    """Notebook wall-time trend plus the slowest cells of each notebook's latest run"""
+    print(f"📊 Run history ({store.path}) - last {runs} runs")
+    print("=" * 70)
+    current = None
+    for row in store.notebook_history(runs):
+        if row['notebook'] != current:
+            current = row['notebook']
+            print(f"\n📓 {current}")
+            print(f"   {'started':<20} {'kind':<10} {'status':<8} {'wall':>9} {'startup':>9} {'retry':>5} {'output':>10}")
+        startup = f"{row['startup_seconds']:.1f}s" if row['startup_seconds'] is not None else "-"
+        output = f"{(row['output_bytes'] or 0) / 1024:.0f} KB"
+        print(f"   {row['started_at']:<20} {row['kind']:<10} {row['status']:<8} {row['wall_seconds']:>8.1f}s"
+              f" {startup:>9} {row['attempt']:>5} {output:>10}")
+
+    for notebook in store.notebooks():
+        rows = store.cell_durations(notebook)
+        if not rows:
+            continue
+        latest_run = rows[0]['notebook_run_id']
+        slowest = sorted((r for r in rows if r['notebook_run_id'] == latest_run),
+                         key=lambda r: r['wall_seconds'], reverse=True)[:5]
+        print(f"\n🐢 Slowest cells in latest {notebook} run:")
+        for r in slowest:
+            print(f"   cell {r['cell_index']:>3}  {r['wall_seconds']:>8.1f}s  {r['first_line']}")
+
+
+def print_regressions(store, threshold=2.0, min_seconds=5.0):
+    regressions = store.find_regressions(threshold, min_seconds)
+    if not regressions:
+        print(f"✅ No cell got {threshold:g}x slower (and {min_seconds:g}s+) than its recent median")
+        return 0
+    print(f"⚠️  {len(regressions)} performance regression(s):")
+    for r in regressions:
+        print(f"   {r['notebook']} cell {r['cell_index']}: {r['latest_seconds']:.1f}s vs median "
+              f"{r['baseline_seconds']:.1f}s ({r['ratio']:.1f}x) on {r['run_started']} - {r['first_line']}")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scheduler run history and regression report")
+    parser.add_argument("--db", default=str(Path(__file__).parent / HISTORY_DB))
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Notebook trends and slowest cells")
+    report.add_argument("--runs", type=int, default=8)
+    regress = sub.add_parser("regressions", help="Flag cells that got slower (exit code 1 if any)")
+    regress.add_argument("--threshold", type=float, default=2.0)
+    regress.add_argument("--min-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    store = RunHistoryStore(args.db)
+    if args.command == "report":
+        print_report(store, args.runs)
+        print()
+        print_regressions(store)
+        return 0
+    return print_regressions(store, args.threshold, args.min_seconds)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
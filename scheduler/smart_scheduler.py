@@ -5,16 +5,21 @@ Simple architecture with robust virtual environment support
 #  how to run from vs code: 
 #  Run in terminal  C:\Users\patty\miniconda3\envs\lerobot\python.exe smart_scheduler.py
 
-import schedule
 import time
 import subprocess
 import sys
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import json
 from dotenv import load_dotenv
+from notebook_graph import load_notebook_graph, validate_graph, run_notebook_graph, SUCCESS, SKIPPED
+from checkpoints import CHECKPOINT_DIR, RunState, NotebookCheckpoint
+from deadline_scheduler import DeadlineScheduler, parse_weekly_schedule, last_weekly_occurrence, next_weekly_occurrence
+from file_trigger import FileArrivalWatcher
+from run_history import RunHistoryStore, HISTORY_DB, notebook_cell_metrics
+from streamed_process import run_streamed
 
 
 # ============================================================================
@@ -32,22 +37,45 @@ if not NOTEBOOKS_SOURCE_DIR:
     print("❌ NOTEBOOKS_SOURCE_DIR not set in .env file!")
     NOTEBOOKS_SOURCE_DIR = ""
 
-def load_notebooks_list(file_path, source_dir):
-    """Read notebook filenames from a text file and join with source_dir."""
-    notebooks = []
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    # Join the source directory with the filename
-                    notebooks.append(str(Path(source_dir) / line))
-    except Exception as e:
-        print(f"❌ Failed to read notebooks list from {file_path}: {e}")
-        return []
-    return notebooks
+# Environment fingerprint shared with the notebooks (analysis_scripts/officeagents/provision.py):
+# when the venv and requirements are unchanged, startup skips the venv probe and installs
+REQUIREMENTS_FILE = os.path.join(NOTEBOOKS_SOURCE_DIR, "requirements.txt")
+try:
+    sys.path.append(NOTEBOOKS_SOURCE_DIR or os.getcwd())
+    from officeagents import provision
+except ImportError:
+    provision = None
+
+# Notebooks may declare dependencies with "after:" (see notebook_graph.py);
+# notebooks without one start immediately and run alongside each other
+NOTEBOOK_GRAPH = load_notebook_graph(NOTEBOOKS_FILE, NOTEBOOKS_SOURCE_DIR)
+NOTEBOOKS = list(NOTEBOOK_GRAPH)
 
-NOTEBOOKS = load_notebooks_list(NOTEBOOKS_FILE, NOTEBOOKS_SOURCE_DIR)
+# Maximum number of notebooks executing at the same time (1 = strictly sequential)
+MAX_PARALLEL_NOTEBOOKS = 2
+
+# Execution backend: "kernel_pool" reuses pre-warmed kernels (one per parallel slot) across
+# notebooks and scheduled runs; "nbconvert" starts a fresh `jupyter nbconvert` per notebook;
+# "pipeline" runs the notebooks' stages headless (`python -m officeagents <stages>` in
+# NOTEBOOKS_SOURCE_DIR) - no kernel, and the notebooks are not rewritten. Notebooks without
+# an entry in PIPELINE_STAGES still run in a (lazily started) pooled kernel.
+EXECUTION_BACKEND = "kernel_pool"
+PIPELINE_STAGES = {
+    "Integrated-portfolio-analysis.ipynb": ["ingest"],
+    "query-perplexity-llm-stock-analysis.ipynb": ["sec", "index", "reports"],
+}
+KERNEL_MAX_USES = 10  # Recycle a pooled kernel after this many notebooks
+NOTEBOOK_TIMEOUT = 3600  # 1 hour timeout per notebook
+# Notebook output is written to logs/notebooks/<notebook>.log. A notebook that makes no progress
+# for STALL_TIMEOUT_MINUTES is stopped: no cell finished and nothing printed (kernel_pool,
+# nbconvert) or no output at all (pipeline). Slow cells that keep printing only hit NOTEBOOK_TIMEOUT.
+STALL_TIMEOUT_MINUTES = 15
+HEARTBEAT_SECONDS = 60  # Progress line in the scheduler log while a notebook runs
+
+# Failed runs keep per-notebook and per-cell checkpoints (kernel_pool backend) so a retry
+# continues from the first failed notebook/cell instead of repeating finished work
+RETRY_DELAY_MINUTES = 15
+MAX_RETRIES = 3
 
 # Virtual environment path (REQUIRED for reliable execution)
 VENV_PATH = r"C:\Users\patty\miniconda3\envs\lerobot"
@@ -56,6 +84,14 @@ VENV_PATH = r"C:\Users\patty\miniconda3\envs\lerobot"
 SCHEDULE_DAY = "Sunday"  
 SCHEDULE_TIME = "17:32"  
 
+# File-arrival trigger: run the portfolio clean-up as soon as a new broker export lands
+# (folder = Portfolio_source_files_dir/Broker from .env, same as the notebook reads)
+WATCH_FOLDER = os.path.join(os.getenv("Portfolio_source_files_dir", ""), os.getenv("Broker", "")) \
+    if os.getenv("Portfolio_source_files_dir") and os.getenv("Broker") else None
+WATCH_PATTERN = "Portfolio_Positions*.csv"
+WATCH_NOTEBOOKS = ["Integrated-portfolio-analysis.ipynb"]
+WATCH_SETTLE_SECONDS = 10  # Wait until the download has stopped growing
+
 # ============================================================================
 # SMART SCHEDULER - VIRTUAL ENVIRONMENT FOCUSED
 # ============================================================================
@@ -65,7 +101,15 @@ class SmartVenvScheduler:
         self.setup_logging()
         self.validate_config()
         self.python_exe = self.get_venv_python()
-        self.execution_log_file = "last_execution.json"
+        self.execution_log_file = "last_execution.json"  # Legacy; only read if the history is empty
+        self.history = RunHistoryStore(HISTORY_DB)
+        self.run_id = None
+        self.kernel_pool = None
+        self.run_state = None
+        self.retries = 0
+        self.scheduler = DeadlineScheduler()
+        self.watcher = None
+        self.trigger_pending = False
         
     def setup_logging(self):
         """Setup logging with rotation"""
@@ -92,6 +136,7 @@ class SmartVenvScheduler:
             for notebook in NOTEBOOKS:
                 if not os.path.exists(notebook):
                     errors.append(f"❌ Notebook not found: {notebook}")
+            errors.extend(validate_graph(NOTEBOOK_GRAPH))
             
         # Check virtual environment
         if not VENV_PATH or VENV_PATH == r"C:\path\to\your\venv":
@@ -154,6 +199,13 @@ class SmartVenvScheduler:
     def get_last_execution_date(self):
         """Get the date of the last successful execution"""
         try:
+            last_execution = self.history.last_successful_run()
+            if last_execution:
+                return last_execution
+        except Exception as e:
+            logging.warning(f"Could not read run history: {e}")
+        try:
+            # Fall back to the pre-history JSON file
             if os.path.exists(self.execution_log_file):
                 with open(self.execution_log_file, 'r') as f:
                     data = json.load(f)
@@ -163,55 +215,27 @@ class SmartVenvScheduler:
             logging.warning(f"Could not read last execution date: {e}")
         return None
     
-    def record_execution_date(self):
-        """Record the current execution date"""
-        try:
-            data = {
-                'last_execution': datetime.now().isoformat(),
-                'notebooks': NOTEBOOKS,
-                'schedule': f"{SCHEDULE_DAY} at {SCHEDULE_TIME}"
-            }
-            with open(self.execution_log_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logging.info(f"✓ Execution date recorded: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        except Exception as e:
-            logging.error(f"Failed to record execution date: {e}")
-    
     def should_run_this_week(self):
-        """Check if the task should run this week (hasn't run in the last 7 days)"""
+        """Check if the task should run (hasn't run since the most recent scheduled time)"""
         last_execution = self.get_last_execution_date()
         
         if last_execution is None:
             logging.info("📅 No previous execution found - task will run")
             return True
         
-        # Calculate days since last execution
+        last_scheduled = self.get_last_scheduled_time()
         days_since_last = (datetime.now() - last_execution).days
         
-        if days_since_last >= 7:
-            logging.info(f"📅 Last execution was {days_since_last} days ago - task will run")
+        if last_execution < last_scheduled:
+            logging.info(f"📅 Last execution was {days_since_last} days ago, before {last_scheduled.strftime('%Y-%m-%d %H:%M')} - task will run")
             return True
         else:
-            logging.info(f"📅 Last execution was {days_since_last} days ago - skipping (less than 7 days)")
+            logging.info(f"📅 Last execution was {days_since_last} days ago - skipping (already ran for {last_scheduled.strftime('%Y-%m-%d %H:%M')})")
             return False
     
     def get_last_scheduled_time(self):
-        """Get the most recent Tuesday 7 AM that should have occurred"""
-        now = datetime.now()
-        
-        # Find the most recent Tuesday
-        days_since_tuesday = (now.weekday() - 1) % 7  # Tuesday is 1 (Monday=0)
-        if days_since_tuesday == 0 and now.hour >= 7:
-            # It's Tuesday and past 7 AM
-            last_tuesday = now.date()
-        else:
-            # Go back to the most recent Tuesday
-            last_tuesday = (now - timedelta(days=days_since_tuesday)).date()
-        
-        # Create datetime for Tuesday at 7 AM
-        scheduled_time = datetime.combine(last_tuesday, datetime.strptime(SCHEDULE_TIME, "%H:%M").time())
-        
-        return scheduled_time
+        """Get the most recent SCHEDULE_DAY at SCHEDULE_TIME that should have occurred"""
+        return last_weekly_occurrence(SCHEDULE_DAY, SCHEDULE_TIME)
     
     def check_for_missed_execution(self):
         """Check if we missed a scheduled execution and should run now"""
@@ -238,15 +262,208 @@ class SmartVenvScheduler:
             logging.info(f"📅 Scheduled time hasn't arrived yet - no missed execution")
             return False
     
+    def get_kernel_pool(self):
+        """Create (once) the warm kernel pool, or return None to fall back to nbconvert"""
+        if self.kernel_pool is None:
+            try:
+                from kernel_pool import KernelPool
+            except ImportError as e:
+                logging.warning(f"⚠️  Kernel pool unavailable ({e}) - falling back to nbconvert")
+                return None
+            self.kernel_pool = KernelPool(
+                self.python_exe,
+                self.prepare_venv_environment(),
+                NOTEBOOKS_SOURCE_DIR or os.getcwd(),
+                size=MAX_PARALLEL_NOTEBOOKS,
+                max_uses=KERNEL_MAX_USES
+            )
+        return self.kernel_pool
+
+    def execute_notebook(self, notebook_path):
+        """Execute a single notebook with the configured backend and return True on success"""
+        started_at = datetime.now(timezone.utc)
+        start_time = time.time()
+        stages = PIPELINE_STAGES.get(os.path.basename(notebook_path)) if EXECUTION_BACKEND == "pipeline" else None
+        pool = self.get_kernel_pool() if EXECUTION_BACKEND in ("kernel_pool", "pipeline") and not stages else None
+        if stages:
+            result = self.execute_pipeline(notebook_path, stages)
+        elif pool is not None:
+            result = self.execute_notebook_in_kernel(pool, notebook_path)
+        else:
+            result = self.execute_notebook_nbconvert(notebook_path)
+        wall_seconds = time.time() - start_time
+
+        if self.run_state is not None:
+            self.run_state.mark(notebook_path, "success" if result['success'] else "failed")
+        self.record_notebook_run(notebook_path, started_at, wall_seconds, result)
+        return result['success']
+
+    def record_notebook_run(self, notebook_path, started_at, wall_seconds, result):
+        """Store notebook and per-cell telemetry (never fails the run)"""
+        if self.run_id is None:
+            return
+        try:
+            cells = notebook_cell_metrics(notebook_path, since=started_at)
+            local_start = started_at.astimezone().replace(tzinfo=None)
+            self.history.record_notebook(self.run_id, notebook_path, local_start, wall_seconds,
+                                         result, attempt=self.retries, cells=cells)
+        except Exception as e:
+            logging.warning(f"Could not record run history for {os.path.basename(notebook_path)}: {e}")
+
+    def execute_notebook_in_kernel(self, pool, notebook_path):
+        """Execute a single notebook in a pooled warm kernel and return the backend result dict"""
+        from kernel_pool import execute_notebook_in_pool
+
+        i = NOTEBOOKS.index(notebook_path) + 1
+        notebook_abs = os.path.abspath(notebook_path)
+        logging.info(f"\n📓 [{i}/{len(NOTEBOOKS)}] Running in warm kernel: {os.path.basename(notebook_path)}")
+        checkpoint = None
+        if self.run_state is not None:
+            checkpoint = NotebookCheckpoint(CHECKPOINT_DIR, notebook_abs, self.run_state.scheduled_for)
+        try:
+            result = execute_notebook_in_pool(pool, notebook_abs, os.path.dirname(notebook_abs),
+                                              timeout=NOTEBOOK_TIMEOUT, checkpoint=checkpoint, label=f"Notebook {i}",
+                                              stall_timeout=STALL_TIMEOUT_MINUTES * 60, heartbeat=HEARTBEAT_SECONDS)
+        except Exception as e:
+            logging.error(f"💥 Unexpected error executing notebook {i}: {e}")
+            print(f"💥 Unexpected error executing notebook {i}: {e}")
+            return {'success': False, 'error': str(e)}
+
+        timing = (f"startup {result['startup_seconds']:.2f}s + execution {result['execution_seconds']:.2f}s "
+                  f"({result['cells_executed']} cells)")
+        if result['resumed_from_cell']:
+            timing += f" - resumed from cell {result['resumed_from_cell']}"
+        if result['success']:
+            logging.info(f"✅ Notebook {i} completed successfully - {timing}")
+            print(f"✅ Notebook {i} completed - {timing}")
+        else:
+            logging.error(f"❌ Notebook {i} failed - {timing}")
+            logging.error(f"   {result['error']}")
+            print(f"❌ Notebook {i} failed: {result['error']}")
+        return result
+
+    def execute_pipeline(self, notebook_path, stages):
+        """Run a notebook's stages with `python -m officeagents` and return a result dict (success, exit_code, error)"""
+        i = NOTEBOOKS.index(notebook_path) + 1
+        cwd = NOTEBOOKS_SOURCE_DIR or os.path.dirname(os.path.abspath(notebook_path))
+        logging.info(f"\n📓 [{i}/{len(NOTEBOOKS)}] Running pipeline stages {' '.join(stages)} for "
+                     f"{os.path.basename(notebook_path)}")
+        try:
+            result = run_streamed([self.python_exe, "-m", "officeagents"] + list(stages), cwd=cwd,
+                                  env=self.prepare_venv_environment(), label=f"Pipeline {i}",
+                                  log_name=Path(notebook_path).stem, timeout=NOTEBOOK_TIMEOUT,
+                                  stall_timeout=STALL_TIMEOUT_MINUTES * 60, heartbeat=HEARTBEAT_SECONDS)
+        except Exception as e:
+            logging.error(f"💥 Unexpected error running pipeline {i}: {e}")
+            return {'success': False, 'error': str(e)}
+
+        elapsed = result['seconds']
+        if result['timed_out'] or result['stalled']:
+            reason = (f"timed out after {NOTEBOOK_TIMEOUT/60:.0f} min" if result['timed_out']
+                      else f"stalled - no output for {STALL_TIMEOUT_MINUTES} min")
+            logging.error(f"⏰ Pipeline {i} {reason} (log: {result['log_file']})")
+            for line in result['tail'][-20:]:
+                logging.error(f"   {line}")
+            return {'success': False, 'error': f"Pipeline {reason}"}
+        for line in result['tail'][-20:]:
+            logging.info(f"   {line}")
+        if result['returncode'] == 0:
+            logging.info(f"✅ Pipeline {i} completed in {elapsed:.2f} seconds")
+            print(f"✅ Notebook {i} (pipeline: {' '.join(stages)}) completed in {elapsed:.2f} seconds")
+            return {'success': True, 'exit_code': 0}
+        logging.error(f"❌ Pipeline {i} failed with return code {result['returncode']} after {elapsed:.2f} seconds "
+                      f"(log: {result['log_file']})")
+        print(f"❌ Notebook {i} (pipeline: {' '.join(stages)}) failed after {elapsed:.2f} seconds")
+        error = (result['error_lines'][-1] if result['error_lines']
+                 else result['stderr_tail'][-1] if result['stderr_tail'] else None)
+        return {'success': False, 'exit_code': result['returncode'], 'error': error}
+
+    def execute_notebook_nbconvert(self, notebook_path):
+        """Execute a single notebook with jupyter nbconvert and return a result dict (success, exit_code, error)"""
+        i = NOTEBOOKS.index(notebook_path) + 1
+        try:
+            logging.info(f"\n📓 [{i}/{len(NOTEBOOKS)}] Running: {os.path.basename(notebook_path)}")
+
+            # Prepare virtual environment
+            env = self.prepare_venv_environment()
+
+            # Get absolute path to notebook and its directory
+            notebook_abs = os.path.abspath(notebook_path)
+            notebook_dir = os.path.dirname(notebook_abs)
+            notebook_name = os.path.basename(notebook_abs)
+
+            # Execute notebook using jupyter nbconvert
+            # Must run from notebook directory for relative paths to work
+            logging.info(f"🔄 Executing notebook {i}...")
+            result = run_streamed([
+                self.python_exe,
+                "-m", "jupyter", "nbconvert",
+                "--to", "notebook",
+                "--execute",
+                "--inplace",
+                # Debug logging prints a line when each cell starts and for every message the
+                # kernel sends (outputs, busy/idle), which is the progress the stall check watches
+                "--log-level=DEBUG",
+                notebook_name  # Use just the filename since we're running from notebook dir
+            ],
+            cwd=notebook_dir,  # Run from notebook directory so relative paths work
+            env=env,
+            label=f"Notebook {i}",
+            log_name=Path(notebook_name).stem,
+            timeout=NOTEBOOK_TIMEOUT,
+            stall_timeout=STALL_TIMEOUT_MINUTES * 60,
+            heartbeat=HEARTBEAT_SECONDS
+            )
+
+            elapsed = result['seconds']
+            elapsed_str = f"{elapsed:.2f} seconds ({elapsed/60:.2f} min, including interpreter and kernel start-up)"
+
+            if result['timed_out']:
+                logging.error(f"⏰ Notebook {i} timed out after {NOTEBOOK_TIMEOUT/60:.0f} min")
+                print(f"⏰ Notebook {i} timed out after {NOTEBOOK_TIMEOUT/60:.0f} min")
+                return {'success': False, 'error': f"Timed out after {NOTEBOOK_TIMEOUT} seconds"}
+            if result['stalled']:
+                reason = f"stalled - no cell finished and no output for {STALL_TIMEOUT_MINUTES} min"
+                logging.error(f"⏰ Notebook {i} {reason} (log: {result['log_file']})")
+                print(f"⏰ Notebook {i} {reason}")
+                return {'success': False, 'error': f"Notebook {reason}"}
+
+            # Log results
+            if result['returncode'] == 0:
+                logging.info(f"✅ Notebook {i} completed successfully in {elapsed_str}")
+                print(f"✅ Notebook {i} completed in {elapsed_str}")
+                if result['tail']:
+                    logging.info(f"📤 Output ({notebook_name}):")
+                    for line in result['tail'][-10:]:  # Last 10 lines
+                        logging.info(f"   {line}")
+                return {'success': True, 'exit_code': 0}
+
+            logging.error(f"❌ Notebook {i} failed with return code: {result['returncode']} after {elapsed_str}")
+            print(f"❌ Notebook {i} failed after {elapsed_str}")
+            if result['stderr_tail']:
+                logging.error(f"📤 Error output ({notebook_name}, full log: {result['log_file']}):")
+                for line in result['stderr_tail'][-20:]:  # Last 20 lines
+                    logging.error(f"   {line}")
+            error = result['stderr_tail'][-1] if result['stderr_tail'] else None
+            return {'success': False, 'exit_code': result['returncode'], 'error': error}
+
+        except Exception as e:
+            logging.error(f"💥 Unexpected error executing notebook {i}: {e}")
+            print(f"💥 Unexpected error executing notebook {i}: {e}")
+            return {'success': False, 'error': str(e)}
+
     def run_weekly_task(self):
-        """Execute the weekly notebooks in sequence (with weekly frequency protection)"""
+        """Execute the weekly notebooks, running independent ones in parallel (with weekly frequency protection)"""
         logging.info("=" * 50)
         logging.info("🚀 Weekly task execution check")
         logging.info(f"📓 Notebooks: {len(NOTEBOOKS)}")
         for i, nb in enumerate(NOTEBOOKS, 1):
-            logging.info(f"   {i}. {os.path.basename(nb)}")
+            deps = NOTEBOOK_GRAPH[nb]
+            after = f" (after: {', '.join(os.path.basename(d) for d in deps)})" if deps else ""
+            logging.info(f"   {i}. {os.path.basename(nb)}{after}")
         logging.info(f"🐍 Python: {self.python_exe}")
         logging.info(f"📁 Virtual env: {VENV_PATH}")
+        logging.info(f"⚙️  Parallel notebooks: {MAX_PARALLEL_NOTEBOOKS} ({EXECUTION_BACKEND} backend)")
         logging.info(f"⏰ Current time: {datetime.now()}")
         
         # Check if we should run this week
@@ -256,86 +473,125 @@ class SmartVenvScheduler:
             return
         
         logging.info("✅ Proceeding with weekly execution")
-        
-        all_successful = True
-        
-        for i, notebook_path in enumerate(NOTEBOOKS, 1):
-            try:
-                logging.info(f"\n📓 [{i}/{len(NOTEBOOKS)}] Running: {os.path.basename(notebook_path)}")
-
-                # Prepare virtual environment
-                env = self.prepare_venv_environment()
-
-                # Get absolute path to notebook and its directory
-                notebook_abs = os.path.abspath(notebook_path)
-                notebook_dir = os.path.dirname(notebook_abs)
-                notebook_name = os.path.basename(notebook_abs)
-
-                # Time the notebook execution
-                start_time = time.time()
-
-                # Execute notebook using jupyter nbconvert
-                # Must run from notebook directory for relative paths to work
-                logging.info(f"🔄 Executing notebook...")
-                result = subprocess.run([
-                    self.python_exe,
-                    "-m", "jupyter", "nbconvert",
-                    "--to", "notebook",
-                    "--execute",
-                    "--inplace",
-                    notebook_name  # Use just the filename since we're running from notebook dir
-                ],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=3600,  # 1 hour timeout per notebook
-                cwd=notebook_dir,  # Run from notebook directory so relative paths work
-                env=env
-                )
-
-                elapsed = time.time() - start_time
-                elapsed_str = f"{elapsed:.2f} seconds ({elapsed/60:.2f} min)"
-
-                # Log results
-                if result.returncode == 0:
-                    logging.info(f"✅ Notebook {i} completed successfully in {elapsed_str}")
-                    print(f"✅ Notebook {i} completed in {elapsed_str}")
-                    if result.stdout and result.stdout.strip():
-                        logging.info("📤 Output:")
-                        for line in result.stdout.strip().split('\n')[-10:]:  # Last 10 lines
-                            logging.info(f"   {line}")
-                else:
-                    logging.error(f"❌ Notebook {i} failed with return code: {result.returncode} after {elapsed_str}")
-                    print(f"❌ Notebook {i} failed after {elapsed_str}")
-                    if result.stderr and result.stderr.strip():
-                        logging.error("📤 Error output:")
-                        for line in result.stderr.strip().split('\n')[-20:]:  # Last 20 lines
-                            logging.error(f"   {line}")
-                    all_successful = False
-                    break  # Stop on first failure
-
-            except subprocess.TimeoutExpired:
-                logging.error(f"⏰ Notebook {i} timed out after 1 hour")
-                print(f"⏰ Notebook {i} timed out after 1 hour")
-                all_successful = False
-                break
-            except Exception as e:
-                logging.error(f"💥 Unexpected error executing notebook {i}: {e}")
-                print(f"💥 Unexpected error executing notebook {i}: {e}")
-                all_successful = False
-                break
-        
-        # Only record execution if all notebooks succeeded
+        self.provision_venv()
+
+        # Pick up where a failed attempt for the same scheduled time left off
+        self.run_state = RunState(CHECKPOINT_DIR, self.get_last_scheduled_time().isoformat())
+        completed = self.run_state.completed()
+        if completed:
+            logging.info(f"⏩ Resuming - {len(completed)} notebook(s) already completed for this scheduled run:")
+            for notebook in completed:
+                logging.info(f"   ✓ {os.path.basename(notebook)}")
+        
+        batch_start = time.time()
+        self.run_id = self.history.start_run("retry" if self.retries else "weekly",
+                                             self.run_state.scheduled_for, EXECUTION_BACKEND)
+        if EXECUTION_BACKEND == "kernel_pool" and self.get_kernel_pool() is not None:
+            # No-op when the kernels are still warm from a previous run
+            self.kernel_pool.start()
+        results = run_notebook_graph(NOTEBOOK_GRAPH, self.execute_notebook, MAX_PARALLEL_NOTEBOOKS,
+                                     completed=completed)
+        batch_elapsed = time.time() - batch_start
+
+        logging.info(f"\n📊 Batch summary ({batch_elapsed:.2f} seconds, {batch_elapsed/60:.2f} min):")
+        for notebook, status in results.items():
+            icon = "✅" if status == SUCCESS else ("⏭️ " if status == SKIPPED else "❌")
+            logging.info(f"   {icon} {os.path.basename(notebook)}: {status}")
+        all_successful = all(status == SUCCESS for status in results.values())
+        self.history.finish_run(self.run_id, "success" if all_successful else "failed", batch_elapsed)
+        self.run_id = None
+        
+        # Only a fully successful run counts as this week's execution
         if all_successful:
             logging.info("\n✅ All notebooks completed successfully")
-            self.record_execution_date()
+            logging.info(f"✓ Execution recorded in {HISTORY_DB}: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            self.run_state.clear()
+            self.retries = 0
+        elif self.retries < MAX_RETRIES:
+            self.retries += 1
+            logging.error(f"\n❌ Execution failed - retry {self.retries}/{MAX_RETRIES} "
+                          f"in {RETRY_DELAY_MINUTES} min will resume from the failed notebook")
+            self.scheduler.add_job("retry", datetime.now() + timedelta(minutes=RETRY_DELAY_MINUTES),
+                                   self.retry_weekly_task)
         else:
-            logging.error("\n❌ Execution failed - will retry next scheduled time")
+            logging.error("\n❌ Execution failed - retries exhausted, checkpoints kept for the next scheduled time")
+            self.retries = 0
         
         logging.info("🏁 Weekly task execution finished")
         logging.info("=" * 50)
     
+    def retry_weekly_task(self):
+        """One-off retry job: resume the failed run from its checkpoints"""
+        logging.info("🔁 Retrying failed weekly run from checkpoints")
+        self.run_weekly_task()
+
+    def on_new_export(self, path):
+        """Watcher thread callback: queue one triggered run (bursts of files coalesce)"""
+        if self.trigger_pending:
+            return
+        self.trigger_pending = True
+        self.scheduler.submit(self.run_triggered_notebooks)
+
+    def run_triggered_notebooks(self):
+        """Run just the WATCH_NOTEBOOKS (plus their dependency edges among themselves)"""
+        self.trigger_pending = False
+        selected = [nb for nb in NOTEBOOKS if os.path.basename(nb) in WATCH_NOTEBOOKS]
+        if not selected:
+            logging.warning(f"⚠️  None of {WATCH_NOTEBOOKS} are in {NOTEBOOKS_FILE} - nothing to trigger")
+            return
+        graph = {nb: [dep for dep in NOTEBOOK_GRAPH[nb] if dep in selected] for nb in selected}
+
+        logging.info("=" * 50)
+        logging.info(f"📥 New {WATCH_PATTERN} export - running {', '.join(os.path.basename(nb) for nb in selected)}")
+        # Triggered runs neither count as the weekly run nor touch its checkpoints
+        previous_state, self.run_state = self.run_state, None
+        batch_start = time.time()
+        self.run_id = self.history.start_run("triggered", backend=EXECUTION_BACKEND)
+        try:
+            if EXECUTION_BACKEND == "kernel_pool" and self.get_kernel_pool() is not None:
+                self.kernel_pool.start()
+            results = run_notebook_graph(graph, self.execute_notebook, MAX_PARALLEL_NOTEBOOKS)
+        finally:
+            self.run_state = previous_state
+        all_successful = all(status == SUCCESS for status in results.values())
+        self.history.finish_run(self.run_id, "success" if all_successful else "failed", time.time() - batch_start)
+        self.run_id = None
+        for notebook, status in results.items():
+            icon = "✅" if status == SUCCESS else "❌"
+            logging.info(f"   {icon} {os.path.basename(notebook)}: {status}")
+        logging.info("🏁 Triggered execution finished")
+        logging.info("=" * 50)
+
+    def provision_venv(self):
+        """
+        Make sure the venv has every requirement, skipping all probes and installs when its
+        fingerprint matches the last successful provisioning (checked with stat() only)
+        """
+        if provision is None:
+            return self.test_venv_setup()
+        stamp = provision.current_stamp(self.python_exe, [REQUIREMENTS_FILE])
+        if stamp is not None:
+            print(f"✅ Environment unchanged since {stamp['provisioned_at']} (Python {stamp['python_version']}) - "
+                  f"skipped venv probe and installs (saved ~{stamp['provision_seconds']:.1f}s)")
+            return True
+
+        print("📦 Environment changed - provisioning the virtual environment...")
+        t0 = time.time()
+        try:
+            result = subprocess.run([self.python_exe, "-m", "officeagents.provision", REQUIREMENTS_FILE],
+                                    capture_output=True, text=True, env=self.prepare_venv_environment(),
+                                    cwd=NOTEBOOKS_SOURCE_DIR or os.getcwd(), timeout=1800)
+        except Exception as e:
+            print(f"⚠️  Provisioning failed (non-critical): {e}")
+            return False
+        for line in result.stdout.strip().split('\n'):
+            print(f"   {line}")
+        if result.returncode != 0:
+            print(f"⚠️  Provisioning failed (non-critical): {result.stderr.strip()[-500:]}")
+            return False
+        logging.info(f"📦 Virtual environment provisioned in {time.time() - t0:.1f}s")
+        return True
+
     def test_venv_setup(self):
         """Test the virtual environment setup"""
         print("🧪 Testing virtual environment setup...")
@@ -382,9 +638,11 @@ class SmartVenvScheduler:
         """Start the smart scheduler"""
         print("🤖 Smart Multi-Task Agent Scheduler")
         print("=" * 50)
-        print(f"📓 Notebooks: {len(NOTEBOOKS)}")
+        print(f"📓 Notebooks: {len(NOTEBOOKS)} (up to {MAX_PARALLEL_NOTEBOOKS} in parallel)")
         for i, nb in enumerate(NOTEBOOKS, 1):
-            print(f"   {i}. {os.path.basename(nb)}")
+            deps = NOTEBOOK_GRAPH[nb]
+            after = f" (after: {', '.join(os.path.basename(d) for d in deps)})" if deps else ""
+            print(f"   {i}. {os.path.basename(nb)}{after}")
         print(f"🐍 Python: {self.python_exe}")
         print(f"📁 Virtual env: {VENV_PATH}")
         print(f"📅 Schedule: Every {SCHEDULE_DAY.title()} at {SCHEDULE_TIME}")
@@ -402,30 +660,40 @@ class SmartVenvScheduler:
         
         print("=" * 50)
         
-        # Test virtual environment setup (non-blocking)
-        self.test_venv_setup()
+        # Provision / test the virtual environment (non-blocking; instant when unchanged)
+        self.provision_venv()
         print()
         
+        try:
+            parse_weekly_schedule(SCHEDULE_DAY, SCHEDULE_TIME)
+        except ValueError as e:
+            print(f"❌ Invalid schedule: {e}")
+            input("Press Enter to exit...")
+            return
+        
         # Check for missed execution on startup
         print("\n🔍 Checking for missed executions...")
         if self.check_for_missed_execution():
             print("⚡ Missed execution detected - running multi-task agent immediately!")
             logging.info("⚡ Missed execution detected on startup - running immediately")
-            self.run_weekly_task()
+            self.scheduler.add_job("catch-up", datetime.now(), self.run_weekly_task)
         else:
             print("✅ No missed executions - waiting for next scheduled time")
         
-        # Schedule the task for future runs
-        day_method = getattr(schedule.every(), SCHEDULE_DAY.lower(), None)
-        if not day_method:
-            print(f"❌ Invalid day: {SCHEDULE_DAY}")
-            input("Press Enter to exit...")
-            return
-            
-        day_method.at(SCHEDULE_TIME).do(self.run_weekly_task)
+        # Schedule the task for future runs; the loop sleeps until exactly this time
+        next_run = next_weekly_occurrence(SCHEDULE_DAY, SCHEDULE_TIME)
+        self.scheduler.add_job(
+            "weekly", next_run, self.run_weekly_task,
+            reschedule=lambda ran_at: next_weekly_occurrence(SCHEDULE_DAY, SCHEDULE_TIME, ran_at)
+        )
+        
+        # Watch the broker folder so fresh exports are cleaned within seconds
+        if WATCH_FOLDER:
+            self.watcher = FileArrivalWatcher(WATCH_FOLDER, WATCH_PATTERN, self.on_new_export,
+                                              settle_seconds=WATCH_SETTLE_SECONDS)
+            if self.watcher.start():
+                print(f"👀 Watching {WATCH_FOLDER} for {WATCH_PATTERN} -> {', '.join(WATCH_NOTEBOOKS)}")
         
-        # Show next run time
-        next_run = schedule.next_run()
         print(f"\n⏰ Next scheduled execution: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
         print("\nScheduler is running... Press Ctrl+C to stop")
         print("-" * 50)
@@ -433,27 +701,20 @@ class SmartVenvScheduler:
         logging.info("🚀 Smart scheduler started")
         logging.info(f"📅 Next scheduled execution: {next_run}")
         
-        # Main scheduling loop
+        # Main scheduling loop: idle until the next deadline or a file trigger
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self.scheduler.run_forever()
         except KeyboardInterrupt:
             print("\n🛑 Scheduler stopped by user")
             logging.info("🛑 Scheduler stopped by user")
+        finally:
+            if self.watcher is not None:
+                self.watcher.stop()
+            if self.kernel_pool is not None:
+                self.kernel_pool.shutdown()
 
 def main():
     """Main function"""
-    # Check if schedule library is installed
-    try:
-        import schedule
-    except ImportError:
-        print("❌ Missing required library!")
-        print("Install with: pip install schedule")
-        print("Or in your virtual environment: path/to/venv/Scripts/pip install schedule")
-        input("Press Enter to exit...")
-        return
-    
     # Create and start scheduler
     try:
         scheduler = SmartVenvScheduler()
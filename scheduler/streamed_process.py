@@ -0,0 +1,138 @@
+"""
+Streamed Process Runner
+Runs a child process (nbconvert, `python -m officeagents ...`) while streaming its output
+line by line into a per-notebook rotating log file. Only a bounded tail stays in memory;
+progress heartbeats are logged while it runs, and a child that prints nothing for
+stall_timeout seconds is stopped instead of waiting out the whole timeout (nbconvert
+is run with debug logging, so each cell start and kernel message is output).
+"""
+
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+NOTEBOOK_LOG_DIR = os.path.join("logs", "notebooks")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+TAIL_LINES = 50
+LOG_LINE_CHARS = 2000  # Longer lines (e.g. nbconvert debug lines carrying base64 images) are cut
+
+
+def notebook_logger(name, log_dir=NOTEBOOK_LOG_DIR):
+    """Logger writing to log_dir/<name>.log, rotated at LOG_MAX_BYTES (not echoed to the console)"""
+    logger = logging.getLogger(f"notebook.{name}")
+    if not logger.handlers:
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(os.path.join(log_dir, f"{name}.log"), maxBytes=LOG_MAX_BYTES,
+                                      backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def _pump(stream, name, lines):
+    for line in iter(stream.readline, ''):
+        line = line.rstrip('\r\n')
+        if len(line) > LOG_LINE_CHARS:
+            line = f"{line[:LOG_LINE_CHARS]}... ({len(line):,} chars)"
+        lines.put((name, line))
+    stream.close()
+    lines.put((name, None))
+
+
+def _stop(proc, grace=10):
+    proc.terminate()
+    try:
+        proc.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def run_streamed(cmd, cwd, env, label, log_name, timeout=3600, stall_timeout=None, heartbeat=60,
+                 tail_lines=TAIL_LINES):
+    """
+    Run cmd, logging every stdout/stderr line to logs/notebooks/<log_name>.log as it arrives.
+
+    Args:
+        label (str): Name used in heartbeat and stall messages, e.g. "Notebook 2"
+        timeout (float): Overall limit in seconds
+        stall_timeout (float): Stop the child after this many seconds without output (None = never)
+        heartbeat (float): Seconds between progress messages in the scheduler log
+
+    Returns:
+        dict: {'returncode' (None if stopped), 'timed_out', 'stalled', 'seconds', 'lines',
+        'tail': last tail_lines lines (stderr lines prefixed "! "), 'stderr_tail', 'error_lines'
+        (stdout lines starting with ❌, bounded), 'log_file'}
+    """
+    log = notebook_logger(log_name)
+    env = dict(env or os.environ, PYTHONUNBUFFERED="1")  # Children flush every line
+    log.info(f"===== {' '.join(str(part) for part in cmd)}")
+    proc = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding='utf-8', errors='replace', bufsize=1)
+    lines = queue.Queue()
+    for stream, name in ((proc.stdout, 'stdout'), (proc.stderr, 'stderr')):
+        threading.Thread(target=_pump, args=(stream, name, lines), daemon=True).start()
+
+    tail, stderr_tail, error_lines = deque(maxlen=tail_lines), deque(maxlen=tail_lines), deque(maxlen=10)
+    start = last_output = last_heartbeat = time.time()
+    count, open_streams = 0, 2
+    timed_out = stalled = False
+    while open_streams or proc.poll() is None:
+        try:
+            name, line = lines.get(timeout=1)
+        except queue.Empty:
+            name = None
+        now = time.time()
+        if name is not None:
+            if line is None:
+                open_streams -= 1
+                continue
+            last_output = now
+            count += 1
+            if name == 'stderr':
+                log.info(f"! {line}")
+                tail.append(f"! {line}")
+                stderr_tail.append(line)
+            else:
+                log.info(line)
+                tail.append(line)
+                if line.startswith('❌'):
+                    error_lines.append(line)
+        if now - start > timeout:
+            timed_out = True
+        elif stall_timeout and now - last_output > stall_timeout:
+            stalled = True
+        if timed_out or stalled:
+            _stop(proc)
+            break
+        if heartbeat and now - last_heartbeat >= heartbeat:
+            last_heartbeat = now
+            latest = tail[-1][:120] if tail else "(no output yet)"
+            logging.info(f"💓 {label} running {(now - start) / 60:.1f} min, {count} lines, "
+                         f"last output {now - last_output:.0f}s ago: {latest}")
+
+    seconds = time.time() - start
+    if timed_out or stalled:
+        reason = "timed out" if timed_out else f"stalled (no output for {stall_timeout / 60:.0f} min)"
+        log.info(f"===== stopped: {reason} after {seconds:.1f}s")
+    else:
+        log.info(f"===== exit code {proc.returncode} after {seconds:.1f}s")
+    return {
+        'returncode': None if timed_out or stalled else proc.returncode,
+        'timed_out': timed_out,
+        'stalled': stalled,
+        'seconds': seconds,
+        'lines': count,
+        'tail': list(tail),
+        'stderr_tail': list(stderr_tail),
+        'error_lines': list(error_lines),
+        'log_file': log.handlers[0].baseFilename,
+    }